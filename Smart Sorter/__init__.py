@@ -2,8 +2,11 @@
 Smart Sorter - Intelligent file organization tools
 """
 
-from .smart_sort import SmartSort
-from .time_sort import TimeSort
+from .smart_sort import SmartSort, GroupKey, iter_smart_sort
+from .time_sort import TimeSort, iter_time_sort
+from .time_histogram import TimeHistogram, log_buckets
+from .time_query import TimeQuery, iter_time_query, older_than, newer_than, larger_than, smaller_than
 
 __version__ = "1.0.0"
-__all__ = ["SmartSort", "TimeSort"]
+__all__ = ["SmartSort", "GroupKey", "TimeSort", "TimeQuery", "TimeHistogram", "iter_smart_sort", "iter_time_sort",
+           "iter_time_query", "older_than", "newer_than", "larger_than", "smaller_than", "log_buckets"]
@@ -0,0 +1,129 @@
+"""
+Benchmark for SmartSort pattern extraction
+Run: python bench_smart_sort.py [--names 1000000] [--memory]
+
+Compares the old per-file analysis (splitext twice, re.split and two
+re.search calls through the module-level regex cache, string group names
+parsed again by the suggestions) against the single-pass tokenizer with
+precompiled patterns and typed GroupKeys, on synthetic file paths.
+With --memory, also compares peak memory of the old layout (a list of path
+strings, repeated in up to four group lists) against paths stored once in
+a ResultStore with array('I') file IDs per group.
+"""
+
+import argparse
+import os
+import random
+import re
+import string
+import time
+import tracemalloc
+from collections import defaultdict
+
+from smart_sort import _extract_patterns, _generate_suggestions
+from result_store import ResultStore
+
+
+def legacy_extract_patterns(files):
+    """The string-keyed extraction SmartSort used before GroupKeys"""
+    patterns = defaultdict(list)
+    for file_path in files:
+        filename = os.path.basename(file_path)
+        name_without_ext = os.path.splitext(filename)[0]
+        ext = os.path.splitext(filename)[1].lower()
+        if ext:
+            patterns[f"By Extension: {ext}"].append(file_path)
+        words = re.split(r'[_\-\s]+', name_without_ext)
+        if words and words[0]:
+            patterns[f"By Prefix: {words[0]}"].append(file_path)
+        if re.search(r'\d{4}[-_]?\d{2}[-_]?\d{2}', filename):
+            patterns["By Date"].append(file_path)
+        if re.search(r'v\d+', filename, re.IGNORECASE):
+            patterns["By Version"].append(file_path)
+    return patterns
+
+
+def legacy_generate_suggestions(file_groups):
+    """The string-parsing part of the old suggestion step"""
+    ext_structure = {}
+    prefix_structure = {}
+    for group_name in file_groups:
+        if group_name.startswith("By Extension:"):
+            ext = group_name.replace("By Extension: ", "").replace(".", "")
+            ext_structure[group_name] = f"By Type/{ext if ext else 'No Extension'}"
+    for group_name in file_groups:
+        if group_name.startswith("By Prefix:"):
+            prefix_structure[group_name] = f"By Project/{group_name.replace('By Prefix: ', '')}"
+    return [ext_structure, prefix_structure, {group: "Organized Files" for group in file_groups}]
+
+
+def make_corpus(count, seed=42):
+    """Synthetic paths with project prefixes, dates, versions and common extensions"""
+    rng = random.Random(seed)
+    projects = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))) for _ in range(2000)]
+    extensions = [".jpg", ".png", ".pdf", ".docx", ".txt", ".zip", ".mp4", ".py", ".JPG", ""]
+    folders = [f"/data/archive/{rng.choice(projects)}/{year}" for year in range(2010, 2025) for _ in range(20)]
+    paths = []
+    for _ in range(count):
+        parts = [rng.choice(projects)]
+        if rng.random() < 0.3:
+            parts.append(f"{rng.randint(2010, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        if rng.random() < 0.2:
+            parts.append(f"v{rng.randint(1, 20)}")
+        parts.append("".join(rng.choice(string.ascii_lowercase + string.digits) for _ in range(rng.randint(2, 8))))
+        name = rng.choice("_- ").join(parts) + rng.choice(extensions)
+        paths.append(f"{rng.choice(folders)}/{name}")
+    return paths
+
+
+def bench(extract, suggest, paths):
+    start = time.perf_counter()
+    groups = extract(paths)
+    suggest(groups)
+    return len(groups), time.perf_counter() - start
+
+
+def peak_memory(build, paths):
+    """Peak bytes allocated while building one layout from a list of path strings"""
+    tracemalloc.start()
+    layout = build(paths)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del layout
+    return peak
+
+
+def legacy_layout(paths):
+    # The file list plus the grouped lists, as SmartSort kept them
+    all_files = [path.encode().decode() for path in paths]
+    return all_files, legacy_extract_patterns(all_files)
+
+
+def id_layout(paths):
+    files = ResultStore(paths)
+    return files, _extract_patterns(files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SmartSort pattern extraction benchmark")
+    parser.add_argument("--names", type=int, default=1000000, help="corpus size (default: 1000000)")
+    parser.add_argument("--memory", action="store_true", help="also measure peak memory of both layouts")
+    args = parser.parse_args()
+    
+    print(f"Generating {args.names:,} paths...")
+    paths = make_corpus(args.names)
+    
+    print(f"{'approach':<20}{'groups':>10}{'seconds':>10}{'names/s':>14}")
+    for label, extract, suggest in (("string groups", legacy_extract_patterns, legacy_generate_suggestions),
+                                    ("single pass", _extract_patterns, _generate_suggestions)):
+        groups, elapsed = bench(extract, suggest, paths)
+        print(f"{label:<20}{groups:>10,}{elapsed:>10.2f}{len(paths) / elapsed:>14,.0f}")
+    
+    if args.memory:
+        print(f"\n{'layout':<20}{'peak MB':>10}")
+        for label, build in (("path lists", legacy_layout), ("store + IDs", id_layout)):
+            print(f"{label:<20}{peak_memory(build, paths) / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,58 @@ Usage: from Smart_Sorter import SmartSort
 """
 
 import os
+import sys
+from array import array
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, deque, namedtuple
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
 import re
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Sorter'))
+from walker import iter_entries
+from bulk_ops import BulkExecutor
+from duplicates import find_duplicates
+from hash_cache import HashCache
+from result_store import ResultStore, unpack_names
+
+
+class GroupMembers(Sequence):
+    """Paths of one group, resolved from file IDs on access"""
+    def __init__(self, files, ids):
+        self.files = files
+        self.ids = ids
+    
+    def __repr__(self):
+        return f"GroupMembers(count={len(self.ids)})"
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.files[file_id] for file_id in self.ids[index]]
+        return self.files[self.ids[index]]
+
 
 class SmartSortAnalysis:
-    """Container for SmartSort analysis results"""
-    def __init__(self, folder, file_groups, suggestions):
+    """Container for SmartSort analysis results (each path stored once; groups hold file IDs)"""
+    def __init__(self, folder, files, groups, suggestions, duplicates=None):
         self.folder = folder
-        self.file_groups = file_groups
+        # files is a ResultStore (a file's ID is its index); groups maps GroupKey -> array('I') of IDs
+        self.files = files
+        self.groups = groups
         self.suggestions = suggestions
+        # DuplicateResults when analyzed with duplicates=True
+        self.duplicates = duplicates
     
     def __repr__(self):
-        return f"SmartSortAnalysis(groups={len(self.file_groups)}, suggestions={len(self.suggestions)})"
+        return f"SmartSortAnalysis(files={len(self.files)}, groups={len(self.groups)}, suggestions={len(self.suggestions)})"
+    
+    @property
+    def file_groups(self):
+        """GroupKey -> sequence of paths (views over the IDs, nothing is copied)"""
+        return {key: GroupMembers(self.files, ids) for key, ids in self.groups.items()}
     
     def get_suggestion(self, index):
         """Get a specific suggestion"""
@@ -26,8 +64,16 @@ class SmartSortAnalysis:
             return self.suggestions[index]
         return None
     
-    def apply_structure(self, suggestion_index, base_folder=None):
-        """Apply the suggested folder structure"""
+    def apply_structure(self, suggestion_index, base_folder=None, journal=None, dry_run=False):
+        """
+        Apply the suggested folder structure
+        
+        Args:
+            suggestion_index (int): Which suggestion to apply
+            base_folder (str): Where to create the folders (default: the analyzed folder)
+            journal (str): Journal file to record the moves in, for resume/undo (default: None)
+            dry_run (bool): Return a DryRunReport estimate instead of moving anything (default: False)
+        """
         if base_folder is None:
             base_folder = self.folder
         
@@ -37,72 +83,162 @@ class SmartSortAnalysis:
         
         structure = suggestion["structure"]
         created_folders = []
-        moved_files = 0
-        
-        import shutil
+        moves = {}
         
-        for group_name, files in self.file_groups.items():
-            if group_name in structure:
-                folder_path = os.path.join(base_folder, structure[group_name])
-                os.makedirs(folder_path, exist_ok=True)
+        for group, ids in self.groups.items():
+            if group in structure:
+                folder_path = os.path.join(base_folder, structure[group])
                 created_folders.append(folder_path)
-                
-                for file_path in files:
-                    try:
-                        dest_path = os.path.join(folder_path, os.path.basename(file_path))
-                        shutil.move(file_path, dest_path)
-                        moved_files += 1
-                    except Exception as e:
-                        print(f"Error moving {file_path}: {e}")
+                for file_id in ids:
+                    # A file in several mapped groups goes to the first one
+                    moves.setdefault(file_id, folder_path)
+        
+        # Same-named files get numbered names; same-device files are renamed, never copied
+        pairs = ((self.files[file_id], folder_path) for file_id, folder_path in moves.items())
+        report = BulkExecutor().transfer("move", pairs, journal=journal, dry_run=dry_run)
+        if dry_run:
+            return report
         
         return {
             "created_folders": created_folders,
-            "moved_files": moved_files
+            "moved_files": len(report),
+            "failed": report.failed
         }
 
 
-def _extract_patterns(files):
-    """Extract common patterns from filenames"""
-    patterns = defaultdict(list)
+class GroupKey(namedtuple("GroupKey", ["kind", "value"])):
+    """
+    Typed pattern group: kind is "extension", "prefix", "date", "version" or "duplicate";
+    value is the extension or prefix (None for the other groups)
+    """
+    __slots__ = ()
     
-    for file_path in files:
-        filename = os.path.basename(file_path)
-        name_without_ext = os.path.splitext(filename)[0]
-        ext = os.path.splitext(filename)[1].lower()
-        
-        # Group by extension
-        if ext:
-            patterns[f"By Extension: {ext}"].append(file_path)
+    _LABELS = {"extension": "By Extension", "prefix": "By Prefix", "date": "By Date", "version": "By Version",
+               "duplicate": "Duplicates"}
+    
+    def __str__(self):
+        # The labels group names had before they were typed, e.g. "By Extension: .txt"
+        label = self._LABELS[self.kind]
+        return label if self.value is None else f"{label}: {self.value}"
+
+
+DATE_GROUP = GroupKey("date", None)
+VERSION_GROUP = GroupKey("version", None)
+# Every copy of duplicate content except the first of each set
+DUPLICATE_GROUP = GroupKey("duplicate", None)
+
+# Names per process pool task: large enough to amortize pickling, small enough to balance
+SHARD_SIZE = 65536
+
+# Compiled once; the bound methods are what the hot loop calls
+_PREFIX = re.compile(r'[^_\-\s]*').match
+_DATE = re.compile(r'\d{4}[-_]?\d{2}[-_]?\d{2}').search
+_VERSION = re.compile(r'[vV]\d+').search
+
+
+class _Classifier:
+    """Tokenizes each filename once, reusing one GroupKey per distinct extension/prefix"""
+    def __init__(self):
+        self._extensions = {}
+        self._prefixes = {}
+    
+    def __call__(self, filename):
+        """Pattern groups of one filename (basename), in extension/prefix/date/version order"""
+        keys = []
         
-        # Group by prefix (first word)
-        words = re.split(r'[_\-\s]+', name_without_ext)
-        if words and words[0]:
-            patterns[f"By Prefix: {words[0]}"].append(file_path)
+        # Same split as os.path.splitext: leading dots don't start an extension
+        stripped = filename.lstrip('.')
+        dot = stripped.rfind('.')
+        if dot > 0:
+            stem = filename[:len(filename) - len(stripped) + dot]
+            ext = stripped[dot:].lower()
+            key = self._extensions.get(ext)
+            if key is None:
+                key = self._extensions[ext] = GroupKey("extension", ext)
+            keys.append(key)
+        else:
+            stem = filename
         
-        # Group by date pattern (YYYY-MM-DD or YYYYMMDD)
-        date_match = re.search(r'\d{4}[-_]?\d{2}[-_]?\d{2}', filename)
-        if date_match:
-            patterns["By Date"].append(file_path)
+        # First word, i.e. everything before the first _, - or whitespace
+        prefix = _PREFIX(stem).group()
+        if prefix:
+            key = self._prefixes.get(prefix)
+            if key is None:
+                key = self._prefixes[prefix] = GroupKey("prefix", prefix)
+            keys.append(key)
         
-        # Group by version pattern (v1, v2, etc.)
-        version_match = re.search(r'v\d+', filename, re.IGNORECASE)
-        if version_match:
-            patterns["By Version"].append(file_path)
+        if _DATE(filename):
+            keys.append(DATE_GROUP)
+        if _VERSION(filename):
+            keys.append(VERSION_GROUP)
+        return keys
+
+
+def _file_names(files, start=0, stop=None):
+    """Basenames of files[start:stop], read from a ResultStore without building full paths"""
+    if isinstance(files, ResultStore):
+        return files.iter_names(start, stop)
+    return map(os.path.basename, files[start:stop])
+
+
+def _extract_patterns(files):
+    """Group file IDs (positions in files) by the patterns in their names, one tokenizing pass per name"""
+    patterns = defaultdict(lambda: array('I'))
+    classify = _Classifier()
+    
+    for file_id, name in enumerate(_file_names(files)):
+        for key in classify(name):
+            patterns[key].append(file_id)
     
-    return patterns
+    return dict(patterns)
+
+
+def _classify_shard(shard):
+    """Process pool worker: {GroupKey: array of file IDs} for one (first_id, packed names, offsets) shard"""
+    first_id, data, offsets = shard
+    classify = _Classifier()
+    groups = {}
+    # Names arrive as the store's raw bytes, so decoding happens here rather than in the parent
+    for file_id, name in enumerate(unpack_names(data, offsets), first_id):
+        for key in classify(name):
+            members = groups.get(key)
+            if members is None:
+                members = groups[key] = array('I')
+            members.append(file_id)
+    return groups
+
+
+def _extract_patterns_parallel(files, processes):
+    """Same grouping as _extract_patterns, with the names of a ResultStore sharded across a process pool"""
+    patterns = defaultdict(lambda: array('I'))
+    
+    def merge(future):
+        # Shards are merged in order, so every group stays sorted by ID; merging is a C-level append
+        for key, ids in future.result().items():
+            patterns[key].extend(ids)
+    
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        # Two shards per process in flight: the next one is sliced off the store only when one is done
+        pending = deque()
+        for start in range(0, len(files), SHARD_SIZE):
+            pending.append(pool.submit(_classify_shard, (start,) + files.packed_names(start, start + SHARD_SIZE)))
+            if len(pending) >= 2 * processes:
+                merge(pending.popleft())
+        while pending:
+            merge(pending.popleft())
+    
+    return dict(patterns)
 
 
 def _generate_suggestions(file_groups):
     """Generate folder organization suggestions"""
     suggestions = []
+    by_kind = defaultdict(list)
+    for key in file_groups:
+        by_kind[key.kind].append(key)
     
     # Suggestion 1: By Extension
-    ext_structure = {}
-    for group_name in file_groups:
-        if group_name.startswith("By Extension:"):
-            ext = group_name.replace("By Extension: ", "").replace(".", "")
-            ext_structure[group_name] = f"By Type/{ext if ext else 'No Extension'}"
-    
+    ext_structure = {key: f"By Type/{key.value.replace('.', '') or 'No Extension'}" for key in by_kind["extension"]}
     if ext_structure:
         suggestions.append({
             "name": "Organize by File Type",
@@ -111,12 +247,7 @@ def _generate_suggestions(file_groups):
         })
     
     # Suggestion 2: By Prefix
-    prefix_structure = {}
-    for group_name in file_groups:
-        if group_name.startswith("By Prefix:"):
-            prefix = group_name.replace("By Prefix: ", "")
-            prefix_structure[group_name] = f"By Project/{prefix}"
-    
+    prefix_structure = {key: f"By Project/{key.value}" for key in by_kind["prefix"]}
     if prefix_structure:
         suggestions.append({
             "name": "Organize by Project/Prefix",
@@ -125,22 +256,30 @@ def _generate_suggestions(file_groups):
         })
     
     # Suggestion 3: By Date
-    if "By Date" in file_groups:
+    if DATE_GROUP in file_groups:
         suggestions.append({
             "name": "Organize by Date",
             "description": "Group files by date patterns found in filenames",
-            "structure": {"By Date": "By Date"}
+            "structure": {DATE_GROUP: "By Date"}
         })
     
     # Suggestion 4: By Version
-    if "By Version" in file_groups:
+    if VERSION_GROUP in file_groups:
         suggestions.append({
             "name": "Organize by Version",
             "description": "Group versioned files together",
-            "structure": {"By Version": "Versions"}
+            "structure": {VERSION_GROUP: "Versions"}
         })
     
-    # Suggestion 5: Custom - All in one folder
+    # Suggestion 5: Duplicates
+    if DUPLICATE_GROUP in file_groups:
+        suggestions.append({
+            "name": "Set Aside Duplicates",
+            "description": "Move extra copies of identical files to a 'Duplicates' folder, keeping the first of each",
+            "structure": {DUPLICATE_GROUP: "Duplicates"}
+        })
+    
+    # Suggestion 6: Custom - All in one folder
     custom_structure = {group: "Organized Files" for group in file_groups}
     suggestions.append({
         "name": "Move All to Single Folder",
@@ -151,12 +290,21 @@ def _generate_suggestions(file_groups):
     return suggestions
 
 
-def SmartSort(folder_location):
+def SmartSort(folder_location, max_workers=None, index=None, processes=None, duplicates=False, hash_workers=8,
+              hash_cache=None, exclusions=None):
     """
     Analyze files by name and suggest folder organization structures
     
     Args:
         folder_location (str): Path to analyze
+        max_workers (int): Threads listing directories in parallel (default: None, single thread)
+        index (FileIndex): Read the file list from a persistent file index instead of walking (default: None)
+        processes (int): Processes analyzing names in parallel, for very large trees (default: None, in-process)
+        duplicates (bool): Also find files with identical contents (reads same-size files) (default: False)
+        hash_workers (int): Threads hashing file contents when duplicates is set (default: 8)
+        hash_cache (HashCache): Digest cache for duplicates (default: None, the shared cache in ~/.sorter;
+            False hashes everything again)
+        exclusions (ExclusionRules): Globs, ignore files and depth/symlink/mount limits; excluded folders are never listed (default: None)
     
     Returns:
         SmartSortAnalysis: Object containing analysis and suggestions
@@ -173,23 +321,90 @@ def SmartSort(folder_location):
         result = analysis.apply_structure(0)
         print(f"Created {len(result['created_folders'])} folders")
         print(f"Moved {result['moved_files']} files")
+        
+        # Millions of files: analyze names on every core
+        analysis = SmartSort("//nas/archive", max_workers=8, processes=os.cpu_count())
+        
+        # Identical files: adds a "Set Aside Duplicates" suggestion
+        analysis = SmartSort("D:/Photos", duplicates=True)
+        print(f"{analysis.duplicates.wasted_bytes} bytes in duplicate copies")
     """
     if not os.path.exists(folder_location):
         raise ValueError(f"Folder not found: {folder_location}")
+    if processes is not None and processes < 1:
+        raise ValueError("processes must be at least 1")
     
     # Collect all files
-    all_files = []
-    for root, dirs, files in os.walk(folder_location):
-        for file_name in files:
-            all_files.append(os.path.join(root, file_name))
+    if index is not None:
+        entries = index.iter_entries(folder_location, include_dirs=False, max_workers=max_workers, exclusions=exclusions)
+    else:
+        entries = iter_entries(folder_location, include_dirs=False, max_workers=max_workers, exclusions=exclusions)
+    all_files = ResultStore(with_stat=duplicates)
+    for entry in entries:
+        if duplicates:
+            # Sizes are the first duplicate filter; symlinks get none, so they are never candidates
+            try:
+                stat = None if entry.is_symlink() else entry.stat()
+            except OSError:
+                stat = None
+            all_files.append(entry.path, entry.name, stat, False)
+        else:
+            all_files.append(entry.path, entry.name)
     
-    if not all_files:
+    if not len(all_files):
         raise ValueError("No files found in folder")
     
-    # Extract patterns
-    file_groups = _extract_patterns(all_files)
+    # Extract patterns (sharded across processes: name analysis is CPU-bound)
+    if processes is not None and processes > 1 and len(all_files) > SHARD_SIZE:
+        groups = _extract_patterns_parallel(all_files, processes)
+    else:
+        groups = _extract_patterns(all_files)
+    
+    # Find duplicate contents (files with a unique size are never read)
+    found = None
+    if duplicates:
+        # Unchanged files are never re-hashed across runs
+        if hash_cache is None:
+            cache = HashCache()
+        else:
+            cache = None if hash_cache is False else hash_cache
+        try:
+            found = find_duplicates(all_files, max_workers=hash_workers, cache=cache)
+        finally:
+            if hash_cache is None:
+                cache.close()
+        redundant = found.redundant_ids()
+        if redundant:
+            groups[DUPLICATE_GROUP] = array('I', sorted(redundant))
     
     # Generate suggestions
-    suggestions = _generate_suggestions(file_groups)
+    suggestions = _generate_suggestions(groups)
+    
+    return SmartSortAnalysis(folder_location, all_files, groups, suggestions, found)
+
+
+def iter_smart_sort(folder_location, max_workers=None, index=None, exclusions=None):
+    """
+    Classify files by name pattern, yielding each file as soon as it is found
+    
+    Takes the same arguments as SmartSort(). Nothing is collected, so memory
+    stays flat, and the walk stops as soon as the caller stops iterating.
+    
+    Returns:
+        generator: (file_path, groups) tuples, groups being the GroupKeys used in SmartSortAnalysis.groups
+    
+    Example:
+        for file_path, groups in iter_smart_sort("C:/Users/Abu/Downloads"):
+            if VERSION_GROUP in groups:
+                print(file_path)
+    """
+    if not os.path.exists(folder_location):
+        raise ValueError(f"Folder not found: {folder_location}")
+    
+    if index is not None:
+        entries = index.iter_entries(folder_location, include_dirs=False, max_workers=max_workers, exclusions=exclusions)
+    else:
+        entries = iter_entries(folder_location, include_dirs=False, max_workers=max_workers, exclusions=exclusions)
     
-    return SmartSortAnalysis(folder_location, file_groups, suggestions)
+    classify = _Classifier()
+    return ((entry.path, classify(entry.name)) for entry in entries)
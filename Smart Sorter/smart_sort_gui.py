@@ -5,12 +5,13 @@ SmartSort GUI - Analyze and organize files by name patterns
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QListWidget, QListWidgetItem, QFileDialog, QMessageBox, QTextEdit,
-    QComboBox, QSpinBox, QDialog, QScrollArea
+    QComboBox, QSpinBox, QDialog, QScrollArea, QCheckBox
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QFont
 import os
 from smart_sort import SmartSort
+from dry_run import format_bytes
 
 
 class SmartSortAnalyzer(QThread):
@@ -18,13 +19,14 @@ class SmartSortAnalyzer(QThread):
     analysis_complete = pyqtSignal(object)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, folder_path):
+    def __init__(self, folder_path, duplicates=False):
         super().__init__()
         self.folder_path = folder_path
+        self.duplicates = duplicates
     
     def run(self):
         try:
-            analysis = SmartSort(self.folder_path)
+            analysis = SmartSort(self.folder_path, duplicates=self.duplicates)
             self.analysis_complete.emit(analysis)
         except Exception as e:
             self.error_occurred.emit(str(e))
@@ -61,6 +63,10 @@ class SmartSortWidget(QWidget):
         self.folder_label.setStyleSheet("color: #888; font-style: italic;")
         folder_layout.addWidget(self.folder_label)
         
+        self.duplicates_check = QCheckBox("Find duplicates")
+        self.duplicates_check.setToolTip("Also look for files with identical contents (reads files that share a size)")
+        folder_layout.addWidget(self.duplicates_check)
+        
         analyze_btn = QPushButton("🔍 Analyze")
         analyze_btn.clicked.connect(self.analyze_files)
         analyze_btn.setMinimumHeight(40)
@@ -132,7 +138,7 @@ class SmartSortWidget(QWidget):
         self.preview_list.clear()
         self.description_text.clear()
         
-        self.analyzer_thread = SmartSortAnalyzer(folder_path)
+        self.analyzer_thread = SmartSortAnalyzer(folder_path, self.duplicates_check.isChecked())
         self.analyzer_thread.analysis_complete.connect(self.display_analysis)
         self.analyzer_thread.error_occurred.connect(self.handle_error)
         self.analyzer_thread.finished.connect(self.analysis_finished)
@@ -161,8 +167,8 @@ class SmartSortWidget(QWidget):
         structure = suggestion["structure"]
         
         for group_name, folder_path in structure.items():
-            if group_name in self.current_analysis.file_groups:
-                file_count = len(self.current_analysis.file_groups[group_name])
+            if group_name in self.current_analysis.groups:
+                file_count = len(self.current_analysis.groups[group_name])
                 item_text = f"📁 {folder_path} ({file_count} files)"
                 self.preview_list.addItem(item_text)
     
@@ -178,11 +184,15 @@ class SmartSortWidget(QWidget):
         preview_text += "Folder Structure:\n"
         
         for group_name, folder_path in suggestion["structure"].items():
-            if group_name in self.current_analysis.file_groups:
-                file_count = len(self.current_analysis.file_groups[group_name])
+            if group_name in self.current_analysis.groups:
+                file_count = len(self.current_analysis.groups[group_name])
                 preview_text += f"  📁 {folder_path}/\n"
                 preview_text += f"     ({file_count} files)\n"
         
+        # Dry run: sizes, renames vs. cross-drive copies, free space and duration
+        estimate = self.current_analysis.apply_structure(index, dry_run=True)
+        preview_text += f"\nEstimate:\n{estimate.summary()}"
+        
         QMessageBox.information(self, "Structure Preview", preview_text)
     
     def apply_suggestion(self):
@@ -206,6 +216,7 @@ class SmartSortWidget(QWidget):
                     self, "Success",
                     f"Created {len(result['created_folders'])} folder(s)\n"
                     f"Moved {result['moved_files']} file(s)"
+                    + (f"\n{len(result['failed'])} file(s) could not be moved" if result['failed'] else "")
                 )
                 self.analyze_files()
             except Exception as e:
@@ -213,8 +224,12 @@ class SmartSortWidget(QWidget):
     
     def analysis_finished(self):
         if self.current_analysis:
-            count = sum(len(files) for files in self.current_analysis.file_groups.values())
-            self.status_label.setText(f"Analysis complete: {count} files in {len(self.current_analysis.file_groups)} groups")
+            count = len(self.current_analysis.files)
+            status = f"Analysis complete: {count} files in {len(self.current_analysis.groups)} groups"
+            duplicates = self.current_analysis.duplicates
+            if duplicates is not None:
+                status += f", {len(duplicates)} duplicate set(s) wasting {format_bytes(duplicates.wasted_bytes)}"
+            self.status_label.setText(status)
         else:
             self.status_label.setText("Analysis failed")
     
@@ -0,0 +1,175 @@
+"""
+TimeHistogram - File counts and bytes per age bucket, in one pass
+Usage: from Smart_Sorter import TimeHistogram
+        histogram = TimeHistogram(folder_location)
+        print(histogram.summary())
+
+Instead of running TimeSort once per candidate threshold (one full walk
+each), a single walk sorts every file into age buckets, per top-level
+subfolder. Bucket edges are in days: the default (7, 30, 90, 365) gives
+"< 7 days", "7-30 days", ..., "365+ days"; log_buckets() gives doubling
+edges. older_than(days) at any edge then answers what TimeSort(days)
+would find (files only), without touching the disk again.
+"""
+
+import os
+import sys
+import time
+from bisect import bisect_right
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Sorter'))
+from walker import iter_entries
+from dry_run import format_bytes
+
+
+DEFAULT_BUCKETS = (7, 30, 90, 365)
+TIME_FIELDS = ("atime", "mtime", "ctime")
+
+# Files directly inside the scanned folder
+ROOT_GROUP = "."
+
+
+def log_buckets(max_days=3650, base=2):
+    """Log-scaled bucket edges: 1, 2, 4, ... days, up to max_days"""
+    if max_days < 1 or base <= 1:
+        raise ValueError("max_days must be at least 1 and base greater than 1")
+    edges = []
+    days = 1
+    while days <= max_days:
+        edges.append(days)
+        days *= base
+    return tuple(edges)
+
+
+class AgeHistogram:
+    """File counts and bytes per age bucket, for each top-level subfolder"""
+    def __init__(self, folder, edges, field="atime", now=None):
+        self.folder = folder
+        self.edges = tuple(edges)
+        self.field = field
+        self.now = time.time() if now is None else now
+        # Cutoff timestamps, oldest first; older than an edge means timestamp < now - edge, as in TimeSort
+        self._cutoffs = [self.now - days * 86400 for days in reversed(self.edges)]
+        # Subfolder name -> one value per bucket (len(edges) + 1 buckets, youngest first)
+        self.counts = {}
+        self.bytes = {}
+    
+    def __repr__(self):
+        return f"AgeHistogram(folders={len(self.counts)}, files={sum(self.totals()[0])}, field='{self.field}')"
+    
+    @property
+    def labels(self):
+        """Bucket labels, youngest first ("< 7 days", "7-30 days", ..., "365+ days")"""
+        if not self.edges:
+            return ["all"]
+        labels = [f"< {self.edges[0]} days"]
+        labels.extend(f"{low}-{high} days" for low, high in zip(self.edges, self.edges[1:]))
+        labels.append(f"{self.edges[-1]}+ days")
+        return labels
+    
+    def totals(self, folder=None):
+        """(counts, bytes) per bucket for one subfolder, or summed over all of them"""
+        if folder is not None:
+            return list(self.counts.get(folder, [])), list(self.bytes.get(folder, []))
+        buckets = len(self.edges) + 1
+        counts, sizes = [0] * buckets, [0] * buckets
+        for name in self.counts:
+            for bucket in range(buckets):
+                counts[bucket] += self.counts[name][bucket]
+                sizes[bucket] += self.bytes[name][bucket]
+        return counts, sizes
+    
+    def older_than(self, days, folder=None):
+        """
+        Files (and their bytes) older than days, as TimeSort(days) finds them for atime
+        
+        Args:
+            days (int): One of the bucket edges
+            folder (str): Only this top-level subfolder (default: None, all of them)
+        
+        Returns:
+            tuple: (count, bytes)
+        """
+        if days not in self.edges:
+            raise ValueError(f"{days} is not a bucket edge ({', '.join(map(str, self.edges))})")
+        first = self.edges.index(days) + 1
+        counts, sizes = self.totals(folder)
+        return sum(counts[first:]), sum(sizes[first:])
+    
+    def add(self, folder, timestamp, size):
+        """Count one file of size bytes with the given atime/mtime/ctime"""
+        counts = self.counts.get(folder)
+        if counts is None:
+            counts = self.counts[folder] = [0] * (len(self.edges) + 1)
+            self.bytes[folder] = [0] * (len(self.edges) + 1)
+        bucket = len(self._cutoffs) - bisect_right(self._cutoffs, timestamp)
+        counts[bucket] += 1
+        self.bytes[folder][bucket] += size
+    
+    def summary(self):
+        """Human-readable table of the totals per bucket"""
+        counts, sizes = self.totals()
+        lines = [f"{'Age':<16}{'Files':>10}{'Size':>12}"]
+        for label, count, size in zip(self.labels, counts, sizes):
+            lines.append(f"{label:<16}{count:>10}{format_bytes(size):>12}")
+        return "\n".join(lines)
+
+
+def TimeHistogram(folder_location, buckets=DEFAULT_BUCKETS, field="atime", max_workers=None, index=None,
+                  exclusions=None):
+    """
+    Count files and bytes per age bucket for each top-level subfolder, in a single walk
+    
+    Args:
+        folder_location (str): Path to scan
+        buckets (tuple): Ascending bucket edges in days (default: (7, 30, 90, 365); see log_buckets)
+        field (str): Age by "atime" (like TimeSort), "mtime" or "ctime" (default: "atime")
+        max_workers (int): Threads listing and stating directories in parallel (default: None, single thread)
+        index (FileIndex): Read sizes and times from a persistent file index instead of walking (default: None)
+        exclusions (ExclusionRules): Globs, ignore files and depth/symlink/mount limits; excluded folders are never listed (default: None)
+    
+    Returns:
+        AgeHistogram: counts/bytes per subfolder and bucket, with totals, older_than and summary
+    
+    Example:
+        histogram = TimeHistogram("C:/Users/Abu/Documents")
+        print(histogram.summary())
+        count, size = histogram.older_than(90)
+        print(f"TimeSort(90) would find {count} files ({size} bytes)")
+        
+        # Per subfolder, log-scaled
+        histogram = TimeHistogram("D:/Archive", buckets=log_buckets(3650), field="mtime")
+        for folder, counts in histogram.counts.items():
+            print(folder, counts)
+    """
+    if not os.path.exists(folder_location):
+        raise ValueError(f"Folder not found: {folder_location}")
+    if field not in TIME_FIELDS:
+        raise ValueError(f"Unknown time field: {field} (expected one of {', '.join(TIME_FIELDS)})")
+    if list(buckets) != sorted(set(buckets)) or any(days <= 0 for days in buckets):
+        raise ValueError("Bucket edges must be positive and strictly ascending")
+    
+    if index is not None:
+        if field == "ctime":
+            raise ValueError("The file index does not store ctime; scan without index")
+        entries = index.iter_entries(folder_location, include_dirs=False, max_workers=max_workers, exclusions=exclusions)
+    else:
+        entries = iter_entries(folder_location, include_dirs=False, max_workers=max_workers, with_stat=True,
+                               exclusions=exclusions)
+    
+    histogram = AgeHistogram(folder_location, buckets, field)
+    root = os.path.join(os.path.abspath(folder_location) if index is not None else folder_location, "")
+    attribute = f"st_{field}"
+    
+    for entry in entries:
+        try:
+            # DirEntry caches the stat result, so it is read only once
+            stat = entry.stat()
+        except OSError as e:
+            print(f"Error checking {entry.path}: {e}")
+            continue
+        relative = entry.path[len(root):]
+        separator = relative.find(os.sep)
+        histogram.add(relative[:separator] if separator >= 0 else ROOT_GROUP, getattr(stat, attribute), stat.st_size)
+    
+    return histogram
@@ -0,0 +1,193 @@
+"""
+TimeQuery - Find files by modified/changed/accessed time and size
+Usage: from Smart_Sorter import TimeQuery, older_than, larger_than
+        TimeQuery(folder_location, older_than(180) & larger_than(100 * 2**20))
+
+Predicates test the stat info read during the walk and combine with
+& (and), | (or) and ~ (not); cutoffs are computed once, when a predicate is
+built. Unlike TimeSort, which only looks at access times (often frozen on
+relatime/noatime mounts), any of mtime, ctime and atime can be used.
+
+With top=N only the N best matches are kept, in a bounded heap, so the
+full set of matches is never materialized.
+"""
+
+import heapq
+import os
+import sys
+import time
+from operator import attrgetter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Sorter'))
+from walker import iter_entries
+from result_store import ResultStore
+
+try:
+    from .time_sort import TimeSortResults
+except ImportError:
+    from time_sort import TimeSortResults
+
+
+TIME_FIELDS = ("mtime", "ctime", "atime")
+ORDER_FIELDS = ("size",) + TIME_FIELDS
+
+
+class Predicate:
+    """Test on an entry's stat result; combine with & (and), | (or) and ~ (not)"""
+    def __init__(self, test, description, fields):
+        self.test = test
+        self.description = description
+        # Stat fields the test reads (a FileIndex has no ctime)
+        self.fields = frozenset(fields)
+    
+    def __repr__(self):
+        return f"Predicate({self.description})"
+    
+    def __call__(self, stat):
+        return self.test(stat)
+    
+    def __and__(self, other):
+        first, second = self.test, other.test
+        return Predicate(lambda stat: first(stat) and second(stat),
+                         f"({self.description} & {other.description})", self.fields | other.fields)
+    
+    def __or__(self, other):
+        first, second = self.test, other.test
+        return Predicate(lambda stat: first(stat) or second(stat),
+                         f"({self.description} | {other.description})", self.fields | other.fields)
+    
+    def __invert__(self):
+        test = self.test
+        return Predicate(lambda stat: not test(stat), f"~{self.description}", self.fields)
+
+
+def _time_field(field):
+    if field not in TIME_FIELDS:
+        raise ValueError(f"Unknown time field: {field} (expected one of {', '.join(TIME_FIELDS)})")
+    return attrgetter(f"st_{field}")
+
+
+def older_than(days, field="mtime"):
+    """Entries whose mtime (or "ctime"/"atime") is more than days ago"""
+    value, cutoff = _time_field(field), time.time() - days * 86400
+    return Predicate(lambda stat: value(stat) < cutoff, f"{field} > {days}d ago", [field])
+
+
+def newer_than(days, field="mtime"):
+    """Entries whose mtime (or "ctime"/"atime") is within the last days"""
+    value, cutoff = _time_field(field), time.time() - days * 86400
+    return Predicate(lambda stat: value(stat) >= cutoff, f"{field} <= {days}d ago", [field])
+
+
+def larger_than(size):
+    """Entries of more than size bytes"""
+    return Predicate(lambda stat: stat.st_size > size, f"size > {size}", ["size"])
+
+
+def smaller_than(size):
+    """Entries of fewer than size bytes"""
+    return Predicate(lambda stat: stat.st_size < size, f"size < {size}", ["size"])
+
+
+def TimeQuery(folder_location, where, top=None, order_by="size", reverse=True, include_dirs=False,
+              max_workers=None, index=None, exclusions=None):
+    """
+    Find files whose stat info matches a predicate
+    
+    Args:
+        folder_location (str): Path to search in
+        where (Predicate): Combination of older_than/newer_than/larger_than/smaller_than
+        top (int): Keep only the N best matches, in order_by order (default: None, all matches in scan order)
+        order_by (str): "size", "mtime", "ctime" or "atime" when top is set (default: "size")
+        reverse (bool): Largest/newest first when top is set; False gives smallest/oldest (default: True)
+        include_dirs (bool): Also match folders (default: False)
+        max_workers (int): Threads listing and stating directories in parallel (default: None, single thread)
+        index (FileIndex): Answer the query from a persistent file index instead of walking (default: None)
+        exclusions (ExclusionRules): Globs, ignore files and depth/symlink/mount limits; excluded folders are never listed (default: None)
+    
+    Returns:
+        TimeSortResults: Matches with methods (delete, copy, move, get_details, hashes)
+    
+    Example:
+        # The 1000 largest files not modified in 180 days
+        results = TimeQuery("D:/Archive", older_than(180), top=1000)
+        
+        # Old and big, or never touched in two years
+        where = (older_than(90) & larger_than(2**30)) | older_than(730, "atime")
+        for item in TimeQuery("D:/Archive", where).get_details():
+            print(item["path"], item["size"])
+    """
+    if top is not None and top < 1:
+        raise ValueError("top must be at least 1")
+    if order_by not in ORDER_FIELDS:
+        raise ValueError(f"Unknown order: {order_by} (expected one of {', '.join(ORDER_FIELDS)})")
+    
+    results = ResultStore(with_stat=True)
+    matches = _iter_matches(folder_location, where, include_dirs, max_workers, index, exclusions,
+                            order_by if top is not None else None)
+    
+    if top is None:
+        for entry, stat in matches:
+            results.append(entry.path, entry.name, stat, entry.is_dir())
+        return TimeSortResults(results, None, folder_location, where)
+    
+    # Min-heap of the best N so far: (key, -position, ...) so earlier entries win ties
+    key = attrgetter(f"st_{order_by}")
+    sign = 1 if reverse else -1
+    heap = []
+    for position, (entry, stat) in enumerate(matches):
+        item = (sign * key(stat), -position, entry.path, entry.name, stat, entry.is_dir())
+        if len(heap) < top:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    
+    for _, _, path, name, stat, is_dir in sorted(heap, reverse=True):
+        results.append(path, name, stat, is_dir)
+    return TimeSortResults(results, None, folder_location, where)
+
+
+def iter_time_query(folder_location, where, include_dirs=False, max_workers=None, index=None, exclusions=None):
+    """
+    Find files whose stat info matches a predicate, yielding each path as soon as it is found
+    
+    Takes the same arguments as TimeQuery() (without top/order_by). Nothing is
+    collected, so memory stays flat.
+    
+    Example:
+        for path in iter_time_query("D:/Archive", older_than(365) & larger_than(2**20)):
+            print(path)
+    """
+    return (entry.path for entry, stat in _iter_matches(folder_location, where, include_dirs, max_workers, index,
+                                                        exclusions))
+
+
+def _iter_matches(folder_location, where, include_dirs, max_workers, index, exclusions=None, order_by=None):
+    """Validate arguments, then stream (entry, stat) for every match"""
+    if not os.path.exists(folder_location):
+        raise ValueError(f"Folder not found: {folder_location}")
+    if not isinstance(where, Predicate):
+        raise ValueError("where must be a Predicate (older_than, newer_than, larger_than, smaller_than)")
+    
+    if index is not None:
+        if "ctime" in where.fields or order_by == "ctime":
+            raise ValueError("The file index does not store ctime; query without index")
+        entries = index.iter_entries(folder_location, include_dirs=include_dirs, max_workers=max_workers,
+                                     exclusions=exclusions)
+    else:
+        entries = iter_entries(folder_location, include_dirs=include_dirs, max_workers=max_workers, with_stat=True,
+                               exclusions=exclusions)
+    
+    return _iter_matching(entries, where.test)
+
+
+def _iter_matching(entries, test):
+    for entry in entries:
+        try:
+            # DirEntry caches the stat result, so it is read only once
+            stat = entry.stat()
+        except OSError as e:
+            print(f"Error checking {entry.path}: {e}")
+            continue
+        if test(stat):
+            yield entry, stat
@@ -5,20 +5,97 @@ Usage: from Smart_Sorter import TimeSort
 """
 
 import os
+import sys
 import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
 from datetime import datetime, timedelta
 from pathlib import Path
+from stat import S_ISDIR
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Sorter'))
+from walker import iter_entries
+from result_store import ResultStore
+from bulk_ops import BulkExecutor
+from hash_cache import hash_files
 
-class TimeSortResults:
-    """Container for TimeSort results"""
-    def __init__(self, files, days, folder):
+
+DETAIL_SORT_KEYS = ("path", "atime", "mtime", "size")
+
+
+class TimeSortDetails(Sequence):
+    """Detail dicts built on access from the store's stat columns (no further stat calls)"""
+    def __init__(self, files, order=None, now=None):
         self.files = files
+        # Optional array of file IDs giving the row order (default: scan order)
+        self.order = order
+        self.now = time.time() if now is None else now
+    
+    def __repr__(self):
+        return f"TimeSortDetails(count={len(self)})"
+    
+    def __len__(self):
+        return len(self.files)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        file_id = self.order[index] if self.order is not None else index
+        files = self.files
+        last_access = files.atime[file_id]
+        if last_access != last_access:
+            # NaN: the row was stored without stat info (e.g. a file gone before it could be stat'ed)
+            last_accessed = days_ago = None
+        else:
+            last_accessed = datetime.fromtimestamp(last_access).strftime("%Y-%m-%d %H:%M:%S")
+            days_ago = round((self.now - last_access) / 86400, 1)
+        return {
+            "path": files[file_id],
+            "last_accessed": last_accessed,
+            "days_ago": days_ago,
+            "is_dir": files.is_dir[file_id] == 1,
+            "size": files.size[file_id]
+        }
+    
+    def remove_rows(self, rows):
+        """Drop rows (ascending) from the underlying store, keeping the order of the rest"""
+        if self.order is None:
+            self.files.remove_rows(rows)
+            return
+        removed = set(rows)
+        file_ids = sorted(self.order[row] for row in rows)
+        kept = [file_id for row, file_id in enumerate(self.order) if row not in removed]
+        self.files.remove_rows(file_ids)
+        self.order = array('I', (file_id - bisect_left(file_ids, file_id) for file_id in kept))
+    
+    def extend(self, entries):
+        """Append rows for DirEntry-style entries (e.g. new files reported by a watcher)"""
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except OSError:
+                stat = None
+            if self.order is not None:
+                self.order.append(len(self.files))
+            self.files.append(entry.path, entry.name, stat, entry.is_dir())
+
+
+class TimeSortResults:
+    """Container for TimeSort results (files is a ResultStore with size/atime/mtime/is_dir columns)"""
+    def __init__(self, files, days, folder, query=None):
+        self.files = files if isinstance(files, ResultStore) and files.with_stat else _stat_store(files)
         self.days = days
         self.folder = folder
-        self.cutoff_time = time.time() - (days * 86400)
+        # The Predicate for TimeQuery results (days is None then)
+        self.query = query
+        self.cutoff_time = time.time() - (days * 86400) if days is not None else None
     
     def __repr__(self):
+        if self.query is not None:
+            return f"TimeSortResults(found={len(self.files)}, query={self.query.description})"
         return f"TimeSortResults(found={len(self.files)}, days={self.days})"
     
     def __len__(self):
@@ -27,81 +104,79 @@ class TimeSortResults:
     def __iter__(self):
         return iter(self.files)
     
-    def get_details(self):
-        """Get detailed info about each file (path, last accessed, days ago)"""
-        details = []
-        for file_path in self.files:
-            try:
-                stat = os.stat(file_path)
-                last_access = stat.st_atime
-                days_ago = (time.time() - last_access) / 86400
-                last_access_date = datetime.fromtimestamp(last_access).strftime("%Y-%m-%d %H:%M:%S")
-                
-                details.append({
-                    "path": file_path,
-                    "last_accessed": last_access_date,
-                    "days_ago": round(days_ago, 1),
-                    "is_dir": os.path.isdir(file_path)
-                })
-            except Exception as e:
-                print(f"Error getting details for {file_path}: {e}")
+    def get_details(self, sort_by=None, reverse=False):
+        """
+        Get detailed info about each file (path, last accessed, days ago, is_dir, size)
+        
+        Everything comes from the stat info kept during the scan, so neither
+        this nor sorting touches the disk again.
+        
+        Args:
+            sort_by (str): Order rows by "path", "atime", "mtime" or "size" (default: None, scan order)
+            reverse (bool): Largest/newest/last first (default: False)
         
-        return details
+        Returns:
+            TimeSortDetails: Sequence of detail dicts, built as rows are read (last_accessed
+            and days_ago are None for rows stored without stat info)
+        """
+        order = None
+        if sort_by is not None:
+            if sort_by not in DETAIL_SORT_KEYS:
+                raise ValueError(f"Unknown sort key: {sort_by} (expected one of {', '.join(DETAIL_SORT_KEYS)})")
+            key = self.files.__getitem__ if sort_by == "path" else getattr(self.files, sort_by).__getitem__
+            order = array('I', sorted(range(len(self.files)), key=key, reverse=reverse))
+        return TimeSortDetails(self.files, order)
     
-    def delete(self):
-        """Delete all found files/folders"""
-        import shutil
-        deleted = 0
-        for file_path in self.files:
-            try:
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-                deleted += 1
-            except Exception as e:
-                print(f"Error deleting {file_path}: {e}")
-        return deleted
-    
-    def copy(self, destination):
-        """Copy all found files/folders to destination"""
-        import shutil
-        os.makedirs(destination, exist_ok=True)
-        copied = 0
-        for file_path in self.files:
-            try:
-                dest_path = os.path.join(destination, os.path.basename(file_path))
-                if os.path.isfile(file_path):
-                    shutil.copy2(file_path, dest_path)
-                elif os.path.isdir(file_path):
-                    shutil.copytree(file_path, dest_path)
-                copied += 1
-            except Exception as e:
-                print(f"Error copying {file_path}: {e}")
-        return copied
-    
-    def move(self, destination):
-        """Move all found files/folders to destination"""
-        import shutil
-        os.makedirs(destination, exist_ok=True)
-        moved = 0
-        for file_path in self.files:
-            try:
-                dest_path = os.path.join(destination, os.path.basename(file_path))
-                shutil.move(file_path, dest_path)
-                moved += 1
-            except Exception as e:
-                print(f"Error moving {file_path}: {e}")
-        return moved
+    def delete(self, max_workers=8, journal=None, dry_run=False):
+        """Delete all found files/folders in parallel; returns an OperationReport (DryRunReport if dry_run)"""
+        return BulkExecutor(max_workers).delete(self.files, journal, dry_run)
+    
+    def copy(self, destination, max_workers=8, policy="number", journal=None, dry_run=False):
+        """
+        Copy all found files/folders to destination in parallel
+        
+        Args:
+            destination (str): Folder to copy into
+            max_workers (int): Parallel operations (default: 8)
+            policy (str): Name collisions: "number", "mirror" (keep paths relative to the
+                searched folder), "skip" or "overwrite" (default: "number")
+            journal (str): Journal file, so the run can be resumed or undone (default: None)
+            dry_run (bool): Only estimate bytes, free space and duration; touch nothing (default: False)
+        
+        Returns:
+            OperationReport: succeeded, failed and skipped entries, bytes copied (DryRunReport if dry_run)
+        """
+        return BulkExecutor(max_workers).copy(self.files, destination, policy, self.folder, journal, dry_run)
+    
+    def move(self, destination, max_workers=8, policy="number", journal=None, dry_run=False):
+        """Move all found files/folders to destination in parallel (arguments as for copy)"""
+        return BulkExecutor(max_workers).move(self.files, destination, policy, self.folder, journal, dry_run)
+    
+    def hashes(self, max_workers=8, cache=None):
+        """
+        Content digests of all found files (folders are left out)
+        
+        Args:
+            max_workers (int): Files hashed in parallel (default: 8)
+            cache (HashCache): Digest cache (default: None, the shared cache in ~/.sorter);
+                files unchanged since they were last hashed are not read again
+        
+        Returns:
+            dict: path -> hex digest (BLAKE2b)
+        """
+        return hash_files(self.files, max_workers, cache)
 
 
-def TimeSort(folder_location, days):
+def TimeSort(folder_location, days, max_workers=None, index=None, exclusions=None):
     """
     Find all files/folders not accessed in X days
     
     Args:
         folder_location (str): Path to search in
         days (int): Number of days of inactivity
+        max_workers (int): Threads listing and stating directories in parallel (default: None, single thread)
+        index (FileIndex): Answer the query from a persistent file index instead of walking (default: None)
+        exclusions (ExclusionRules): Globs, ignore files and depth/symlink/mount limits; excluded folders are never listed (default: None)
     
     Returns:
         TimeSortResults: Object containing found files with methods (delete, copy, move, get_details)
@@ -115,9 +190,36 @@ def TimeSort(folder_location, days):
             print(f"{item['path']} - Last accessed: {item['last_accessed']} ({item['days_ago']} days ago)")
         
         # Delete old files
-        deleted = results.delete()
-        print(f"Deleted {deleted} items")
+        report = results.delete()
+        print(f"Deleted {len(report)} items, {len(report.failed)} failed")
     """
+    results = ResultStore(with_stat=True)
+    for entry in _old_entries(folder_location, days, max_workers, index, exclusions):
+        # Keep the stat info already read during the scan in the store's columns
+        results.append(entry.path, entry.name, entry.stat(), entry.is_dir())
+    
+    return TimeSortResults(results, days, folder_location)
+
+
+def iter_time_sort(folder_location, days, max_workers=None, index=None, exclusions=None):
+    """
+    Find files/folders not accessed in X days, yielding each one as soon as it is found
+    
+    Takes the same arguments as TimeSort(). Nothing is collected, so memory
+    stays flat, and the walk stops as soon as the caller stops iterating.
+    
+    Returns:
+        generator: Paths not accessed in X days, in the same order TimeSort() lists them
+    
+    Example:
+        for path in iter_time_sort("C:/Users/Abu/Documents", 365):
+            print(path)
+    """
+    return (entry.path for entry in _old_entries(folder_location, days, max_workers, index, exclusions))
+
+
+def _old_entries(folder_location, days, max_workers, index, exclusions=None):
+    """Validate arguments, then stream the entries not accessed in X days"""
     if not os.path.exists(folder_location):
         raise ValueError(f"Folder not found: {folder_location}")
     
@@ -125,27 +227,34 @@ def TimeSort(folder_location, days):
         raise ValueError("Days must be greater than 0")
     
     cutoff_time = time.time() - (days * 86400)
-    results = []
     
-    for root, dirs, files in os.walk(folder_location):
-        # Check directories
-        for dir_name in dirs:
-            dir_path = os.path.join(root, dir_name)
-            try:
-                stat = os.stat(dir_path)
-                if stat.st_atime < cutoff_time:
-                    results.append(dir_path)
-            except Exception as e:
-                print(f"Error checking {dir_path}: {e}")
-        
-        # Check files
-        for file_name in files:
-            file_path = os.path.join(root, file_name)
-            try:
-                stat = os.stat(file_path)
-                if stat.st_atime < cutoff_time:
-                    results.append(file_path)
-            except Exception as e:
-                print(f"Error checking {file_path}: {e}")
+    if index is not None:
+        entries = index.iter_entries(folder_location, max_workers=max_workers, exclusions=exclusions)
+    else:
+        entries = iter_entries(folder_location, max_workers=max_workers, with_stat=True, exclusions=exclusions)
     
-    return TimeSortResults(results, days, folder_location)
+    return _iter_not_accessed(entries, cutoff_time)
+
+
+def _iter_not_accessed(entries, cutoff_time):
+    for entry in entries:
+        try:
+            # DirEntry caches the stat result, so it is read only once
+            stat = entry.stat()
+            if stat.st_atime < cutoff_time:
+                yield entry
+        except Exception as e:
+            print(f"Error checking {entry.path}: {e}")
+
+
+def _stat_store(paths):
+    """ResultStore with stat columns for results given as plain paths (stats each one once)"""
+    store = ResultStore(with_stat=True)
+    for path in paths:
+        try:
+            info = os.stat(path)
+        except OSError as e:
+            print(f"Error getting details for {path}: {e}")
+            continue
+        store.append(path, stat=info, is_dir=S_ISDIR(info.st_mode))
+    return store
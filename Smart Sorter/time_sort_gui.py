@@ -4,17 +4,30 @@ TimeSort GUI - Find files not accessed in X days
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QPushButton,
-    QListWidget, QListWidgetItem, QFileDialog, QMessageBox
+    QFileDialog, QMessageBox, QComboBox
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QThread, QRectF, pyqtSignal
+from PyQt6.QtGui import QFont, QPainter, QColor
 import os
+import time
 from time_sort import TimeSort
+from time_histogram import TimeHistogram
+from dry_run import format_bytes
+from results_model import ResultsModel, ResultsView
+from bulk_ops import BulkExecutor
+from file_scanner import FolderWatcher
+from watcher import LiveResults, report_events
+
+
+def _detail_text(item):
+    if item['days_ago'] is None:
+        return f"{os.path.basename(item['path'])} (last access unknown)"
+    return f"{os.path.basename(item['path'])} ({item['days_ago']} days ago)"
 
 
 class TimeSortScanner(QThread):
     """Background thread for scanning files"""
-    results_found = pyqtSignal(list)
+    results_found = pyqtSignal(object)
     error_occurred = pyqtSignal(str)
     
     def __init__(self, folder_path, days):
@@ -25,20 +38,108 @@ class TimeSortScanner(QThread):
     def run(self):
         try:
             results = TimeSort(self.folder_path, self.days)
+            # A lazy view over the stat info read during the scan; rows are built as they are painted
             details = results.get_details()
             self.results_found.emit(details)
         except Exception as e:
             self.error_occurred.emit(str(e))
 
 
+class TimeSortHistogrammer(QThread):
+    """Background thread counting files per age bucket (one walk for every threshold)"""
+    histogram_ready = pyqtSignal(object)
+    error_occurred = pyqtSignal(str)
+    
+    def __init__(self, folder_path):
+        super().__init__()
+        self.folder_path = folder_path
+    
+    def run(self):
+        try:
+            self.histogram_ready.emit(TimeHistogram(self.folder_path))
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
+
+class AgeChart(QWidget):
+    """Bar chart of bytes per age bucket; clicking a bar picks its lower edge as the days threshold"""
+    threshold_picked = pyqtSignal(int)
+    
+    def __init__(self):
+        super().__init__()
+        self.histogram = None
+        self.folder = None
+        self.threshold = None
+        self.setMinimumHeight(140)
+        self.setToolTip("Click a bar to use its age as the threshold")
+    
+    def set_histogram(self, histogram, folder=None):
+        self.histogram = histogram
+        self.folder = folder
+        self.update()
+    
+    def set_threshold(self, days):
+        self.threshold = days
+        self.update()
+    
+    def _bar_width(self):
+        return self.width() / len(self.histogram.labels)
+    
+    def paintEvent(self, event):
+        if self.histogram is None:
+            return
+        
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        counts, sizes = self.histogram.totals(self.folder)
+        largest = max(sizes) if sizes and max(sizes) else 1
+        edges = (0,) + self.histogram.edges
+        width = self._bar_width()
+        text_height = self.fontMetrics().height()
+        chart_height = self.height() - 2 * text_height - 8
+        text_color = self.palette().windowText().color()
+        
+        for bucket, label in enumerate(self.histogram.labels):
+            x = bucket * width
+            height = chart_height * sizes[bucket] / largest if sizes else 0
+            if sizes and sizes[bucket]:
+                # Keep small but non-empty buckets visible
+                height = max(height, 2)
+            # Buckets the current threshold would select are highlighted
+            selected = self.threshold is not None and edges[bucket] >= self.threshold
+            color = QColor("#0d7377") if selected else QColor("#5a5a5a")
+            painter.fillRect(QRectF(x + 4, text_height + chart_height - height, width - 8, height), color)
+            
+            painter.setPen(text_color)
+            painter.drawText(QRectF(x, 0, width, text_height), Qt.AlignmentFlag.AlignCenter,
+                             format_bytes(sizes[bucket]) if sizes else "")
+            painter.drawText(QRectF(x, text_height + chart_height + 4, width, text_height),
+                             Qt.AlignmentFlag.AlignCenter, label)
+        painter.end()
+    
+    def mousePressEvent(self, event):
+        if self.histogram is None:
+            return
+        bucket = int(event.position().x() // self._bar_width())
+        if 0 < bucket <= len(self.histogram.edges):
+            self.threshold_picked.emit(self.histogram.edges[bucket - 1])
+
+
 class TimeSortWidget(QWidget):
     """TimeSort GUI Widget"""
     
     def __init__(self):
         super().__init__()
-        self.selected_files = set()
+        self.selected_files = []
         self.current_results = []
         self.scanner_thread = None
+        self.histogram_thread = None
+        self.histogram = None
+        # Watch the scanned folder so deletes, moves and outside changes need no rescan
+        self.watcher_thread = None
+        self.retired_watchers = []
+        self.live_results = None
+        self.pending_changes = []
         self.init_ui()
     
     def init_ui(self):
@@ -86,15 +187,45 @@ class TimeSortWidget(QWidget):
         scan_btn.setMinimumHeight(35)
         days_layout.addWidget(scan_btn)
         
+        chart_btn = QPushButton("📊 Age Chart")
+        chart_btn.setToolTip("Count files per age in one pass, to pick the number of days")
+        chart_btn.clicked.connect(self.chart_ages)
+        chart_btn.setMinimumHeight(35)
+        days_layout.addWidget(chart_btn)
+        
         days_layout.addStretch()
         layout.addLayout(days_layout)
         
+        # Age histogram (hidden until charted): pick the threshold without rescanning
+        chart_layout = QHBoxLayout()
+        self.chart_folder_combo = QComboBox()
+        self.chart_folder_combo.currentIndexChanged.connect(self.on_chart_folder_changed)
+        chart_layout.addWidget(self.chart_folder_combo)
+        self.chart_summary = QLabel("")
+        chart_layout.addWidget(self.chart_summary)
+        chart_layout.addStretch()
+        
+        self.age_chart = AgeChart()
+        self.age_chart.threshold_picked.connect(self.days_spinbox.setValue)
+        self.days_spinbox.valueChanged.connect(self.on_days_changed)
+        
+        self.chart_panel = QWidget()
+        chart_panel_layout = QVBoxLayout()
+        chart_panel_layout.setContentsMargins(0, 0, 0, 0)
+        chart_panel_layout.addLayout(chart_layout)
+        chart_panel_layout.addWidget(self.age_chart)
+        self.chart_panel.setLayout(chart_panel_layout)
+        self.chart_panel.hide()
+        layout.addWidget(self.chart_panel)
+        
         # Results
         results_label = QLabel("Results:")
         layout.addWidget(results_label)
         
-        self.results_list = QListWidget()
-        self.results_list.itemClicked.connect(self.on_item_clicked)
+        # Model/view list: rows are painted on demand, checks live in the model's bitset
+        self.results_model = ResultsModel(display=_detail_text, path_of=lambda item: item['path'])
+        self.results_list = ResultsView(self.results_model)
+        self.results_list.clicked.connect(self.on_item_clicked)
         layout.addWidget(self.results_list)
         
         # Status
@@ -116,6 +247,10 @@ class TimeSortWidget(QWidget):
         move_btn.clicked.connect(lambda: self.perform_action("move"))
         action_layout.addWidget(move_btn)
         
+        select_all_btn = QPushButton("Select All")
+        select_all_btn.clicked.connect(self.select_all)
+        action_layout.addWidget(select_all_btn)
+        
         clear_btn = QPushButton("Clear Selection")
         clear_btn.clicked.connect(self.clear_selection)
         action_layout.addWidget(clear_btn)
@@ -140,50 +275,133 @@ class TimeSortWidget(QWidget):
         days = self.days_spinbox.value()
         
         self.status_label.setText("Scanning...")
-        self.results_list.clear()
+        self.results_model.clear()
         self.selected_files.clear()
         
+        # Changes seen while scanning are applied once the results arrive
+        self.stop_watching()
+        self.live_results = None
+        self.pending_changes = []
+        self.cutoff_time = time.time() - days * 86400
+        self.watcher_thread = FolderWatcher(folder_path)
+        self.watcher_thread.changes_found.connect(self.apply_changes)
+        self.watcher_thread.start()
+        
         self.scanner_thread = TimeSortScanner(folder_path, days)
         self.scanner_thread.results_found.connect(self.display_results)
         self.scanner_thread.error_occurred.connect(self.handle_error)
         self.scanner_thread.finished.connect(self.scan_finished)
         self.scanner_thread.start()
     
+    def chart_ages(self):
+        folder = self.folder_label.text()
+        if folder == "No folder selected" or not folder.startswith("📂"):
+            QMessageBox.warning(self, "No Folder", "Please select a folder first.")
+            return
+        
+        self.status_label.setText("Counting files by age...")
+        self.histogram_thread = TimeSortHistogrammer(folder.replace("📂 ", ""))
+        self.histogram_thread.histogram_ready.connect(self.display_histogram)
+        self.histogram_thread.error_occurred.connect(self.handle_error)
+        self.histogram_thread.start()
+    
+    def display_histogram(self, histogram):
+        self.histogram = histogram
+        self.chart_folder_combo.blockSignals(True)
+        self.chart_folder_combo.clear()
+        self.chart_folder_combo.addItem("All folders", None)
+        for folder in sorted(histogram.counts):
+            self.chart_folder_combo.addItem(folder, folder)
+        self.chart_folder_combo.blockSignals(False)
+        
+        self.age_chart.set_histogram(histogram)
+        self.chart_panel.show()
+        self.on_days_changed(self.days_spinbox.value())
+        self.status_label.setText(f"Counted {sum(histogram.totals()[0])} file(s) by age")
+    
+    def on_chart_folder_changed(self, index):
+        if self.histogram is None or index < 0:
+            return
+        self.age_chart.set_histogram(self.histogram, self.chart_folder_combo.itemData(index))
+        self.on_days_changed(self.days_spinbox.value())
+    
+    def on_days_changed(self, days):
+        self.age_chart.set_threshold(days)
+        if self.histogram is None:
+            return
+        if days in self.histogram.edges:
+            count, size = self.histogram.older_than(days, self.age_chart.folder)
+            self.chart_summary.setText(f"Older than {days} days: {count} file(s), {format_bytes(size)}")
+        else:
+            self.chart_summary.setText("Click a bar to pick one of the chart's thresholds")
+    
     def display_results(self, details):
         self.current_results = details
-        for item in details:
-            display_text = f"{os.path.basename(item['path'])} ({item['days_ago']} days ago)"
-            list_item = QListWidgetItem(display_text)
-            list_item.setData(Qt.ItemDataRole.UserRole, item['path'])
-            list_item.setCheckState(Qt.CheckState.Unchecked)
-            self.results_list.addItem(list_item)
+        self.results_model.set_results(details)
+        cutoff_time = self.cutoff_time
+        self.live_results = LiveResults(details.files, self.scanner_thread.folder_path,
+                                        lambda entry: entry.stat().st_atime < cutoff_time)
+        events, self.pending_changes = self.pending_changes, []
+        if events:
+            self.apply_changes(events)
+    
+    def apply_changes(self, events):
+        """Bring the results in step with created, deleted and renamed files, without scanning again"""
+        if self.live_results is None:
+            self.pending_changes.extend(events)
+            return
+        
+        removed, added, renamed = self.live_results.changes(events)
+        self.results_model.remove_rows(removed)
+        self.results_model.append_results(added)
+        if renamed:
+            self.results_model.refresh()
+        
+        if self.live_results.stale:
+            self.status_label.setText("Some changes were missed; scan again to refresh the results")
+        elif removed or added or renamed:
+            self.status_label.setText(f"{len(self.current_results)} item(s), updated for {len(events)} change(s)")
+    
+    def stop_watching(self, wait=False):
+        """Stop watching the scanned folder; wait=True blocks until the watcher threads have ended"""
+        watcher = self.watcher_thread
+        self.watcher_thread = None
+        if watcher is not None and watcher.isRunning():
+            watcher.cancel()
+            watcher.changes_found.disconnect()
+            self.retired_watchers.append(watcher)
+            watcher.finished.connect(lambda: self.retired_watchers.remove(watcher))
+        if wait:
+            for retired in list(self.retired_watchers):
+                retired.wait()
     
     def scan_finished(self):
         count = len(self.current_results)
         self.status_label.setText(f"Found {count} item(s)")
     
     def handle_error(self, error):
+        if self.live_results is None:
+            self.stop_watching()
+            self.pending_changes = []
         QMessageBox.critical(self, "Error", f"Scan failed: {error}")
         self.status_label.setText("Error during scan")
     
-    def on_item_clicked(self, item):
-        if item.checkState() == Qt.CheckState.Unchecked:
-            item.setCheckState(Qt.CheckState.Checked)
-            self.selected_files.add(item.data(Qt.ItemDataRole.UserRole))
-        else:
-            item.setCheckState(Qt.CheckState.Unchecked)
-            self.selected_files.discard(item.data(Qt.ItemDataRole.UserRole))
+    def on_item_clicked(self, index):
+        self.results_model.toggle(index.row())
+    
+    def select_all(self):
+        self.results_model.set_all_checked(True)
     
     def clear_selection(self):
-        self.selected_files.clear()
-        for i in range(self.results_list.count()):
-            self.results_list.item(i).setCheckState(Qt.CheckState.Unchecked)
+        self.results_model.set_all_checked(False)
     
     def perform_action(self, action):
-        if not self.selected_files:
+        if not self.results_model.checked_count():
             QMessageBox.warning(self, "No Selection", "Please select files first.")
             return
         
+        self.selected_files = self.results_model.checked_paths()
+        
         if action == "delete":
             self.delete_files()
         elif action == "copy":
@@ -192,61 +410,43 @@ class TimeSortWidget(QWidget):
             self.move_files()
     
     def delete_files(self):
+        estimate = BulkExecutor().delete(self.selected_files, dry_run=True)
         reply = QMessageBox.question(
             self, "Confirm Delete",
-            f"Delete {len(self.selected_files)} file(s)? This cannot be undone.",
+            f"Delete {len(self.selected_files)} file(s)? This cannot be undone.\n\n{estimate.summary()}",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if reply == QMessageBox.StandardButton.Yes:
-            import shutil
-            deleted = 0
-            for file_path in self.selected_files:
-                try:
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
-                    elif os.path.isdir(file_path):
-                        shutil.rmtree(file_path)
-                    deleted += 1
-                except Exception as e:
-                    QMessageBox.warning(self, "Error", f"Failed to delete {file_path}: {str(e)}")
+            report = BulkExecutor().delete(self.selected_files)
+            if report.failed:
+                failures = "\n".join(f"{path}: {error}" for path, error in report.failed[:10])
+                QMessageBox.warning(self, "Error", f"Failed to delete {len(report.failed)} item(s):\n{failures}")
             
-            QMessageBox.information(self, "Success", f"Deleted {deleted} item(s)")
-            self.scan_files()
+            QMessageBox.information(self, "Success", f"Deleted {len(report)} item(s)")
+            self.apply_changes(report_events(report))
     
     def copy_files(self):
         dest_folder = QFileDialog.getExistingDirectory(self, "Select Destination Folder")
         if not dest_folder:
             return
         
-        import shutil
-        copied = 0
-        for file_path in self.selected_files:
-            try:
-                dest_path = os.path.join(dest_folder, os.path.basename(file_path))
-                if os.path.isfile(file_path):
-                    shutil.copy2(file_path, dest_path)
-                elif os.path.isdir(file_path):
-                    shutil.copytree(file_path, dest_path)
-                copied += 1
-            except Exception as e:
-                QMessageBox.warning(self, "Error", f"Failed to copy {file_path}: {str(e)}")
-        
-        QMessageBox.information(self, "Success", f"Copied {copied} item(s)")
+        report = BulkExecutor().copy(self.selected_files, dest_folder)
+        if report.failed:
+            failures = "\n".join(f"{path}: {error}" for path, error in report.failed[:10])
+            QMessageBox.warning(self, "Error", f"Failed to copy {len(report.failed)} item(s):\n{failures}")
+        
+        QMessageBox.information(self, "Success", f"Copied {len(report)} item(s)")
+        self.apply_changes(report_events(report))
     
     def move_files(self):
         dest_folder = QFileDialog.getExistingDirectory(self, "Select Destination Folder")
         if not dest_folder:
             return
         
-        import shutil
-        moved = 0
-        for file_path in self.selected_files:
-            try:
-                dest_path = os.path.join(dest_folder, os.path.basename(file_path))
-                shutil.move(file_path, dest_path)
-                moved += 1
-            except Exception as e:
-                QMessageBox.warning(self, "Error", f"Failed to move {file_path}: {str(e)}")
-        
-        QMessageBox.information(self, "Success", f"Moved {moved} item(s) to {dest_folder}")
-        self.scan_files()
+        report = BulkExecutor().move(self.selected_files, dest_folder)
+        if report.failed:
+            failures = "\n".join(f"{path}: {error}" for path, error in report.failed[:10])
+            QMessageBox.warning(self, "Error", f"Failed to move {len(report.failed)} item(s):\n{failures}")
+        
+        QMessageBox.information(self, "Success", f"Moved {len(report)} item(s) to {dest_folder}")
+        self.apply_changes(report_events(report))
@@ -0,0 +1,12 @@
+"""
+App paths - Where Sorter keeps its local data (file index, caches)
+"""
+
+import os
+
+
+def config_dir():
+    """Return the Sorter config directory, creating it if needed"""
+    path = os.environ.get("SORTER_CONFIG_DIR") or os.path.join(os.path.expanduser("~"), ".sorter")
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,86 @@
+"""
+Benchmark for case-insensitive keyword matching
+Run: python bench_matching.py [--names 1000000] [--keyword backups]
+
+Compares the old case-variant expansion (lower/upper/capitalize spellings,
+one substring test each) against casefold matching (fold the keyword and
+each name once, then one comparison) on a synthetic corpus of filenames.
+"""
+
+import argparse
+import random
+import string
+import time
+
+from matcher import KeywordMatcher
+
+
+def expand_case_variants(keyword, include_plural=True):
+    """The variant expansion sort.folder used before casefold matching"""
+    keywords = [keyword, keyword.lower(), keyword.upper(), keyword.capitalize()]
+    if include_plural and keyword.endswith('s'):
+        base = keyword[:-1]
+        keywords += [base, base.lower(), base.upper(), base.capitalize()]
+    return list(set(keywords))
+
+
+def make_corpus(count, keyword, seed=42):
+    """Synthetic filenames; about 1 in 20 contains the keyword in a random case"""
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "_- "
+    extensions = [".txt", ".pdf", ".jpg", ".docx", ".zip", ".log", ""]
+    names = []
+    for _ in range(count):
+        stem = "".join(rng.choice(alphabet) for _ in range(rng.randint(6, 28)))
+        if rng.random() < 0.05:
+            word = "".join(c.upper() if rng.random() < 0.5 else c for c in keyword)
+            cut = rng.randint(0, len(stem))
+            stem = stem[:cut] + word + stem[cut:]
+        names.append(stem + rng.choice(extensions))
+    return names
+
+
+def bench_variants(names, keyword):
+    variants = expand_case_variants(keyword)
+    comparisons = 0
+    found = 0
+    start = time.perf_counter()
+    for name in names:
+        for variant in variants:
+            comparisons += 1
+            if variant in name:
+                found += 1
+                break
+    return found, comparisons, time.perf_counter() - start
+
+
+def bench_casefold(names, keyword):
+    matcher = KeywordMatcher(keyword)
+    comparisons = 0
+    found = 0
+    start = time.perf_counter()
+    for name in names:
+        # One folded name, one search over all remaining variants
+        comparisons += 1
+        if matcher.matches(name):
+            found += 1
+    return found, comparisons, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Case-insensitive matching benchmark")
+    parser.add_argument("--names", type=int, default=1000000, help="corpus size (default: 1000000)")
+    parser.add_argument("--keyword", default="backups", help="keyword to search (default: backups)")
+    args = parser.parse_args()
+    
+    print(f"Generating {args.names:,} names...")
+    names = make_corpus(args.names, args.keyword)
+    
+    print(f"{'approach':<18}{'matches':>10}{'cmp/entry':>12}{'seconds':>10}")
+    for label, bench in (("case variants", bench_variants), ("casefold", bench_casefold)):
+        found, comparisons, elapsed = bench(names, args.keyword)
+        print(f"{label:<18}{found:>10,}{comparisons / len(names):>12.2f}{elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
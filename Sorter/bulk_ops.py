@@ -0,0 +1,740 @@
+"""
+Bulk operations - Parallel delete/copy/move for result sets
+Usage: from bulk_ops import BulkExecutor
+        report = BulkExecutor(max_workers=16).copy(results.files, "D:/Archive")
+        print(f"Copied {len(report)} items, {report.bytes} bytes, {len(report.failed)} failed")
+        report = BulkExecutor().move(results.files, "D:/Archive", policy="mirror", root=results.folder)
+
+Operations run on a thread pool (file I/O releases the GIL) with a cap on
+how many run against the same device at once, so a batch that spans a slow
+network share and a local disk keeps both busy without thrashing either.
+
+Destinations are planned before anything runs: name collisions are resolved
+by policy (numbering, mirroring the source tree, skip or overwrite) and all
+target folders are created in one pass.
+
+Moves are planned by device first: sources on the destination's device are
+renamed in place (no data copied), and only the rest are copied and removed.
+
+Journaled copies/moves can be undone. When a destination already exists
+(the "overwrite" policy), the files it replaces are backed up first, and
+undo takes back only what the run wrote before restoring them.
+"""
+
+import errno
+import os
+import shutil
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+
+try:
+    from .copy_engine import copy_file, copy_tree
+    from .dry_run import DryRunReport, load_throughput, record_throughput
+    from .journal import OperationJournal
+    from .walker import iter_entries
+except ImportError:
+    from copy_engine import copy_file, copy_tree
+    from dry_run import DryRunReport, load_throughput, record_throughput
+    from journal import OperationJournal
+    from walker import iter_entries
+
+
+COLLISION_POLICIES = ("number", "mirror", "skip", "overwrite")
+
+
+class OperationReport:
+    """Outcome of a bulk delete/copy/move"""
+    def __init__(self, action):
+        self.action = action
+        self.succeeded = []
+        self.failed = []
+        self.skipped = []
+        # Bytes copied (copies, cross-device moves) or freed by deleted files; deleted folders aren't sized
+        self.bytes = 0
+        self.elapsed = 0.0
+    
+    def __repr__(self):
+        return (f"OperationReport(action='{self.action}', succeeded={len(self.succeeded)}, "
+                f"failed={len(self.failed)}, skipped={len(self.skipped)}, bytes={self.bytes})")
+    
+    def __len__(self):
+        return len(self.succeeded)
+    
+    def __bool__(self):
+        return True
+
+
+def _tree_size(path):
+    """Bytes held by a file, or by every file below a directory"""
+    if not os.path.isdir(path) or os.path.islink(path):
+        return os.lstat(path).st_size
+    total = 0
+    for entry in iter_entries(path, include_dirs=False):
+        try:
+            total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass
+    return total
+
+
+def _is_real_dir(path):
+    return os.path.isdir(path) and not os.path.islink(path)
+
+
+def _counted(copied):
+    """copy_file that adds the size of each file it writes to copied[0], so no tree is sized up front"""
+    def copy(src, dst, follow_symlinks=True):
+        dst = copy_file(src, dst, follow_symlinks=follow_symlinks)
+        copied[0] += os.lstat(dst).st_size
+        return dst
+    return copy
+
+
+def _delete(source, destination):
+    # Folders are removed without walking them first just to size them; a dry run does that
+    if _is_real_dir(source):
+        shutil.rmtree(source)
+        return 0
+    size = os.lstat(source).st_size
+    os.remove(source)
+    return size
+
+
+def _copy(source, destination):
+    copied = [0]
+    if os.path.isdir(source):
+        # An existing destination folder only survives planning under "overwrite": merge into it
+        copy_tree(source, destination, dirs_exist_ok=os.path.isdir(destination), copy_function=_counted(copied))
+    else:
+        _counted(copied)(source, destination)
+    return copied[0]
+
+
+def _move(source, destination):
+    """Cross-device move: copy, then remove the source"""
+    copied = [0]
+    if _is_real_dir(source) and _is_real_dir(destination):
+        # A folder copy cut short by a crash (see resume), or a merge under "overwrite":
+        # shutil.move would nest the source inside it, so copy into it, then remove the source
+        copy_tree(source, destination, dirs_exist_ok=True, copy_function=_counted(copied))
+        shutil.rmtree(source)
+    else:
+        shutil.move(source, destination, copy_function=_counted(copied))
+    return copied[0]
+
+
+def _merge_into(source, destination):
+    """Same-device move of a folder into an existing one: rename each entry, merging subfolders both have"""
+    with os.scandir(source) as it:
+        entries = list(it)
+    for entry in entries:
+        target = os.path.join(destination, entry.name)
+        if entry.is_dir(follow_symlinks=False) and _is_real_dir(target):
+            _merge_into(entry.path, target)
+        else:
+            os.replace(entry.path, target)
+    os.rmdir(source)
+
+
+def _rename(source, destination):
+    """Same-device move: one atomic metadata update, no data copied"""
+    try:
+        if _is_real_dir(source) and _is_real_dir(destination):
+            # Only "overwrite" plans onto an existing folder: merge, as a cross-device move does
+            _merge_into(source, destination)
+        else:
+            os.replace(source, destination)
+    except OSError as e:
+        # Bind mounts can share st_dev yet refuse renames between them
+        if e.errno != errno.EXDEV:
+            raise
+        return _move(source, destination)
+    return 0
+
+
+def _remove(path):
+    if _is_real_dir(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+def _preserve(source, destination, backup):
+    """
+    List what a copy/move of source will write into an existing destination, backing up what it replaces
+    
+    Returns:
+        dict: "files" and "dirs" of the source tree, "replaced" (files that already exist at the
+        destination, now copied under backup) and "new_dirs" (folders the destination lacks),
+        all relative to the destination, "." being the destination itself
+    """
+    files, dirs = [], []
+    if _is_real_dir(source):
+        for folder, subdirs, names in os.walk(source):
+            relative = os.path.relpath(folder, source)
+            dirs.append(relative)
+            # Symlinked folders are not descended into; they land as links or copies of their own
+            links = [name for name in subdirs if os.path.islink(os.path.join(folder, name))]
+            files.extend(os.path.normpath(os.path.join(relative, name)) for name in names + links)
+    else:
+        files.append(os.curdir)
+    
+    replaced = []
+    for relative in files:
+        target = os.path.normpath(os.path.join(destination, relative))
+        if os.path.lexists(target) and not _is_real_dir(target):
+            copy = os.path.normpath(os.path.join(backup, relative))
+            os.makedirs(os.path.dirname(copy), exist_ok=True)
+            copy_file(target, copy, follow_symlinks=False)
+            replaced.append(relative)
+    new_dirs = [relative for relative in dirs if not os.path.lexists(os.path.join(destination, relative))]
+    return {"files": files, "dirs": dirs, "replaced": replaced, "new_dirs": new_dirs}
+
+
+def _restore(action, source, destination, kept, backup):
+    """Undo one copy/move onto an existing destination: take back what it wrote, then restore the backups"""
+    if action == "move":
+        for relative in kept["dirs"]:
+            os.makedirs(os.path.normpath(os.path.join(source, relative)), exist_ok=True)
+    for relative in kept["files"]:
+        path = os.path.normpath(os.path.join(destination, relative))
+        if not os.path.lexists(path):
+            continue
+        if action == "move":
+            target = os.path.normpath(os.path.join(source, relative))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            _rename(path, target)
+        else:
+            _remove(path)
+    for relative in kept["replaced"]:
+        copy = os.path.normpath(os.path.join(backup, relative))
+        if os.path.lexists(copy):
+            shutil.move(copy, os.path.normpath(os.path.join(destination, relative)))
+    for relative in reversed(kept["new_dirs"]):
+        try:
+            os.rmdir(os.path.normpath(os.path.join(destination, relative)))
+        except OSError:
+            pass
+    shutil.rmtree(backup, ignore_errors=True)
+
+
+_OPERATIONS = {"delete": _delete, "copy": _copy, "move": _move}
+
+# Same-device renames are cheap, so they are handed to the pool in batches
+RENAME_BATCH = 512
+
+# Runs smaller than this are too noisy to measure throughput from
+MEASURE_MIN_ITEMS = 20
+MEASURE_MIN_BYTES = 16 * 1024 * 1024
+
+
+def _existing_folder(path):
+    """Nearest folder at or above path that exists (where a new folder would be created)"""
+    path = os.path.abspath(path)
+    while not os.path.isdir(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def _covering_task(action, tasks):
+    """
+    For each task, the position of the task whose folder already contains its source
+    
+    Deleting or moving a folder takes everything inside it along, so nested
+    results ride on their outermost folder instead of racing it for the same files.
+    Copies only ride along when they would land where the folder copy puts them
+    (mirrored destinations); flat copies of nested results are separate copies.
+    """
+    positions = {os.path.abspath(source): position for position, (source, destination) in enumerate(tasks)}
+    covering = [None] * len(tasks)
+    for position, (source, destination) in enumerate(tasks):
+        path = os.path.abspath(source)
+        parent = os.path.dirname(path)
+        while parent != path:
+            if parent in positions:
+                covering[position] = positions[parent]
+            path, parent = parent, os.path.dirname(parent)
+        
+        outer = covering[position]
+        if action == "copy" and outer is not None:
+            relative = os.path.relpath(os.path.abspath(source), os.path.abspath(tasks[outer][0]))
+            if os.path.abspath(destination) != os.path.abspath(os.path.join(tasks[outer][1], relative)):
+                covering[position] = None
+    return covering
+
+
+def _numbered(name, taken):
+    """First "name (n).ext" not in taken (names compared with normcase)"""
+    stem, ext = os.path.splitext(name)
+    number = 1
+    while True:
+        candidate = f"{stem} ({number}){ext}"
+        if os.path.normcase(candidate) not in taken:
+            return candidate
+        number += 1
+
+
+def _create_folders(destinations):
+    """Create the folders destinations go in; return the ones that did not exist yet, parents first"""
+    created = []
+    for folder in sorted({os.path.dirname(destination) for destination in destinations}):
+        missing = []
+        path = folder
+        while path and not os.path.isdir(path):
+            missing.append(path)
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+        os.makedirs(folder, exist_ok=True)
+        created.extend(reversed(missing))
+    return created
+
+
+def plan_destinations(pairs, policy="number", root=None, create_folders=True):
+    """
+    Resolve a collision-free destination path for every source up front
+    
+    Each target folder is listed once, names are reserved as they are planned,
+    and every folder that will receive something is created in one pass, so
+    the operations themselves never hit an existing name.
+    
+    Args:
+        pairs (iterable): (source, target_folder) tuples
+        policy (str): What to do when a name is taken (default: "number")
+            "number"    - add " (1)", " (2)", ... before the extension
+            "mirror"    - recreate the source's path relative to root (numbering
+                          only if that exact path already exists)
+            "skip"      - leave the source where it is
+            "overwrite" - replace existing files and merge folders into existing folders
+                          of the same name (files both have are replaced); a file and a
+                          folder never replace each other (skipped); among sources
+                          sharing one name, the last one wins
+        root (str): Folder the results were found in, for "mirror"
+        create_folders (bool): Create the target folders (False for dry runs)
+    
+    Returns:
+        tuple: (tasks, skipped) - (source, destination) pairs and (source, reason) pairs
+    """
+    if policy not in COLLISION_POLICIES:
+        raise ValueError(f"Unknown collision policy: {policy}")
+    if policy == "mirror" and root is None:
+        raise ValueError("The mirror policy needs the root folder of the results")
+    
+    tasks = []
+    skipped = []
+    taken = {}
+    planned = {}
+    
+    for source, folder in pairs:
+        name = os.path.basename(source)
+        if policy == "mirror":
+            relative = os.path.relpath(os.path.abspath(source), os.path.abspath(root))
+            if relative != os.curdir and not relative.startswith(os.pardir):
+                folder, name = os.path.split(os.path.join(folder, relative))
+        
+        names = taken.get(folder)
+        if names is None:
+            try:
+                names = taken[folder] = {os.path.normcase(existing) for existing in os.listdir(folder)}
+            except OSError:
+                names = taken[folder] = set()
+        
+        key = os.path.normcase(name)
+        if key in names:
+            if policy == "skip":
+                skipped.append((source, f"Already exists: {os.path.join(folder, name)}"))
+                continue
+            if policy == "overwrite":
+                existing = os.path.join(folder, name)
+                if os.path.lexists(existing) and _is_real_dir(existing) != _is_real_dir(source):
+                    existing_kind, source_kind = ("folder", "file") if _is_real_dir(existing) else ("file", "folder")
+                    skipped.append((source, f"Can't overwrite a {existing_kind} with a {source_kind}: {existing}"))
+                    continue
+                earlier = planned.get(os.path.join(folder, key))
+                if earlier is not None:
+                    skipped.append((tasks[earlier][0], f"Overwritten by {source}"))
+                    tasks[earlier] = None
+            else:
+                name = _numbered(name, names)
+                key = os.path.normcase(name)
+        
+        names.add(key)
+        planned[os.path.join(folder, key)] = len(tasks)
+        tasks.append((source, os.path.join(folder, name)))
+    
+    tasks = [task for task in tasks if task is not None]
+    if create_folders:
+        _create_folders(destination for source, destination in tasks)
+    return tasks, skipped
+
+
+def _opened(journal):
+    """OperationJournal for a journal argument given as a path or a journal"""
+    return journal if isinstance(journal, OperationJournal) else OperationJournal(journal)
+
+
+class BulkExecutor:
+    """Thread pool for file operations with per-device concurrency limits"""
+    def __init__(self, max_workers=8, per_device=4):
+        if max_workers < 1 or per_device < 1:
+            raise ValueError("max_workers and per_device must be at least 1")
+        self.max_workers = max_workers
+        self.per_device = per_device
+        self._device_cache = {}
+        self._device_slots = {}
+        self._lock = threading.Lock()
+    
+    def __repr__(self):
+        return f"BulkExecutor(max_workers={self.max_workers}, per_device={self.per_device})"
+    
+    def delete(self, sources, journal=None, dry_run=False):
+        """Delete files/folders (journal: see journaled; dry_run: return a DryRunReport instead)"""
+        tasks = [(source, None) for source in sources]
+        if dry_run:
+            return self.dry_run("delete", tasks)
+        return self.journaled("delete", tasks, journal)
+    
+    def copy(self, sources, destination, policy="number", root=None, journal=None, dry_run=False):
+        """Copy files/folders into the destination folder (see plan_destinations for policy/root)"""
+        return self.transfer("copy", ((source, destination) for source in sources), policy, root, journal, dry_run)
+    
+    def move(self, sources, destination, policy="number", root=None, journal=None, dry_run=False):
+        """Move files/folders into the destination folder (see plan_destinations for policy/root)"""
+        return self.transfer("move", ((source, destination) for source in sources), policy, root, journal, dry_run)
+    
+    def transfer(self, action, pairs, policy="number", root=None, journal=None, dry_run=False):
+        """Plan collision-free destinations for (source, target_folder) pairs, then copy or move"""
+        # A journaled run creates the folders itself, recording which ones were new (see undo)
+        tasks, skipped = plan_destinations(pairs, policy, root, create_folders=not dry_run and journal is None)
+        if dry_run:
+            return self.dry_run(action, tasks, skipped)
+        report = self.journaled(action, tasks, journal)
+        report.skipped.extend(skipped)
+        return report
+    
+    def dry_run(self, action, tasks, skipped=()):
+        """
+        Estimate an action without touching any file
+        
+        Sizes are read (folders walked) on the pool, moves are split into
+        renames and cross-device copies, each destination device is checked
+        for free space, and the duration comes from measured throughput.
+        
+        Returns:
+            DryRunReport: count, bytes, renames, cross_device, free_space, estimated_seconds
+        """
+        if action not in _OPERATIONS:
+            raise ValueError(f"Unknown action: {action}")
+        
+        report = DryRunReport(action)
+        report.count = len(tasks)
+        report.skipped = list(skipped)
+        covering = _covering_task(action, tasks)
+        positions = [position for position in range(len(tasks)) if covering[position] is None]
+        
+        def measure(position):
+            try:
+                return _tree_size(tasks[position][0])
+            except OSError:
+                return None
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            sizes = list(pool.map(measure, positions))
+        
+        same_device = set(self._split_moves(tasks, positions)[0]) if action == "move" else set()
+        needed = {}
+        copied = 0
+        for position, size in zip(positions, sizes):
+            source, destination = tasks[position]
+            if size is None:
+                report.missing.append(source)
+                continue
+            report.bytes += size
+            if position in same_device:
+                report.renames += 1
+                continue
+            if action == "move":
+                report.cross_device += 1
+            if action != "delete":
+                copied += size
+                device = self._device(destination)
+                folder, total = needed.get(device, (_existing_folder(os.path.dirname(destination)), 0))
+                needed[device] = (folder, total + size)
+        
+        for folder, total in needed.values():
+            report.free_space.append((folder, total, shutil.disk_usage(folder).free))
+        
+        rates = load_throughput()
+        measured = len(positions) - len(report.missing)
+        if action == "delete":
+            report.estimated_seconds = measured / rates["delete"]
+        else:
+            report.estimated_seconds = report.renames / rates["rename"] + copied / rates["copy"]
+        return report
+    
+    def journaled(self, action, tasks, journal=None):
+        """
+        Run tasks, recording the plan and every finished entry in a journal
+        
+        Args:
+            action (str): "delete", "copy" or "move"
+            tasks (list): (source, destination) tuples
+            journal (str or OperationJournal): Journal file for resume/undo (default: None, no journal)
+        
+        Returns:
+            OperationReport: Outcome of the run
+        """
+        if journal is None:
+            return self.run(action, tasks)
+        
+        with _opened(journal) as log:
+            log.begin(action, tasks)
+            self._prepare(log)
+            report = self.run(action, log.tasks, log.recorder("done", range(len(log.tasks))))
+            log.end()
+        return report
+    
+    def resume(self, journal):
+        """
+        Finish an interrupted journaled run, touching only entries not yet done
+        
+        Returns:
+            OperationReport: Outcome of the remaining entries
+        """
+        with _opened(journal) as log:
+            if log.action is None:
+                raise ValueError(f"Journal has no plan: {log.path}")
+            
+            self._prepare(log)
+            done = self._finished_entries(log)
+            remaining = [index for index in range(len(log.tasks)) if index not in done]
+            if log.action in ("move", "delete"):
+                # Done lines lost in the last unsynced batch: the move or delete already happened
+                for index in list(remaining):
+                    source, destination = log.tasks[index]
+                    if not os.path.lexists(source) and (destination is None or os.path.lexists(destination)):
+                        log.write({"t": "done", "i": index})
+                        remaining.remove(index)
+            
+            report = self.run(log.action, [log.tasks[index] for index in remaining], log.recorder("done", remaining))
+            log.end()
+        return report
+    
+    def undo(self, journal):
+        """
+        Reverse a journaled copy/move, newest entries first
+        
+        Moves are moved back (renamed where possible), copies are deleted.
+        Where a destination already existed, only the files the run wrote are
+        taken back and the files it replaced are restored from their backups.
+        Undo is journaled too, so an interrupted undo can simply be run again.
+        
+        Returns:
+            OperationReport: Outcome of the reversal
+        """
+        with _opened(journal) as log:
+            if log.action not in ("copy", "move"):
+                raise ValueError(f"Cannot undo a {log.action or 'empty'} journal")
+            
+            covering = _covering_task(log.action, log.tasks)
+            indices = sorted((index for index in log.done
+                              if index not in log.undone and covering[index] is None), reverse=True)
+            whole = [index for index in indices if index not in log.kept]
+            
+            if log.action == "move":
+                for folder in sorted({os.path.dirname(log.tasks[index][0]) for index in whole}):
+                    os.makedirs(folder, exist_ok=True)
+                report = self.run("move", [(log.tasks[index][1], log.tasks[index][0]) for index in whole],
+                                  log.recorder("undo", whole))
+            else:
+                report = self.run("delete", [(log.tasks[index][1], None) for index in whole],
+                                  log.recorder("undo", whole))
+            
+            # Destinations that existed before the run: file by file, in this thread
+            for index in indices:
+                if index not in log.kept:
+                    continue
+                source, destination = log.tasks[index]
+                try:
+                    _restore(log.action, source, destination, log.kept[index], log.backup_folder(index))
+                except OSError as e:
+                    report.failed.append((destination, str(e)))
+                    continue
+                log.write({"t": "undo", "i": index})
+                report.succeeded.append((destination, source if log.action == "move" else None))
+            
+            # Drop the destination folders the run created, if nothing else landed there
+            for folder in reversed(log.folders):
+                try:
+                    os.rmdir(folder)
+                except OSError:
+                    pass
+        return report
+    
+    def _prepare(self, log):
+        """Create a copy/move's target folders and back up what it will replace, journaled before any file is touched"""
+        if log.action not in ("copy", "move") or log.prepared:
+            return
+        
+        for folder in _create_folders(destination for source, destination in log.tasks):
+            log.write({"t": "mkdir", "p": folder})
+        covering = _covering_task(log.action, log.tasks)
+        for index, (source, destination) in enumerate(log.tasks):
+            # Nested results land inside their folder's destination, which covers them
+            if index in log.kept or covering[index] is not None or not os.path.lexists(destination):
+                continue
+            record = _preserve(source, destination, log.backup_folder(index))
+            record.update(t="keep", i=index)
+            log.write(record)
+        log.write({"t": "ready"})
+        log.sync()
+    
+    def _finished_entries(self, log):
+        """Plan indices already done, directly or inside a folder that was done"""
+        covering = _covering_task(log.action, log.tasks)
+        return {index for index in range(len(log.tasks))
+                if index in log.done or (covering[index] is not None and covering[index] in log.done)}
+    
+    def run(self, action, tasks, on_result=None):
+        """
+        Run one action over many (source, destination) pairs
+        
+        Args:
+            action (str): "delete", "copy" or "move"
+            tasks (list): (source, destination) tuples, used as given; destination is None for delete
+            on_result (callable): Called as on_result(position, ok, error) from the worker threads
+        
+        Returns:
+            OperationReport: succeeded (source, destination) pairs, failed (source, error) pairs,
+                bytes deleted or copied (renamed files count no bytes)
+        """
+        if action not in _OPERATIONS:
+            raise ValueError(f"Unknown action: {action}")
+        
+        report = OperationReport(action)
+        outcomes = [None] * len(tasks)
+        covering = _covering_task(action, tasks)
+        start = time.monotonic()
+        
+        def work(operation, device, positions):
+            with self._slots(device):
+                for position in positions:
+                    try:
+                        outcomes[position] = (True, operation(*tasks[position]), None)
+                    except Exception as e:
+                        outcomes[position] = (False, 0, str(e))
+                    if on_result is not None:
+                        on_result(position, outcomes[position][0], outcomes[position][2])
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Interleave devices so a queue full of one slow device can't starve the others
+            for job in self._interleaved(self._jobs(action, tasks, covering)):
+                pool.submit(work, *job)
+        
+        for position, (source, destination) in enumerate(tasks):
+            outer = covering[position]
+            if outer is not None:
+                # Carried along by an enclosing folder; its bytes are already counted
+                ok, error = outcomes[outer][0], f"Enclosing folder failed: {tasks[outer][0]}"
+                if ok and destination is not None:
+                    relative = os.path.relpath(os.path.abspath(source), os.path.abspath(tasks[outer][0]))
+                    destination = os.path.join(tasks[outer][1], relative)
+                size = 0
+            else:
+                ok, size, error = outcomes[position]
+            if ok:
+                report.succeeded.append((source, destination))
+                report.bytes += size
+            else:
+                report.failed.append((source, error))
+        
+        report.elapsed = time.monotonic() - start
+        self._measure(action, tasks, covering, report)
+        return report
+    
+    def _measure(self, action, tasks, covering, report):
+        """Feed the run's throughput into the dry-run estimates"""
+        executed = sum(1 for outer in covering if outer is None)
+        if report.elapsed <= 0 or executed < MEASURE_MIN_ITEMS or report.failed:
+            return
+        if action == "delete":
+            record_throughput("delete", executed / report.elapsed)
+        elif report.bytes >= MEASURE_MIN_BYTES:
+            # Copies, and moves that had to copy across devices
+            record_throughput("copy", report.bytes / report.elapsed)
+        elif action == "move" and report.bytes == 0:
+            record_throughput("rename", executed / report.elapsed)
+    
+    def _slots(self, device):
+        """The one semaphore capping concurrent jobs on a device (created under the lock, so never twice)"""
+        with self._lock:
+            slots = self._device_slots.get(device)
+            if slots is None:
+                slots = self._device_slots[device] = threading.Semaphore(self.per_device)
+        return slots
+    
+    def _device(self, path):
+        """st_dev of the folder a path lives in (or will be created in), cached per folder"""
+        folder = os.path.dirname(os.path.abspath(path))
+        with self._lock:
+            device = self._device_cache.get(folder)
+        if device is None:
+            try:
+                device = os.stat(_existing_folder(folder)).st_dev
+            except OSError:
+                device = -1
+            with self._lock:
+                self._device_cache[folder] = device
+        return device
+    
+    def plan_moves(self, tasks):
+        """
+        Split (source, destination) move pairs by whether they can be renamed
+        
+        Returns:
+            tuple: (same_device, cross_device) lists of (source, destination) pairs
+        """
+        same_device, cross_device = self._split_moves(tasks, range(len(tasks)))
+        return [tasks[position] for position in same_device], [tasks[position] for position in cross_device]
+    
+    def _split_moves(self, tasks, positions):
+        same_device, cross_device = [], []
+        for position in positions:
+            source, destination = tasks[position]
+            if self._device(source) == self._device(destination) != -1:
+                same_device.append(position)
+            else:
+                cross_device.append(position)
+        return same_device, cross_device
+    
+    def _jobs(self, action, tasks, covering):
+        """(operation, device, positions) work items; nested results are left to their folder"""
+        positions = [position for position in range(len(tasks)) if covering[position] is None]
+        if action != "move":
+            operation = _OPERATIONS[action]
+            return [(operation, self._device(tasks[position][1] or tasks[position][0]), [position])
+                    for position in positions]
+        
+        same_device, cross_device = self._split_moves(tasks, positions)
+        jobs = [(_move, self._device(tasks[position][1]), [position]) for position in cross_device]
+        by_device = defaultdict(list)
+        for position in same_device:
+            by_device[self._device(tasks[position][1])].append(position)
+        for device, device_positions in by_device.items():
+            for first in range(0, len(device_positions), RENAME_BATCH):
+                jobs.append((_rename, device, device_positions[first:first + RENAME_BATCH]))
+        return jobs
+    
+    def _interleaved(self, jobs):
+        by_device = defaultdict(list)
+        for job in jobs:
+            by_device[job[1]].append(job)
+        for round_ in zip_longest(*by_device.values()):
+            yield from (job for job in round_ if job is not None)
@@ -0,0 +1,115 @@
+"""
+Dry run - Cost estimate for a bulk action, without touching any file
+Usage: from Sorter import sort
+        plan = sort.folder("C:/path", "backup").move("D:/Archive", dry_run=True)
+        print(plan.summary())
+
+Durations come from throughput measured on earlier real runs (stored in
+~/.sorter/throughput.json), so estimates track the actual disks and shares
+in use; until something has been measured, conservative defaults apply.
+"""
+
+import json
+import os
+import threading
+
+try:
+    from .app_paths import config_dir
+except ImportError:
+    from app_paths import config_dir
+
+
+# Defaults until a real run has been measured
+DEFAULT_THROUGHPUT = {
+    "copy": 100 * 1024 * 1024,   # bytes per second
+    "rename": 5000.0,            # items per second
+    "delete": 2000.0,            # items per second
+}
+
+_THROUGHPUT_FILE = "throughput.json"
+_lock = threading.Lock()
+
+
+def _measured():
+    try:
+        with open(os.path.join(config_dir(), _THROUGHPUT_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_throughput():
+    """Measured throughput per operation kind, falling back to the defaults"""
+    rates = dict(DEFAULT_THROUGHPUT)
+    rates.update(_measured())
+    return rates
+
+
+def record_throughput(kind, rate):
+    """Blend a newly measured rate into the stored one (moving average)"""
+    if rate <= 0:
+        return
+    with _lock:
+        measured = _measured()
+        measured[kind] = (measured[kind] + rate) / 2 if kind in measured else rate
+        with open(os.path.join(config_dir(), _THROUGHPUT_FILE), "w") as f:
+            json.dump(measured, f, indent=4)
+
+
+def format_bytes(count):
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if count < 1024 or unit == "TB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def format_duration(seconds):
+    if seconds < 1:
+        return "< 1 s"
+    if seconds < 60:
+        return f"{seconds:.0f} s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+class DryRunReport:
+    """What a bulk action would do and cost"""
+    def __init__(self, action):
+        self.action = action
+        self.count = 0
+        self.bytes = 0
+        self.renames = 0
+        self.cross_device = 0
+        self.missing = []
+        self.skipped = []
+        self.free_space = []
+        self.estimated_seconds = 0.0
+    
+    def __repr__(self):
+        return (f"DryRunReport(action='{self.action}', count={self.count}, bytes={self.bytes}, "
+                f"cross_device={self.cross_device}, fits={self.fits}, "
+                f"estimated_seconds={self.estimated_seconds:.1f})")
+    
+    def __len__(self):
+        return self.count
+    
+    @property
+    def fits(self):
+        """Whether every destination has room for the data written to it"""
+        return all(needed <= free for folder, needed, free in self.free_space)
+    
+    def summary(self):
+        """Human-readable summary (used by the GUI confirmations)"""
+        lines = [f"{self.count} item(s), {format_bytes(self.bytes)}"]
+        if self.action == "move":
+            lines.append(f"{self.renames} renamed in place, {self.cross_device} copied across drives")
+        for folder, needed, free in self.free_space:
+            status = "OK" if needed <= free else "NOT ENOUGH SPACE"
+            lines.append(f"{folder}: needs {format_bytes(needed)}, {format_bytes(free)} free - {status}")
+        if self.skipped:
+            lines.append(f"{len(self.skipped)} item(s) would be skipped")
+        if self.missing:
+            lines.append(f"{len(self.missing)} item(s) no longer exist")
+        lines.append(f"Estimated time: {format_duration(self.estimated_seconds)}")
+        return "\n".join(lines)
@@ -0,0 +1,247 @@
+"""
+Duplicates - Find files with identical contents
+Usage: from duplicates import find_duplicates
+        duplicates = find_duplicates(paths)
+        print(f"{len(duplicates)} sets, {duplicates.wasted_bytes} bytes wasted")
+        duplicates.move("D:/Duplicates")   # every copy but the first of each set
+
+Candidates are narrowed in stages, each cheaper than the next and each
+dropping every file left without a match:
+    1. size (free when the sizes were collected during the scan)
+    2. a hash of the first and last few KB
+    3. a full streaming hash of what remains
+A file with a unique size is never opened, and a file that differs from its
+same-size peers near either end is never read past its first and last block.
+Hashing runs on a thread pool, since reads release the GIL. With a
+HashCache, digests of unchanged files are read from the cache instead.
+"""
+
+import hashlib
+import os
+import stat
+from array import array
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from .bulk_ops import BulkExecutor
+    from .result_store import ResultStore
+except ImportError:
+    from bulk_ops import BulkExecutor
+    from result_store import ResultStore
+
+
+SAMPLE_SIZE = 4096          # bytes hashed at each end in stage 2
+CHUNK_SIZE = 1024 * 1024    # read size for the full hash
+DIGEST_SIZE = 20
+
+KEEP_POLICIES = ("first", "oldest", "newest")
+
+
+def file_digest(path):
+    """BLAKE2b digest of a file's whole contents, streamed through one buffer"""
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    buffer = memoryview(bytearray(CHUNK_SIZE))
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(buffer[:read])
+    return digest.digest()
+
+
+def sample_digest(path, size):
+    """Digest of the first and last SAMPLE_SIZE bytes (the whole file, i.e. file_digest, when that small)"""
+    with open(path, "rb", buffering=0) as f:
+        if size <= 2 * SAMPLE_SIZE:
+            return hashlib.blake2b(f.read(), digest_size=DIGEST_SIZE).digest()
+        digest = hashlib.blake2b(f.read(SAMPLE_SIZE), digest_size=DIGEST_SIZE)
+        f.seek(size - SAMPLE_SIZE)
+        digest.update(f.read(SAMPLE_SIZE))
+    return digest.digest()
+
+
+def _file_sizes(files, pool):
+    """Size of every file, from the store's size column when it has one (-1 = unknown or not a regular file)"""
+    if isinstance(files, ResultStore) and files.with_stat:
+        return files.size
+    
+    def size(path):
+        try:
+            info = os.lstat(path)
+        except OSError:
+            return -1
+        # Symlinks and folders are never candidates
+        return info.st_size if stat.S_ISREG(info.st_mode) else -1
+    return array('q', pool.map(size, files))
+
+
+def _split(candidates, files, digest, pool, errors):
+    """
+    Split each candidate set by digest, dropping files that end up alone
+    
+    Args:
+        candidates (list): (size, ids) sets whose members may be identical
+        digest (callable): digest(path, size) -> bytes
+    
+    Returns:
+        list: (size, ids, digest) for every set still holding two or more files
+    """
+    jobs = [(file_id, size) for size, ids in candidates for file_id in ids]
+    
+    def run(job):
+        file_id, size = job
+        path = files[file_id]
+        try:
+            return digest(path, size)
+        except OSError as e:
+            errors.append((path, str(e)))
+            return None
+    
+    # pool.map keeps input order, so files are read in the order they were found
+    refined = []
+    results = pool.map(run, jobs)
+    for size, ids in candidates:
+        by_digest = defaultdict(lambda: array('I'))
+        for file_id in ids:
+            value = next(results)
+            if value is not None:
+                by_digest[value].append(file_id)
+        refined.extend((size, members, value) for value, members in by_digest.items() if len(members) > 1)
+    return refined
+
+
+def find_duplicates(files, max_workers=8, min_size=1, cache=None):
+    """
+    Find sets of files with identical contents
+    
+    Args:
+        files: ResultStore (its size column is used when it has one) or a sequence of file paths
+        max_workers (int): Threads hashing files in parallel (default: 8)
+        min_size (int): Ignore files smaller than this many bytes; 1 skips empty files (default: 1)
+        cache (HashCache): Reuse digests of unchanged files from earlier runs (default: None, hash everything)
+    
+    Returns:
+        DuplicateResults: The duplicate sets, with methods (delete, move, redundant)
+    
+    Example:
+        results = sort.folder("D:/Photos", ".jpg")
+        duplicates = find_duplicates(results.files)
+        for paths in duplicates:
+            print(paths[0], "also at", paths[1:])
+        duplicates.delete()   # keeps the first file of each set
+        
+        # Repeat runs over the same archive only read new or changed files
+        with HashCache() as cache:
+            duplicates = find_duplicates(results.files, cache=cache)
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    if not isinstance(files, ResultStore):
+        files = ResultStore(files)
+    
+    sample, full = sample_digest, lambda path, size: file_digest(path)
+    if cache is not None:
+        sample, full = cache.sample_digest, lambda path, size: cache.file_digest(path)
+    
+    errors = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Stage 1: only sizes shared by two or more files can hold duplicates
+        by_size = defaultdict(lambda: array('I'))
+        for file_id, size in enumerate(_file_sizes(files, pool)):
+            if size >= min_size:
+                by_size[size].append(file_id)
+        candidates = [(size, ids) for size, ids in by_size.items() if len(ids) > 1]
+        del by_size
+        
+        # Stage 2: first and last block
+        sampled = _split(candidates, files, sample, pool, errors)
+        
+        # Stage 3: full contents; small files were already read whole in stage 2
+        done = [(size, ids, value) for size, ids, value in sampled if size <= 2 * SAMPLE_SIZE]
+        remaining = [(size, ids) for size, ids, value in sampled if size > 2 * SAMPLE_SIZE]
+        done.extend(_split(remaining, files, full, pool, errors))
+    
+    # Biggest savings first; each set keeps the order its files were found in
+    done.sort(key=lambda group: group[0] * (len(group[1]) - 1), reverse=True)
+    return DuplicateResults(files, [ids for size, ids, value in done],
+                            [size for size, ids, value in done], errors)
+
+
+class DuplicateResults:
+    """Sets of identical files (groups hold file IDs into files, a ResultStore)"""
+    def __init__(self, files, groups, sizes, errors=None):
+        self.files = files
+        self.groups = groups
+        self.sizes = sizes
+        self.errors = errors or []
+    
+    def __repr__(self):
+        return f"DuplicateResults(sets={len(self.groups)}, wasted_bytes={self.wasted_bytes})"
+    
+    def __len__(self):
+        return len(self.groups)
+    
+    def __iter__(self):
+        for ids in self.groups:
+            yield [self.files[file_id] for file_id in ids]
+    
+    @property
+    def wasted_bytes(self):
+        """Bytes freed by keeping a single copy of each set"""
+        return sum(size * (len(ids) - 1) for size, ids in zip(self.sizes, self.groups))
+    
+    def redundant_ids(self, keep="first"):
+        """
+        File IDs of every copy except the one kept from each set
+        
+        Args:
+            keep (str): Which copy to keep: "first" found, "oldest" or "newest" by modification time (default: "first")
+        """
+        if keep not in KEEP_POLICIES:
+            raise ValueError(f"Unknown keep policy: {keep} (expected one of {', '.join(KEEP_POLICIES)})")
+        
+        redundant = array('I')
+        for ids in self.groups:
+            kept = ids[0]
+            if keep != "first":
+                mtimes = {file_id: self._mtime(file_id) for file_id in ids}
+                pick = min if keep == "oldest" else max
+                kept = pick(ids, key=mtimes.__getitem__)
+            redundant.extend(file_id for file_id in ids if file_id != kept)
+        return redundant
+    
+    def redundant(self, keep="first"):
+        """Paths of every copy except the one kept from each set (see redundant_ids)"""
+        return [self.files[file_id] for file_id in self.redundant_ids(keep)]
+    
+    def _mtime(self, file_id):
+        if self.files.with_stat:
+            return self.files.mtime[file_id]
+        try:
+            return os.stat(self.files[file_id]).st_mtime
+        except OSError:
+            return float("inf")
+    
+    def delete(self, keep="first", max_workers=8, journal=None, dry_run=False):
+        """Delete the redundant copies in parallel; returns an OperationReport (DryRunReport if dry_run)"""
+        return BulkExecutor(max_workers).delete(self.redundant(keep), journal, dry_run)
+    
+    def move(self, destination, keep="first", max_workers=8, policy="number", root=None, journal=None, dry_run=False):
+        """
+        Move the redundant copies to destination in parallel
+        
+        Args:
+            destination (str): Folder to move into
+            keep (str): Which copy of each set stays in place (see redundant_ids) (default: "first")
+            max_workers (int): Parallel operations (default: 8)
+            policy (str): Name collisions: "number", "mirror" (needs root), "skip" or "overwrite" (default: "number")
+            root (str): Folder the "mirror" policy keeps paths relative to (default: None)
+            journal (str): Journal file, so the run can be resumed or undone (default: None)
+            dry_run (bool): Only estimate bytes, free space and duration; touch nothing (default: False)
+        
+        Returns:
+            OperationReport: succeeded, failed and skipped entries (DryRunReport if dry_run)
+        """
+        return BulkExecutor(max_workers).move(self.redundant(keep), destination, policy, root, journal, dry_run)
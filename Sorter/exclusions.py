@@ -0,0 +1,277 @@
+"""
+Exclusions - Shared rules for skipping subtrees in every scanner
+Usage: from exclusions import ExclusionRules
+        rules = ExclusionRules(["node_modules/", ".git/", "*.tmp"], max_depth=6, one_file_system=True)
+        results = sort.folder(folder_location, "backup", exclusions=rules)
+
+Patterns follow .gitignore rules: a pattern without a slash matches a name
+at any depth ("*.tmp", "node_modules"), one with a slash matches the path
+relative to the folder it was given for ("build/cache", "/snapshots"),
+a trailing slash matches folders only, "**" spans folders and a leading
+"!" re-includes what an earlier pattern excluded. Later patterns win.
+
+Ignore files (.sorterignore by default, ".gitignore" can be added) are
+read from every folder the walk lists and apply to everything below it.
+Excluded folders are pruned before they are listed, so a skipped
+node_modules costs one name comparison instead of a walk of its tree.
+"""
+
+import os
+import re
+
+
+IGNORE_FILE = ".sorterignore"
+
+# Names compare case-insensitively where the filesystem does
+_FLAGS = re.IGNORECASE if os.name == "nt" else 0
+
+
+def _glob_regex(pattern):
+    """Regex source for one glob: * and ? stay within a path component, ** spans them"""
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "]") else i + 1)
+            if end < 0:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = end
+        elif char == "\\" and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 1
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+
+class _PatternSet:
+    """Compiled patterns from one source (the rules' own list or one ignore file)"""
+    def __init__(self, patterns, base=""):
+        # base: folder the patterns were given for, relative to the walk's top ("" for the top)
+        self.base = base
+        self.rules = []
+        for line in patterns:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate or line.startswith("\\!") or line.startswith("\\#"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if line:
+                self.rules.append((negate, dir_only, anchored, _glob_regex(line)))
+        
+        # Without "!" patterns, order doesn't matter: one combined regex per target
+        self._combined = None
+        if not any(negate for negate, _, _, _ in self.rules):
+            self._combined = [self._compile([source for _, only, anchored, source in self.rules
+                                             if only == dir_only and anchored == on_path])
+                              for dir_only in (False, True) for on_path in (False, True)]
+        self.rules = [(negate, dir_only, anchored, re.compile(f"(?:{source})\\Z", _FLAGS).match)
+                      for negate, dir_only, anchored, source in self.rules]
+    
+    def __repr__(self):
+        return f"_PatternSet(base='{self.base}', rules={len(self.rules)})"
+    
+    @staticmethod
+    def _compile(sources):
+        if not sources:
+            return None
+        return re.compile("|".join(f"(?:{source})\\Z" for source in sources), _FLAGS).match
+    
+    def match(self, relative, name, is_dir):
+        """True if excluded, False if re-included, None if no pattern applies"""
+        path = relative[len(self.base) + 1:] if self.base else relative
+        if self._combined is not None:
+            names, paths, dir_names, dir_paths = self._combined
+            if (names and names(name)) or (paths and paths(path)):
+                return True
+            if is_dir and ((dir_names and dir_names(name)) or (dir_paths and dir_paths(path))):
+                return True
+            return None
+        
+        for negate, dir_only, anchored, matches in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if matches(path if anchored else name):
+                return not negate
+        return None
+
+
+class _Folder:
+    """Walk state of one listed folder: where it is and which pattern sets apply inside it"""
+    __slots__ = ("path", "relative", "depth", "patterns")
+    
+    def __init__(self, path, relative, depth, patterns):
+        self.path = path
+        self.relative = relative
+        self.depth = depth
+        self.patterns = patterns
+
+
+class ExclusionRules:
+    """Exclude globs, ignore files, depth, symlink and mount limits for a walk"""
+    def __init__(self, exclude=(), ignore_files=(IGNORE_FILE,), max_depth=None, follow_symlinks=False,
+                 one_file_system=False):
+        """
+        Args:
+            exclude (list): .gitignore-style patterns, relative to the walked folder (default: none)
+            ignore_files (tuple): File names read in each folder for more patterns (default: (".sorterignore",))
+            max_depth (int): Folder levels to descend below the walked folder; 0 lists only its own
+                entries (default: None, unlimited)
+            follow_symlinks (bool): Descend into symlinked folders, each real folder once (default: False)
+            one_file_system (bool): Don't descend into other drives or mount points (default: False)
+        """
+        if max_depth is not None and max_depth < 0:
+            raise ValueError("max_depth must be at least 0")
+        self.exclude = [exclude] if isinstance(exclude, str) else list(exclude)
+        self.ignore_files = tuple(ignore_files)
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+        self.one_file_system = one_file_system
+        self._patterns = _PatternSet(self.exclude)
+    
+    def __repr__(self):
+        return (f"ExclusionRules(exclude={self.exclude}, max_depth={self.max_depth}, "
+                f"follow_symlinks={self.follow_symlinks}, one_file_system={self.one_file_system})")
+    
+    def walker(self, top):
+        """Pruning state for one walk of top"""
+        return _Pruner(self, top)
+    
+    def filter_entries(self, top, entries):
+        """
+        Apply the rules to entries that were listed without them (e.g. from a FileIndex)
+        
+        Entries must come parents first, as a walk (or FileIndex.iter_entries) yields them,
+        and must include folders; ignore files are read from disk.
+        """
+        pruner = self.walker(top)
+        pruner.root.patterns = pruner.patterns_in(pruner.root)
+        folders = {pruner.root.path.rstrip(os.sep) or os.sep: pruner.root}
+        for entry in entries:
+            parent = folders.get(os.path.dirname(entry.path))
+            if parent is None:
+                # Below an excluded folder, or deeper than max_depth
+                continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if pruner.excluded(parent, entry.name, is_dir):
+                continue
+            # The index never lists below a symlinked folder, so it must not claim its target as visited
+            if is_dir and not entry.is_symlink():
+                for path, folder in pruner.subfolders(parent, [entry]):
+                    folder.patterns = pruner.patterns_in(folder)
+                    folders[path] = folder
+            yield entry
+
+
+class _Pruner:
+    """Rules bound to one walk: root device, visited folders and per-folder pattern stacks"""
+    def __init__(self, rules, top):
+        self.rules = rules
+        self._ignore_names = frozenset(rules.ignore_files)
+        self._visited = set()
+        self._root_device = None
+        if rules.one_file_system or rules.follow_symlinks:
+            info = os.stat(top)
+            self._root_device = info.st_dev
+            self._visited.add((info.st_dev, info.st_ino))
+        # Inherited patterns only; filter() or filter_entries() adds the top's own ignore files
+        self.root = _Folder(top, "", 0, (rules._patterns,))
+    
+    def patterns_in(self, folder, files=None):
+        """Pattern sets for a folder's entries: inherited ones plus its own ignore files"""
+        if not self._ignore_names:
+            return folder.patterns
+        if files is None:
+            names = self.rules.ignore_files
+        else:
+            names = [entry.name for entry in files if entry.name in self._ignore_names]
+        
+        local = []
+        for name in names:
+            try:
+                with open(os.path.join(folder.path, name), "r", encoding="utf-8", errors="replace") as f:
+                    local.append(_PatternSet(f.readlines(), folder.relative))
+            except OSError:
+                continue
+        return folder.patterns + tuple(local) if local else folder.patterns
+    
+    def excluded(self, folder, name, is_dir):
+        relative = f"{folder.relative}/{name}" if folder.relative else name
+        for patterns in reversed(folder.patterns):
+            result = patterns.match(relative, name, is_dir)
+            if result is not None:
+                return result
+        return False
+    
+    def filter(self, folder, dirs, files):
+        """Drop excluded entries from one listing (reads the folder's ignore files first)"""
+        folder.patterns = self.patterns_in(folder, files)
+        if len(folder.patterns) == 1 and not folder.patterns[0].rules:
+            return dirs, files
+        excluded = self.excluded
+        return ([entry for entry in dirs if not excluded(folder, entry.name, True)],
+                [entry for entry in files if not excluded(folder, entry.name, False)])
+    
+    def revisit(self, path):
+        """Let a folder already walked be listed again (it was moved, so the walk meets it twice)"""
+        try:
+            info = os.stat(path)
+        except OSError:
+            return
+        self._visited.discard((info.st_dev, info.st_ino))
+    
+    def subfolders(self, folder, dirs):
+        """(path, _Folder) for each kept folder to list next, within the depth/symlink/mount limits"""
+        rules = self.rules
+        depth = folder.depth + 1
+        if rules.max_depth is not None and depth > rules.max_depth:
+            return []
+        
+        subfolders = []
+        for entry in dirs:
+            if entry.is_symlink() or rules.one_file_system or rules.follow_symlinks:
+                if entry.is_symlink() and not rules.follow_symlinks:
+                    continue
+                try:
+                    # DirEntry.stat() lacks st_dev/st_ino on Windows, and index entries never have them
+                    info = entry.stat() if isinstance(entry, os.DirEntry) and os.name != "nt" else os.stat(entry.path)
+                except OSError:
+                    continue
+                if rules.one_file_system and info.st_dev != self._root_device:
+                    continue
+                if rules.follow_symlinks:
+                    # Symlink loops and folders reachable twice are listed once
+                    key = (info.st_dev, info.st_ino)
+                    if key in self._visited:
+                        continue
+                    self._visited.add(key)
+            relative = f"{folder.relative}/{entry.name}" if folder.relative else entry.name
+            subfolders.append((entry.path, _Folder(entry.path, relative, depth, folder.patterns)))
+        return subfolders
@@ -0,0 +1,429 @@
+"""
+FileIndex - Persistent SQLite index of folder contents
+Usage: from file_index import FileIndex
+        index = FileIndex()
+        index.refresh(folder_location)
+        results = sort.folder(folder_location, "backup", index=index)
+
+The index stores path, name, size, mtime, atime and is_dir for every entry
+below the indexed folders. refresh() stats each known directory and only
+re-lists the ones whose mtime changed, so repeat scans of a large, mostly
+unchanged tree cost one stat per directory instead of a full walk.
+
+Note that changing a file's contents or access time does not change its
+parent directory's mtime, so size/mtime/atime of existing files are as of
+the last time their directory was listed.
+
+With a watcher (see watcher.py), apply_events() keeps the entries current
+between refreshes: created, deleted and moved entries are updated in place
+instead of waiting for their folders to be re-listed.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from stat import S_ISDIR, S_ISLNK
+
+try:
+    from .app_paths import config_dir
+    from .walker import scan_directory
+except ImportError:
+    from app_paths import config_dir
+    from walker import scan_directory
+
+
+INDEX_FILENAME = "index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    is_link INTEGER NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    atime REAL
+);
+CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS roots (
+    path TEXT PRIMARY KEY,
+    refreshed REAL NOT NULL
+);
+"""
+
+IndexedStat = namedtuple("IndexedStat", ["st_size", "st_mtime", "st_atime"])
+
+
+class IndexedEntry:
+    """DirEntry-style record read back from the index"""
+    __slots__ = ("path", "name", "_is_dir", "_is_link", "_stat")
+    
+    def __init__(self, path, name, is_dir, is_link, stat):
+        self.path = path
+        self.name = name
+        self._is_dir = is_dir
+        self._is_link = is_link
+        self._stat = stat
+    
+    def __repr__(self):
+        return f"<IndexedEntry '{self.name}'>"
+    
+    def is_dir(self):
+        return self._is_dir
+    
+    def is_file(self):
+        return not self._is_dir
+    
+    def is_symlink(self):
+        return self._is_link
+    
+    def stat(self):
+        if self._stat is None:
+            raise FileNotFoundError(f"No such file or directory: '{self.path}'")
+        return self._stat
+
+
+def _subtree_bounds(top):
+    """Key range covering every path strictly below top"""
+    prefix = top if top.endswith(os.sep) else top + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+def _dir_mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _entry_row(parent, entry):
+    try:
+        is_dir = entry.is_dir()
+    except OSError:
+        is_dir = False
+    
+    try:
+        stat = entry.stat()
+        size, mtime, atime = stat.st_size, stat.st_mtime, stat.st_atime
+    except OSError:
+        size = mtime = atime = None
+    
+    return (entry.path, parent, entry.name, int(is_dir), int(entry.is_symlink()), size, mtime, atime)
+
+
+def _path_row(path):
+    """Entry row for a single path (e.g. one named in a watch event), or None if it is gone"""
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return None
+    
+    is_link = S_ISLNK(info.st_mode)
+    if is_link:
+        # Like DirEntry.stat(), describe the link's target
+        try:
+            info = os.stat(path)
+        except OSError:
+            info = None
+    
+    if info is None:
+        return (path, os.path.dirname(path), os.path.basename(path), 0, 1, None, None, None)
+    return (path, os.path.dirname(path), os.path.basename(path), int(S_ISDIR(info.st_mode)), int(is_link),
+            info.st_size, info.st_mtime, info.st_atime)
+
+
+class FileIndex:
+    """Persistent index of folder contents stored in a local SQLite file"""
+    def __init__(self, index_path=None, timeout=5.0):
+        """
+        Args:
+            index_path (str): SQLite file (default: None, index.sqlite3 in ~/.sorter)
+            timeout (float): Seconds to wait while another connection writes, e.g. a search
+                refreshing while a watcher applies events, before sqlite3.OperationalError (default: 5.0)
+        """
+        if index_path is None:
+            index_path = os.path.join(config_dir(), INDEX_FILENAME)
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(index_path, timeout=timeout, check_same_thread=False)
+        # Write-ahead log: reading the index never waits for a writer (or blocks one)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+    
+    def __repr__(self):
+        return f"FileIndex('{self.index_path}')"
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Close the underlying database"""
+        self._conn.close()
+    
+    def covers(self, folder_location):
+        """Check if folder_location lies inside an indexed folder"""
+        path = os.path.abspath(folder_location)
+        for (root,) in self._conn.execute("SELECT path FROM roots"):
+            if path == root or path.startswith(_subtree_bounds(root)[0]):
+                return True
+        return False
+    
+    def refresh(self, folder_location, max_workers=None, progress=None, interrupted=None, exclusions=None):
+        """
+        Bring the index for a folder up to date
+        
+        With exclusions, folders the rules exclude (or that lie past their depth
+        or mount limits) are never listed, and what was indexed below them is
+        dropped; the folder entries themselves stay. A search with other rules
+        should refresh with those rules first.
+        
+        Args:
+            folder_location (str): Folder to index
+            max_workers (int): Threads stating and listing directories (default: None, single thread)
+            progress (WalkProgress): directories counts every folder checked, entries every entry
+                re-listed (default: None)
+            interrupted (callable): Checked between folders; when it returns True the refresh stops,
+                keeping the folders already re-listed (default: None)
+            exclusions (ExclusionRules): Subtrees to prune before they are listed (default: None, everything)
+        
+        Returns:
+            int: Number of directories that had to be re-listed
+        """
+        top = os.path.abspath(folder_location)
+        if not os.path.isdir(top):
+            raise ValueError(f"Folder not found: {folder_location}")
+        
+        pool = ThreadPoolExecutor(max_workers=max_workers) if max_workers and max_workers > 1 else None
+        mapper = pool.map if pool else map
+        pruner = exclusions.walker(top) if exclusions is not None else None
+        relisted = 0
+        stopped = False
+        
+        try:
+            with self._lock, self._conn:
+                known = dict(self._conn.execute(
+                    "SELECT path, mtime_ns FROM dirs WHERE path = ? OR (path > ? AND path < ?)",
+                    (top,) + _subtree_bounds(top)
+                ))
+                
+                # Level by level: stat every known directory, re-list only the changed ones
+                level = [(top, pruner.root if pruner else None)]
+                while level and not stopped:
+                    changed = []
+                    next_level = []
+                    for (path, folder), mtime_ns in zip(level, mapper(_dir_mtime_ns, [path for path, _ in level])):
+                        if interrupted is not None and interrupted():
+                            stopped = True
+                            break
+                        if progress is not None:
+                            progress.directories += 1
+                        if mtime_ns is None:
+                            self._forget(path)
+                        elif known.get(path) == mtime_ns:
+                            dirs = self._iter_rows(self._conn.execute(
+                                "SELECT path, name, is_dir, is_link, size, mtime, atime FROM entries "
+                                "WHERE parent = ? AND is_dir = 1 AND is_link = 0", (path,)
+                            ).fetchall())
+                            next_level.extend(self._subfolders(pruner, folder, list(dirs)))
+                        else:
+                            changed.append((path, folder, mtime_ns))
+                    
+                    listings = mapper(lambda path: scan_directory(path, with_stat=True), [path for path, _, _ in changed])
+                    for (path, folder, mtime_ns), (dirs, files) in zip(changed, listings):
+                        if interrupted is not None and interrupted():
+                            stopped = True
+                            break
+                        walkable = set(self._store_listing(path, mtime_ns, dirs + files))
+                        subdirs = [entry for entry in dirs if entry.path in walkable]
+                        next_level.extend(self._subfolders(pruner, folder, subdirs, files))
+                        relisted += 1
+                        if progress is not None:
+                            progress.entries += len(dirs) + len(files)
+                    
+                    level = next_level
+                
+                # Each re-listed folder is complete on its own; only a finished refresh counts as indexed
+                if not stopped:
+                    self._conn.execute("INSERT OR REPLACE INTO roots VALUES (?, ?)", (top, time.time()))
+        finally:
+            if pool:
+                pool.shutdown()
+        
+        return relisted
+    
+    def _store_listing(self, path, mtime_ns, entries):
+        """Replace the children of one directory; return subdirectories to descend into"""
+        rows = [_entry_row(path, entry) for entry in entries]
+        # Children we can descend into; only those keep their indexed subtree
+        walkable = {row[0] for row in rows if row[3] and not row[4]}
+        current = {row[0] for row in rows}
+        
+        for child, was_walkable in self._conn.execute(
+            "SELECT path, is_dir AND NOT is_link FROM entries WHERE parent = ?", (path,)
+        ).fetchall():
+            if child not in current:
+                self._forget(child)
+            elif was_walkable and child not in walkable:
+                self._forget(child, keep_self=True)
+        
+        # Inserted in listing order (REPLACE gives each row a new rowid), which iter_entries reads back
+        self._conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?)", (path, mtime_ns))
+        return [row[0] for row in rows if row[0] in walkable]
+    
+    def _subfolders(self, pruner, folder, dirs, files=None):
+        """
+        (path, _Folder) for the subfolders of one folder to refresh next; without rules every one.
+        Folders the rules prune lose what was indexed below them, and are re-listed once refreshed without them
+        """
+        if pruner is None:
+            return [(entry.path, None) for entry in dirs]
+        if files is None:
+            # Listing unchanged: only its ignore files are read
+            folder.patterns = pruner.patterns_in(folder)
+            kept = [entry for entry in dirs if not pruner.excluded(folder, entry.name, True)]
+        else:
+            kept, _ = pruner.filter(folder, dirs, files)
+        
+        subfolders = pruner.subfolders(folder, kept)
+        listed = {path for path, _ in subfolders}
+        for entry in dirs:
+            if entry.path not in listed:
+                self._forget(entry.path, keep_self=True)
+                self._conn.execute("DELETE FROM dirs WHERE path = ?", (entry.path,))
+        return subfolders
+    
+    def _forget(self, path, keep_self=False):
+        """Remove an entry and everything indexed below it"""
+        low, high = _subtree_bounds(path)
+        self._conn.execute("DELETE FROM entries WHERE path > ? AND path < ?", (low, high))
+        self._conn.execute("DELETE FROM dirs WHERE path > ? AND path < ?", (low, high))
+        if not keep_self:
+            self._conn.execute("DELETE FROM entries WHERE path = ?", (path,))
+            self._conn.execute("DELETE FROM dirs WHERE path = ?", (path,))
+    
+    def apply_events(self, events):
+        """
+        Apply watcher events to the indexed entries, without re-listing anything
+        
+        Created entries are stat'ed once, deleted ones are dropped with everything
+        below them and moved folders keep their indexed subtree under the new path.
+        Parent folders are not marked as listed, so the next refresh() still
+        re-lists the ones whose mtime changed. After an "overflow" (events were
+        lost) the next refresh() re-lists every folder below the watched one.
+        
+        Args:
+            events (list): WatchEvent tuples from a watcher (see watcher.py)
+        
+        Returns:
+            int: Number of events that touched the index (the rest lie outside every indexed folder)
+        """
+        applied = 0
+        with self._lock, self._conn:
+            roots = [row[0] for row in self._conn.execute("SELECT path FROM roots")]
+            
+            def indexed(path):
+                return any(path.startswith(_subtree_bounds(root)[0]) for root in roots)
+            
+            for event in events:
+                path = os.path.abspath(event.path)
+                if event.kind == "overflow":
+                    self._conn.execute("UPDATE dirs SET mtime_ns = -1 WHERE path = ? OR (path > ? AND path < ?)",
+                                       (path,) + _subtree_bounds(path))
+                    applied += 1
+                    continue
+                
+                dest_path = os.path.abspath(event.dest_path) if event.dest_path is not None else None
+                if event.kind == "moved" and indexed(path) and indexed(dest_path):
+                    self._move(path, dest_path)
+                elif event.kind in ("deleted", "moved") and indexed(path):
+                    self._forget(path)
+                elif event.kind in ("created", "moved"):
+                    created = path if event.kind == "created" else dest_path
+                    row = _path_row(created) if indexed(created) else None
+                    if row is None:
+                        continue
+                    self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+                else:
+                    continue
+                applied += 1
+        return applied
+    
+    def _move(self, path, dest_path):
+        """Re-key an entry and everything indexed below it to a new path"""
+        self._forget(dest_path)
+        low, high = _subtree_bounds(path)
+        start = len(path) + 1
+        self._conn.execute(
+            "UPDATE entries SET path = ? || substr(path, ?), parent = ? || substr(parent, ?) WHERE path > ? AND path < ?",
+            (dest_path, start, dest_path, start, low, high)
+        )
+        self._conn.execute("UPDATE dirs SET path = ? || substr(path, ?) WHERE path > ? AND path < ?",
+                           (dest_path, start, low, high))
+        self._conn.execute("UPDATE dirs SET path = ? WHERE path = ?", (dest_path, path))
+        self._conn.execute("DELETE FROM entries WHERE path = ?", (path,))
+        # The entry itself gets a new name and parent; stat it again
+        row = _path_row(dest_path)
+        if row is not None:
+            self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+    
+    def iter_entries(self, folder_location, include_dirs=True, include_files=True, max_workers=None, exclusions=None):
+        """
+        Yield indexed entries below a folder, refreshing it first if it was never indexed
+        
+        Args:
+            folder_location (str): Folder to read from the index
+            include_dirs (bool): Yield directory entries (default: True)
+            include_files (bool): Yield file entries (default: True)
+            max_workers (int): Threads used if an initial refresh is needed (default: None)
+            exclusions (ExclusionRules): Entries and subtrees to leave out; they also prune the initial
+                refresh, if one is needed (default: None)
+        
+        Yields:
+            IndexedEntry: Entry with name, path, type and cached stat info, in the order
+            walker.iter_entries lists the folder, so results don't depend on using the index
+        """
+        if not self.covers(folder_location):
+            self.refresh(folder_location, max_workers, exclusions=exclusions)
+        
+        top = os.path.abspath(folder_location)
+        entries = self._iter_walk(top)
+        if exclusions is not None:
+            entries = exclusions.filter_entries(top, entries)
+        
+        for entry in entries:
+            if entry.is_dir():
+                if include_dirs:
+                    yield entry
+            elif include_files:
+                yield entry
+    
+    def _iter_walk(self, top):
+        """
+        Every indexed entry below top, depth-first like the walker: each folder's subfolders,
+        then its files (each in listing order, which the rowids keep), then the subfolders' contents
+        """
+        query = ("SELECT path, name, is_dir, is_link, size, mtime, atime FROM entries "
+                 "WHERE parent = ? ORDER BY is_dir DESC, rowid")
+        stack = [top]
+        while stack:
+            entries = list(self._iter_rows(self._conn.execute(query, (stack.pop(),))))
+            yield from entries
+            stack.extend(reversed([entry.path for entry in entries if entry.is_dir() and not entry.is_symlink()]))
+    
+    @staticmethod
+    def _iter_rows(rows):
+        for path, name, is_dir, is_link, size, mtime, atime in rows:
+            stat = IndexedStat(size, mtime, atime) if size is not None else None
+            yield IndexedEntry(path, name, bool(is_dir), bool(is_link), stat)
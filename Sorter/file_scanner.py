@@ -1,56 +1,151 @@
-import os
+import sqlite3
+import time
 from pathlib import Path
 from PyQt6.QtCore import QThread, pyqtSignal
+from walker import iter_entries, WalkProgress
+from file_index import FileIndex
+from matcher import KeywordMatcher
+from watcher import open_watcher
 
 
 class FileScanner(QThread):
+    """Background keyword search that streams results in batches and can be stopped"""
     results_found = pyqtSignal(list)
+    progress_updated = pyqtSignal(int, int, int)
     
-    def __init__(self, root_path, keyword, case_sensitive=False, include_plural=True):
+    def __init__(self, root_path, keyword, case_sensitive=False, include_plural=True, max_workers=None, use_index=False,
+                 batch_size=500, batch_interval=0.25, exclusions=None):
         super().__init__()
         self.root_path = root_path
         self.keyword = keyword
         self.case_sensitive = case_sensitive
         self.include_plural = include_plural
-        self.results = []
+        self.max_workers = max_workers
+        self.use_index = use_index
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.exclusions = exclusions
+        # Only a count: the matched paths live in the view's ResultStore
+        self.found = 0
+        self.cancelled = False
     
     def run(self):
-        self.results = []
-        search_keywords = self.generate_search_keywords()
+        self.found = 0
+        self.cancelled = False
+        matcher = KeywordMatcher(self.keyword, self.case_sensitive, self.include_plural)
+        progress = WalkProgress()
         
-        for root, dirs, files in os.walk(self.root_path):
-            # Search in directories
-            for dir_name in dirs:
-                if self.matches_keyword(dir_name, search_keywords):
-                    self.results.append(os.path.join(root, dir_name))
-            
-            # Search in files
-            for file_name in files:
-                if self.matches_keyword(file_name, search_keywords):
-                    self.results.append(os.path.join(root, file_name))
+        if self.use_index:
+            # Incremental refresh only re-lists folders that changed since the last search
+            with FileIndex() as index:
+                index.refresh(self.root_path, self.max_workers, progress, self.refresh_interrupted(progress),
+                              self.exclusions)
+                if self.isInterruptionRequested():
+                    self.cancelled = True
+                    self.flush([], progress.directories, 0)
+                    return
+                self.collect(index.iter_entries(self.root_path, exclusions=self.exclusions), matcher, progress)
+        else:
+            entries = iter_entries(self.root_path, max_workers=self.max_workers, progress=progress, exclusions=self.exclusions)
+            self.collect(entries, matcher, progress)
+    
+    def cancel(self):
+        """Ask the scan to stop; it finishes after the entry it is on"""
+        self.requestInterruption()
+    
+    def refresh_interrupted(self, progress):
+        """Stop check for FileIndex.refresh, which also reports the folders checked every batch_interval"""
+        last_emit = [time.monotonic()]
         
-        self.results_found.emit(self.results)
+        def interrupted():
+            now = time.monotonic()
+            if now - last_emit[0] >= self.batch_interval:
+                self.progress_updated.emit(progress.directories, 0, 0)
+                last_emit[0] = now
+            return self.isInterruptionRequested()
+        return interrupted
     
-    def generate_search_keywords(self):
-        keywords = [self.keyword]
+    def collect(self, entries, matcher, progress):
+        # results_found carries one batch at a time: every batch_size matches or batch_interval seconds
+        batch = []
+        seen = 0
+        last_emit = time.monotonic()
         
-        if not self.case_sensitive:
-            keywords.append(self.keyword.lower())
-            keywords.append(self.keyword.upper())
-            keywords.append(self.keyword.capitalize())
+        for entry in entries:
+            if self.isInterruptionRequested():
+                self.cancelled = True
+                break
+            
+            seen += 1
+            if matcher.matches(entry.name):
+                batch.append(entry.path)
+            
+            now = time.monotonic()
+            if len(batch) >= self.batch_size or now - last_emit >= self.batch_interval:
+                self.flush(batch, progress.directories, seen)
+                batch = []
+                last_emit = now
         
-        if self.include_plural and self.keyword.endswith('s'):
-            base = self.keyword[:-1]
-            keywords.append(base)
-            if not self.case_sensitive:
-                keywords.append(base.lower())
-                keywords.append(base.upper())
-                keywords.append(base.capitalize())
+        self.flush(batch, progress.directories, seen)
+    
+    def flush(self, batch, directories, seen):
+        if batch:
+            self.found += len(batch)
+            self.results_found.emit(batch)
+        self.progress_updated.emit(directories, seen, self.found)
+
+
+class FolderWatcher(QThread):
+    """Background watch of a searched folder that streams create/delete/rename events in batches"""
+    changes_found = pyqtSignal(list)
+    
+    def __init__(self, root_path, exclusions=None, use_index=False, batch_interval=0.5):
+        super().__init__()
+        self.root_path = root_path
+        self.exclusions = exclusions
+        self.use_index = use_index
+        self.batch_interval = batch_interval
+    
+    def run(self):
+        try:
+            watcher = open_watcher(self.root_path, self.exclusions)
+        except (OSError, ValueError) as e:
+            print(f"Error watching {self.root_path}: {e}")
+            return
         
-        return list(set(keywords))
+        # The index is updated here, so its writes stay off the GUI thread; while a search
+        # holds it for a refresh, events wait in unindexed and are retried every batch
+        index = FileIndex(timeout=self.batch_interval) if self.use_index else None
+        unindexed = []
+        try:
+            while not self.isInterruptionRequested():
+                events = watcher.read(self.batch_interval)
+                if events:
+                    # A burst (e.g. a bulk move) is collected into one batch, so views update once
+                    deadline = time.monotonic() + self.batch_interval
+                    while not self.isInterruptionRequested() and time.monotonic() < deadline:
+                        events.extend(watcher.read(max(deadline - time.monotonic(), 0)))
+                    self.changes_found.emit(events)
+                    if index is not None:
+                        unindexed.extend(events)
+                if unindexed:
+                    unindexed = self.update_index(index, unindexed)
+        finally:
+            watcher.close()
+            if index is not None:
+                index.close()
+    
+    def update_index(self, index, events):
+        """Apply events to the index; returns the ones to retry (all of them if it was busy)"""
+        try:
+            index.apply_events(events)
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                print(f"Error updating index: {e}")
+                return []
+            return events
+        return []
     
-    def matches_keyword(self, name, keywords):
-        for keyword in keywords:
-            if keyword in name:
-                return True
-        return False
+    def cancel(self):
+        """Ask the watch to stop; it finishes within batch_interval seconds"""
+        self.requestInterruption()
@@ -0,0 +1,186 @@
+"""
+Hash cache - Persistent SQLite cache of file content digests
+Usage: from hash_cache import HashCache
+        with HashCache() as cache:
+            digest = cache.file_digest("D:/Photos/IMG_0001.jpg")
+
+Digests are keyed by device and inode and validated by size and mtime_ns,
+so a file that was renamed or moved within its drive keeps its entry, and
+any change to its contents (which updates mtime) invalidates it. Unchanged
+files are never read again across runs.
+
+The cache lives in ~/.sorter/hashes.sqlite3 and is bounded: when it is
+closed holding more than max_entries digests, the least recently used ones
+are dropped. Lookups and new digests are written in batches, not one
+transaction each.
+"""
+
+import os
+import sqlite3
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from .app_paths import config_dir
+    from .duplicates import file_digest, sample_digest
+except ImportError:
+    from app_paths import config_dir
+    from duplicates import file_digest, sample_digest
+
+
+CACHE_FILENAME = "hashes.sqlite3"
+MAX_ENTRIES = 1000000
+WRITE_BATCH = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (dev, ino, kind)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS digests_used ON digests (used);
+"""
+
+
+class HashCache:
+    """Content digests cached by (dev, inode), valid while size and mtime_ns are unchanged"""
+    def __init__(self, cache_path=None, max_entries=MAX_ENTRIES):
+        if cache_path is None:
+            cache_path = os.path.join(config_dir(), CACHE_FILENAME)
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._pending = []
+        self._touched = []
+    
+    def __repr__(self):
+        return f"HashCache('{self.cache_path}', hits={self.hits}, misses={self.misses})"
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __len__(self):
+        with self._lock:
+            self._flush()
+            return self._conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+    
+    def close(self):
+        """Write pending digests, evict past max_entries and close the database"""
+        with self._lock:
+            self._flush()
+            self._evict()
+            self._conn.commit()
+            self._conn.close()
+    
+    def lookup(self, info, kind="full"):
+        """Cached digest for a file's stat result, or None if missing or stale"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest FROM digests WHERE dev = ? AND ino = ? AND kind = ?",
+                (info.st_dev, info.st_ino, kind)
+            ).fetchone()
+            if row is None or row[0] != info.st_size or row[1] != info.st_mtime_ns:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched.append((time.time(), info.st_dev, info.st_ino, kind))
+            if len(self._touched) >= WRITE_BATCH:
+                self._flush()
+            return row[2]
+    
+    def store(self, info, digest, kind="full"):
+        """Remember a digest computed for the file described by a stat result"""
+        with self._lock:
+            self._pending.append((info.st_dev, info.st_ino, kind, info.st_size, info.st_mtime_ns, digest, time.time()))
+            if len(self._pending) >= WRITE_BATCH:
+                self._flush()
+    
+    def file_digest(self, path, info=None):
+        """Digest of a file's whole contents, read only if not cached (info: its stat result, if already known)"""
+        return self._cached(path, "full", file_digest, info)
+    
+    def sample_digest(self, path, size):
+        """Digest of a file's first and last blocks, read only if not cached (see duplicates.sample_digest)"""
+        return self._cached(path, "sample", lambda path: sample_digest(path, size))
+    
+    def _cached(self, path, kind, compute, info=None):
+        # Stat before reading: a file changed while being hashed gets a newer mtime and misses next time
+        if info is None:
+            info = os.stat(path)
+        digest = self.lookup(info, kind)
+        if digest is None:
+            digest = compute(path)
+            self.store(info, digest, kind)
+        return digest
+    
+    def _flush(self):
+        if self._pending:
+            self._conn.executemany("INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?)", self._pending)
+            self._pending = []
+        if self._touched:
+            self._conn.executemany("UPDATE digests SET used = ? WHERE dev = ? AND ino = ? AND kind = ?", self._touched)
+            self._touched = []
+        self._conn.commit()
+    
+    def _evict(self):
+        """Drop the least recently used digests beyond max_entries"""
+        excess = self._conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM digests WHERE (dev, ino, kind) IN "
+                "(SELECT dev, ino, kind FROM digests ORDER BY used LIMIT ?)",
+                (excess,)
+            )
+
+
+def hash_files(paths, max_workers=8, cache=None):
+    """
+    Content digests of many files, hashed in parallel through the persistent cache
+    
+    Args:
+        paths: File paths; folders and anything unreadable are left out
+        max_workers (int): Threads hashing files in parallel (default: 8)
+        cache (HashCache): Cache to use (default: None, the shared cache in ~/.sorter)
+    
+    Returns:
+        dict: path -> hex digest
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    
+    owned = cache is None
+    if owned:
+        cache = HashCache()
+    
+    def digest(path):
+        try:
+            info = os.stat(path)
+            if not stat.S_ISREG(info.st_mode):
+                return None
+            return cache.file_digest(path, info).hex()
+        except OSError:
+            return None
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            paths = list(paths)
+            return {path: value for path, value in zip(paths, pool.map(digest, paths)) if value is not None}
+    finally:
+        if owned:
+            cache.close()
@@ -0,0 +1,192 @@
+"""
+Journal - Append-only record of a bulk copy/move/delete
+Usage: from journal import OperationJournal, journal_path
+        report = results.move("D:/Sorted", journal=journal_path("move"))
+        BulkExecutor().resume(path)   # finish an interrupted run
+        BulkExecutor().undo(path)     # put everything back
+
+One JSON object per line: a header, the full plan (one line per planned
+source/destination pair, numbered by position), then one line per finished
+entry. Lines are flushed as they are written (a killed process loses none)
+but fsynced in batches, so the journal costs a handful of syncs per thousand
+files instead of one each. A system crash can lose at most the last unsynced
+batch of "done" lines; resume detects those entries from the filesystem
+(source gone, and for moves the destination there).
+
+Before a copy/move touches anything, the journal also records the target
+folders it had to create and, for every destination that already exists
+(the "overwrite" policy), which files the run will write there. Files it
+replaces are first backed up next to the journal (<journal>.backup), so
+undo deletes or moves back only what the run wrote and restores the rest.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+try:
+    from .app_paths import config_dir
+except ImportError:
+    from app_paths import config_dir
+
+
+SYNC_EVERY = 1000      # records between fsyncs
+SYNC_INTERVAL = 1.0    # seconds between fsyncs, whichever comes first
+
+
+def journal_path(action):
+    """New journal file path under the config directory (~/.sorter/journals)"""
+    folder = os.path.join(config_dir(), "journals")
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return os.path.join(folder, f"{stamp}-{action}.jsonl")
+
+
+class OperationJournal:
+    """Append-only operation log with batched fsync"""
+    def __init__(self, path, sync_every=SYNC_EVERY, sync_interval=SYNC_INTERVAL):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.action = None
+        self.tasks = []
+        self.done = set()
+        self.failed = {}
+        self.undone = set()
+        # Plan index -> what the run writes into an existing destination (see BulkExecutor.undo)
+        self.kept = {}
+        # Target folders the run created, parents first
+        self.folders = []
+        # Set once folders and backups are in place, before the first file is touched
+        self.prepared = False
+        self.finished = False
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._file = None
+        if os.path.exists(path):
+            self._load()
+    
+    def __repr__(self):
+        return (f"OperationJournal(action='{self.action}', planned={len(self.tasks)}, "
+                f"done={len(self.done)}, undone={len(self.undone)})")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _load(self):
+        complete = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn last line from a crash mid-write
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                complete += len(line)
+                self._apply(record)
+        
+        # Cut the torn line off so new records start on a line of their own
+        if complete < os.path.getsize(self.path):
+            os.truncate(self.path, complete)
+    
+    def _apply(self, record):
+        """Update the in-memory state for one record, read back or just written"""
+        kind = record["t"]
+        if kind == "plan":
+            self.tasks.append((record["s"], record["d"]))
+        elif kind == "done":
+            self.done.add(record["i"])
+            self.failed.pop(record["i"], None)
+        elif kind == "fail":
+            self.failed[record["i"]] = record["e"]
+        elif kind == "undo":
+            self.undone.add(record["i"])
+        elif kind == "keep":
+            self.kept[record["i"]] = record
+        elif kind == "mkdir":
+            self.folders.append(record["p"])
+        elif kind == "ready":
+            self.prepared = True
+        elif kind == "begin":
+            self.action = record["action"]
+        elif kind == "end":
+            self.finished = True
+    
+    def backup_folder(self, index):
+        """Where the files replaced by one plan entry are backed up"""
+        return os.path.join(os.path.splitext(self.path)[0] + ".backup", str(index))
+    
+    def begin(self, action, tasks):
+        """Write the header and the whole plan, synced before any file is touched"""
+        if self.action is not None:
+            raise ValueError(f"Journal already holds a plan: {self.path}")
+        self.action = action
+        self.tasks = list(tasks)
+        lines = [json.dumps({"t": "begin", "action": action, "created": time.time()})]
+        lines.extend(json.dumps({"t": "plan", "s": source, "d": destination}) for source, destination in self.tasks)
+        with self._lock:
+            self._open().write("\n".join(lines) + "\n")
+            self._sync()
+    
+    def recorder(self, kind, indices):
+        """
+        Callback for BulkExecutor.run that journals each outcome
+        
+        Args:
+            kind (str): "done" for the operation itself, "undo" for its reversal
+            indices (list): Plan index of each task passed to run, by position
+        """
+        def record(position, ok, error):
+            index = indices[position]
+            if ok:
+                self.write({"t": kind, "i": index})
+            elif kind == "done":
+                self.write({"t": "fail", "i": index, "e": error})
+        return record
+    
+    def write(self, record):
+        """Append and flush one record; fsync once per batch"""
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._open().write(line)
+            self._file.flush()
+            self._apply(record)
+            self._pending += 1
+            if self._pending >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync()
+    
+    def end(self):
+        """Mark the run as complete"""
+        self.write({"t": "end"})
+        self.sync()
+    
+    def sync(self):
+        """fsync every record written so far"""
+        with self._lock:
+            self._sync()
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+    
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+    
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
@@ -3,7 +3,7 @@ import os
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLineEdit, QPushButton, QListWidget, QListWidgetItem, QFileDialog,
+    QLineEdit, QPushButton, QFileDialog,
     QMessageBox, QCheckBox, QLabel, QComboBox, QSpinBox, QDialog,
     QTabWidget, QScrollArea
 )
@@ -11,7 +11,13 @@ from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt6.QtGui import QIcon, QFont, QColor, QPixmap
 from PyQt6.QtCore import QSize
 import json
-from file_scanner import FileScanner
+from file_scanner import FileScanner, FolderWatcher
+from results_model import ResultsModel, ResultsView
+from result_store import ResultStore
+from bulk_ops import BulkExecutor
+from exclusions import ExclusionRules
+from matcher import KeywordMatcher
+from watcher import LiveResults, report_events
 from ui_theme import apply_modern_theme
 
 # Import SmartSort GUIs if available
@@ -88,9 +94,14 @@ class SorterApp(QMainWindow):
             self.setWindowIcon(QIcon("assets/icon.png"))
         
         self.config = self.load_config()
-        self.selected_files = set()
+        self.selected_files = []
         self.current_results = []
         self.scanner_thread = None
+        self.watcher_thread = None
+        self.retired_scanners = []
+        # Keeps the results in step with file system changes (see apply_changes)
+        self.live_results = None
+        self.pending_changes = []
         self.permission_granted = False
         
         # Check for permission
@@ -203,7 +214,7 @@ class SorterApp(QMainWindow):
         search_layout.addWidget(search_label)
         
         self.keyword_input = QLineEdit()
-        self.keyword_input.setPlaceholderText("Enter keyword (e.g., backup)")
+        self.keyword_input.setPlaceholderText("Enter keywords, comma-separated (e.g., backup, old)")
         self.keyword_input.setMinimumHeight(35)
         self.keyword_input.returnPressed.connect(self.search_files)
         search_layout.addWidget(self.keyword_input)
@@ -213,6 +224,12 @@ class SorterApp(QMainWindow):
         search_btn.setMinimumHeight(35)
         search_layout.addWidget(search_btn)
         
+        self.stop_btn = QPushButton("⏹ Stop")
+        self.stop_btn.clicked.connect(self.stop_search)
+        self.stop_btn.setMinimumHeight(35)
+        self.stop_btn.setEnabled(False)
+        search_layout.addWidget(self.stop_btn)
+        
         settings_btn = QPushButton("⚙️ Settings")
         settings_btn.clicked.connect(self.open_settings)
         settings_btn.setMinimumHeight(35)
@@ -224,8 +241,10 @@ class SorterApp(QMainWindow):
         results_label = QLabel("Results:")
         layout.addWidget(results_label)
         
-        self.results_list = QListWidget()
-        self.results_list.itemClicked.connect(self.on_item_clicked)
+        # Model/view list: rows are painted on demand, checks live in the model's bitset
+        self.results_model = ResultsModel()
+        self.results_list = ResultsView(self.results_model)
+        self.results_list.clicked.connect(self.on_item_clicked)
         layout.addWidget(self.results_list)
         
         # Status bar
@@ -247,6 +266,10 @@ class SorterApp(QMainWindow):
         folder_btn.clicked.connect(lambda: self.perform_action("folder"))
         action_layout.addWidget(folder_btn)
         
+        select_all_btn = QPushButton("Select All")
+        select_all_btn.clicked.connect(self.select_all)
+        action_layout.addWidget(select_all_btn)
+        
         clear_btn = QPushButton("Clear Selection")
         clear_btn.clicked.connect(self.clear_selection)
         action_layout.addWidget(clear_btn)
@@ -273,54 +296,135 @@ class SorterApp(QMainWindow):
             QMessageBox.warning(self, "No Folder", "Please select a folder first.")
             return
         
-        keyword = self.keyword_input.text().strip()
-        if not keyword:
+        keywords = [k.strip() for k in self.keyword_input.text().split(",") if k.strip()]
+        if not keywords:
             QMessageBox.warning(self, "No Keyword", "Please enter a keyword.")
             return
         
+        # A new search replaces the one still running instead of racing it
+        self.retire_scanner()
+        self.retire_watcher()
+        
         self.status_label.setText("Searching...")
-        self.results_list.clear()
+        # Results accumulate in a compact store; the view reads rows from it on demand
+        self.results_model.set_results(ResultStore())
         self.selected_files.clear()
+        self.current_results = self.results_model.items()
         
+        exclusions = self.exclusion_rules()
         self.scanner_thread = FileScanner(
             self.config["last_folder"],
-            keyword,
+            keywords,
             self.config.get("case_sensitive", False),
-            self.config.get("include_plural", True)
+            self.config.get("include_plural", True),
+            self.config.get("max_workers", 4),
+            self.config.get("use_index", False),
+            exclusions=exclusions
         )
         self.scanner_thread.results_found.connect(self.display_results)
+        self.scanner_thread.progress_updated.connect(self.show_progress)
         self.scanner_thread.finished.connect(self.search_finished)
+        self.stop_btn.setEnabled(True)
         self.scanner_thread.start()
+        
+        # New, removed and renamed entries are applied to the results instead of searching again
+        matcher = KeywordMatcher(keywords, self.config.get("case_sensitive", False),
+                                 self.config.get("include_plural", True))
+        self.live_results = LiveResults(self.current_results, self.config["last_folder"],
+                                        lambda entry: matcher.matches(entry.name))
+        self.pending_changes = []
+        if self.config.get("watch_changes", True):
+            self.watcher_thread = FolderWatcher(self.config["last_folder"], exclusions,
+                                                self.config.get("use_index", False))
+            self.watcher_thread.changes_found.connect(self.apply_changes)
+            self.watcher_thread.start()
+    
+    def stop_search(self):
+        if self.scanner_thread is not None and self.scanner_thread.isRunning():
+            self.scanner_thread.cancel()
+            self.status_label.setText("Stopping...")
+    
+    def retire_scanner(self):
+        """Cancel a running scan and detach it from the results view"""
+        scanner = self.scanner_thread
+        if scanner is None or not scanner.isRunning():
+            return
+        
+        scanner.cancel()
+        scanner.results_found.disconnect()
+        scanner.progress_updated.disconnect()
+        scanner.finished.disconnect()
+        # Keep a reference until the thread winds down; Qt aborts if a running QThread is destroyed
+        self.retired_scanners.append(scanner)
+        scanner.finished.connect(lambda: self.retired_scanners.remove(scanner))
+    
+    def retire_watcher(self):
+        """Stop watching the previous search's folder"""
+        watcher = self.watcher_thread
+        self.watcher_thread = None
+        if watcher is None or not watcher.isRunning():
+            return
+        
+        watcher.cancel()
+        watcher.changes_found.disconnect()
+        self.retired_scanners.append(watcher)
+        watcher.finished.connect(lambda: self.retired_scanners.remove(watcher))
+    
+    def apply_changes(self, events):
+        """Bring the results in step with created, deleted and renamed entries, without searching again"""
+        if self.live_results is None:
+            return
+        if self.scanner_thread is not None and self.scanner_thread.isRunning():
+            # Applied once the search has listed everything
+            self.pending_changes.extend(events)
+            return
+        
+        removed, added, renamed = self.live_results.changes(events)
+        self.results_model.remove_rows(removed)
+        self.results_model.append_results([entry.path for entry in added])
+        if renamed:
+            self.results_model.refresh()
+        
+        if self.live_results.stale:
+            self.status_label.setText("Some changes were missed; search again to refresh the results")
+        elif removed or added or renamed:
+            self.status_label.setText(f"{len(self.current_results)} result(s), updated for {len(events)} change(s)")
     
     def display_results(self, results):
-        self.current_results = results
-        for file_path in results:
-            item = QListWidgetItem(file_path)
-            item.setCheckState(Qt.CheckState.Unchecked)
-            self.results_list.addItem(item)
+        self.results_model.append_results(results)
+    
+    def show_progress(self, directories, entries, matches):
+        self.status_label.setText(
+            f"Searching... {directories:,} folder(s), {entries:,} item(s) checked, {matches:,} match(es)"
+        )
     
     def search_finished(self):
+        self.stop_btn.setEnabled(False)
+        events, self.pending_changes = self.pending_changes, []
+        if events:
+            self.apply_changes(events)
         count = len(self.current_results)
-        self.status_label.setText(f"Found {count} result(s)")
-    
-    def on_item_clicked(self, item):
-        if item.checkState() == Qt.CheckState.Unchecked:
-            item.setCheckState(Qt.CheckState.Checked)
-            self.selected_files.add(item.text())
+        if self.scanner_thread is not None and self.scanner_thread.cancelled:
+            self.status_label.setText(f"Search stopped: {count} result(s) so far")
         else:
-            item.setCheckState(Qt.CheckState.Unchecked)
-            self.selected_files.discard(item.text())
+            self.status_label.setText(f"Found {count} result(s)")
+    
+    def on_item_clicked(self, index):
+        self.results_model.toggle(index.row())
+    
+    def select_all(self):
+        self.results_model.set_all_checked(True)
     
     def clear_selection(self):
-        self.selected_files.clear()
-        for i in range(self.results_list.count()):
-            self.results_list.item(i).setCheckState(Qt.CheckState.Unchecked)
+        self.results_model.set_all_checked(False)
     
     def perform_action(self, action):
-        if not self.selected_files:
+        if not self.results_model.checked_count():
             QMessageBox.warning(self, "No Selection", "Please select files first.")
             return
         
+        self.selected_files = self.results_model.checked_paths()
+        
         if action == "delete":
             self.delete_files()
         elif action == "copy":
@@ -329,46 +433,48 @@ class SorterApp(QMainWindow):
             self.move_to_folder()
     
     def delete_files(self):
+        estimate = BulkExecutor().delete(self.selected_files, dry_run=True)
         reply = QMessageBox.question(
             self, "Confirm Delete",
-            f"Delete {len(self.selected_files)} file(s)? This cannot be undone.",
+            f"Delete {len(self.selected_files)} file(s)? This cannot be undone.\n\n{estimate.summary()}",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if reply == QMessageBox.StandardButton.Yes:
-            deleted = 0
-            for file_path in self.selected_files:
-                try:
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
-                    elif os.path.isdir(file_path):
-                        import shutil
-                        shutil.rmtree(file_path)
-                    deleted += 1
-                except Exception as e:
-                    QMessageBox.warning(self, "Error", f"Failed to delete {file_path}: {str(e)}")
+            report = BulkExecutor().delete(self.selected_files)
+            if report.failed:
+                failures = "\n".join(f"{path}: {error}" for path, error in report.failed[:10])
+                QMessageBox.warning(self, "Error", f"Failed to delete {len(report.failed)} item(s):\n{failures}")
             
-            QMessageBox.information(self, "Success", f"Deleted {deleted} item(s)")
-            self.search_files()
+            QMessageBox.information(self, "Success", f"Deleted {len(report)} item(s)")
+            self.apply_changes(report_events(report))
     
     def copy_files(self):
         dest_folder = QFileDialog.getExistingDirectory(self, "Select Destination Folder")
         if not dest_folder:
             return
         
-        import shutil
-        copied = 0
-        for file_path in self.selected_files:
-            try:
-                dest_path = os.path.join(dest_folder, os.path.basename(file_path))
-                if os.path.isfile(file_path):
-                    shutil.copy2(file_path, dest_path)
-                elif os.path.isdir(file_path):
-                    shutil.copytree(file_path, dest_path)
-                copied += 1
-            except Exception as e:
-                QMessageBox.warning(self, "Error", f"Failed to copy {file_path}: {str(e)}")
-        
-        QMessageBox.information(self, "Success", f"Copied {copied} item(s)")
+        report = BulkExecutor().copy(self.selected_files, dest_folder, *self.collision_policy())
+        if report.failed:
+            failures = "\n".join(f"{path}: {error}" for path, error in report.failed[:10])
+            QMessageBox.warning(self, "Error", f"Failed to copy {len(report.failed)} item(s):\n{failures}")
+        
+        QMessageBox.information(self, "Success", f"Copied {len(report)} item(s)"
+                                + (f", skipped {len(report.skipped)}" if report.skipped else ""))
+        self.apply_changes(report_events(report))
+    
+    def exclusion_rules(self):
+        """ExclusionRules from the settings (.sorterignore files are always honored)"""
+        patterns = [p.strip() for p in self.config.get("exclude_patterns", "").split(",") if p.strip()]
+        return ExclusionRules(
+            patterns,
+            max_depth=self.config.get("max_depth", 0) or None,
+            follow_symlinks=self.config.get("follow_symlinks", False),
+            one_file_system=self.config.get("one_file_system", False)
+        )
+    
+    def collision_policy(self):
+        """(policy, root) for copy/move; "mirror" keeps paths relative to the searched folder"""
+        return self.config.get("collision_policy", "number"), self.scanner_thread.root_path
     
     def move_to_folder(self):
         dest_folder = QFileDialog.getExistingDirectory(self, "Select Destination Folder")
@@ -382,20 +488,25 @@ class SorterApp(QMainWindow):
         if not folder_name:
             folder_name = os.path.join(dest_folder, "Sorted_Files")
         
-        os.makedirs(folder_name, exist_ok=True)
+        # Same-drive items are renamed in place; only other drives are copied
+        report = BulkExecutor().move(self.selected_files, folder_name, *self.collision_policy())
+        if report.failed:
+            failures = "\n".join(f"{path}: {error}" for path, error in report.failed[:10])
+            QMessageBox.warning(self, "Error", f"Failed to move {len(report.failed)} item(s):\n{failures}")
         
-        import shutil
-        moved = 0
-        for file_path in self.selected_files:
-            try:
-                dest_path = os.path.join(folder_name, os.path.basename(file_path))
-                shutil.move(file_path, dest_path)
-                moved += 1
-            except Exception as e:
-                QMessageBox.warning(self, "Error", f"Failed to move {file_path}: {str(e)}")
-        
-        QMessageBox.information(self, "Success", f"Moved {moved} item(s) to {folder_name}")
-        self.search_files()
+        QMessageBox.information(self, "Success", f"Moved {len(report)} item(s) to {folder_name}"
+                                + (f", skipped {len(report.skipped)}" if report.skipped else ""))
+        self.apply_changes(report_events(report))
+    
+    def closeEvent(self, event):
+        # Qt aborts if a running QThread is destroyed
+        for thread in [self.scanner_thread, self.watcher_thread] + self.retired_scanners:
+            if thread is not None and thread.isRunning():
+                thread.cancel()
+                thread.wait()
+        if getattr(self, "time_sort_widget", None) is not None:
+            self.time_sort_widget.stop_watching(wait=True)
+        super().closeEvent(event)
     
     def open_settings(self):
         settings_dialog = SettingsDialog(self, self.config)
@@ -412,6 +523,14 @@ class SorterApp(QMainWindow):
             "last_folder": "",
             "case_sensitive": False,
             "include_plural": True,
+            "max_workers": 4,
+            "use_index": False,
+            "exclude_patterns": "",
+            "max_depth": 0,
+            "follow_symlinks": False,
+            "one_file_system": False,
+            "watch_changes": True,
+            "collision_policy": "number",
             "theme": "dark"
         }
     
@@ -439,6 +558,61 @@ class SettingsDialog(QDialog):
         self.include_plural_check.setChecked(self.config.get("include_plural", True))
         layout.addWidget(self.include_plural_check)
         
+        # Scan threads
+        workers_layout = QHBoxLayout()
+        workers_layout.addWidget(QLabel("Scan Threads:"))
+        self.max_workers_spin = QSpinBox()
+        self.max_workers_spin.setMinimum(1)
+        self.max_workers_spin.setMaximum(64)
+        self.max_workers_spin.setValue(self.config.get("max_workers", 4))
+        workers_layout.addWidget(self.max_workers_spin)
+        layout.addLayout(workers_layout)
+        
+        # Persistent index
+        self.use_index_check = QCheckBox("Use File Index (faster repeat searches)")
+        self.use_index_check.setChecked(self.config.get("use_index", False))
+        layout.addWidget(self.use_index_check)
+        
+        # Folders and files never scanned
+        exclude_layout = QHBoxLayout()
+        exclude_layout.addWidget(QLabel("Exclude:"))
+        self.exclude_input = QLineEdit(self.config.get("exclude_patterns", ""))
+        self.exclude_input.setPlaceholderText("node_modules/, .git/, *.tmp")
+        exclude_layout.addWidget(self.exclude_input)
+        layout.addLayout(exclude_layout)
+        
+        depth_layout = QHBoxLayout()
+        depth_layout.addWidget(QLabel("Max Folder Depth:"))
+        self.max_depth_spin = QSpinBox()
+        self.max_depth_spin.setMinimum(0)
+        self.max_depth_spin.setMaximum(999)
+        self.max_depth_spin.setSpecialValueText("Unlimited")
+        self.max_depth_spin.setValue(self.config.get("max_depth", 0))
+        depth_layout.addWidget(self.max_depth_spin)
+        layout.addLayout(depth_layout)
+        
+        self.one_file_system_check = QCheckBox("Stay on One Drive (skip mounted drives and shares)")
+        self.one_file_system_check.setChecked(self.config.get("one_file_system", False))
+        layout.addWidget(self.one_file_system_check)
+        
+        self.follow_symlinks_check = QCheckBox("Follow Folder Symlinks")
+        self.follow_symlinks_check.setChecked(self.config.get("follow_symlinks", False))
+        layout.addWidget(self.follow_symlinks_check)
+        
+        # Live results
+        self.watch_changes_check = QCheckBox("Keep Results Up to Date (watch the folder for changes)")
+        self.watch_changes_check.setChecked(self.config.get("watch_changes", True))
+        layout.addWidget(self.watch_changes_check)
+        
+        # Name collisions on copy/move
+        collision_layout = QHBoxLayout()
+        collision_layout.addWidget(QLabel("Same Name at Destination:"))
+        self.collision_combo = QComboBox()
+        self.collision_combo.addItems(["Number", "Mirror", "Skip", "Overwrite"])
+        self.collision_combo.setCurrentText(self.config.get("collision_policy", "number").capitalize())
+        collision_layout.addWidget(self.collision_combo)
+        layout.addLayout(collision_layout)
+        
         # Theme
         theme_layout = QHBoxLayout()
         theme_layout.addWidget(QLabel("Theme:"))
@@ -465,6 +639,14 @@ class SettingsDialog(QDialog):
     def get_config(self):
         self.config["case_sensitive"] = self.case_sensitive_check.isChecked()
         self.config["include_plural"] = self.include_plural_check.isChecked()
+        self.config["max_workers"] = self.max_workers_spin.value()
+        self.config["use_index"] = self.use_index_check.isChecked()
+        self.config["exclude_patterns"] = self.exclude_input.text()
+        self.config["max_depth"] = self.max_depth_spin.value()
+        self.config["one_file_system"] = self.one_file_system_check.isChecked()
+        self.config["follow_symlinks"] = self.follow_symlinks_check.isChecked()
+        self.config["watch_changes"] = self.watch_changes_check.isChecked()
+        self.config["collision_policy"] = self.collision_combo.currentText().lower()
         self.config["theme"] = self.theme_combo.currentText().lower()
         return self.config
 
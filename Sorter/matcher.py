@@ -0,0 +1,84 @@
+"""
+Matcher - Keyword matching compiled once per search
+Usage: from matcher import KeywordMatcher
+        matcher = KeywordMatcher(["backup", "old", "tmp"])
+        matcher.matches("Old_report.txt")  # True
+
+All plural variants of all keywords are folded into one regular
+expression shaped like a trie (variants sharing a prefix share a branch),
+so each name is scanned once no matter how many keywords are searched.
+
+Case-insensitive searches casefold the keywords and each name once and
+compare the folded strings, instead of trying lower/upper/capitalized
+spellings one by one, so mixed-case names like "BackUp" match too.
+"""
+
+import re
+
+
+def generate_keywords(keyword, case_sensitive=False, include_plural=True):
+    """Generate search keyword variants based on settings (casefolded unless case-sensitive)"""
+    if not case_sensitive:
+        keyword = keyword.casefold()
+    
+    keywords = [keyword]
+    if include_plural and keyword.endswith('s'):
+        keywords.append(keyword[:-1])
+    
+    return keywords
+
+
+def _minimal_variants(variants):
+    """Drop variants that contain another variant; the shorter one already matches"""
+    kept = []
+    for variant in sorted(set(variants), key=len):
+        if not any(shorter in variant for shorter in kept):
+            kept.append(variant)
+    return kept
+
+
+def _trie_pattern(words):
+    """Build a regex alternation with shared prefixes factored out"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+    
+    def emit(node):
+        # No word is a prefix of another (see _minimal_variants), so leaves end words
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items())]
+        if len(branches) <= 1:
+            return "".join(branches)
+        return "(?:" + "|".join(branches) + ")"
+    
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """Single-pass matcher for every variant of one or more keywords"""
+    def __init__(self, keywords, case_sensitive=False, include_plural=True):
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        if not keywords or not all(keywords):
+            raise ValueError("Keyword cannot be empty")
+        
+        self.keywords = list(keywords)
+        self.case_sensitive = case_sensitive
+        self.include_plural = include_plural
+        
+        variants = []
+        for keyword in self.keywords:
+            variants.extend(generate_keywords(keyword, case_sensitive, include_plural))
+        self.variants = _minimal_variants(variants)
+        self._search = re.compile(_trie_pattern(self.variants)).search
+        self._fold = not case_sensitive
+    
+    def __repr__(self):
+        return f"KeywordMatcher(keywords={self.keywords}, variants={len(self.variants)})"
+    
+    def matches(self, name):
+        """Check if name contains any keyword variant"""
+        if self._fold:
+            name = name.casefold()
+        return self._search(name) is not None
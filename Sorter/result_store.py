@@ -0,0 +1,203 @@
+"""
+Result store - Compact columnar container for search results
+Usage: from result_store import ResultStore
+        store = ResultStore(paths)
+        len(store), store[0], store[10:20], list(store)
+
+Instead of one Python string per full path, the store keeps a table of
+distinct parent directories plus every basename packed into one byte
+buffer, indexed by array-backed columns. Optional size/atime/mtime/is_dir
+columns live in typed arrays as well, so a result costs tens of bytes
+rather than a few hundred on deep trees.
+"""
+
+import os
+import sys
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+STAT_COLUMNS = ("size", "atime", "mtime", "is_dir")
+
+# Same codec as os.fsencode/os.fsdecode, so undecodable names round-trip
+_FS_ENCODING = sys.getfilesystemencoding()
+_FS_ERRORS = sys.getfilesystemencodeerrors()
+
+
+def unpack_names(data, offsets):
+    """Decode the basenames returned by ResultStore.packed_names, in order"""
+    base = offsets[0]
+    for i in range(len(offsets) - 1):
+        yield data[offsets[i] - base:offsets[i + 1] - base].decode(_FS_ENCODING, _FS_ERRORS)
+
+
+class ResultStore:
+    """Table of result paths with optional stat columns"""
+    def __init__(self, paths=(), with_stat=False):
+        self.with_stat = with_stat
+        self._dirs = []
+        self._dir_ids = {}
+        self._dir_col = array('I')
+        self._names = bytearray()
+        self._offsets = array('Q', [0])
+        # Stat columns stay empty unless with_stat is set
+        self.size = array('q')
+        self.atime = array('d')
+        self.mtime = array('d')
+        self.is_dir = array('b')
+        self.extend(paths)
+    
+    def __repr__(self):
+        return f"ResultStore(count={len(self)}, dirs={len(self._dirs)})"
+    
+    def __len__(self):
+        return len(self._dir_col)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._path(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ResultStore index out of range")
+        return self._path(index)
+    
+    def __iter__(self):
+        dirs, dir_col, names, offsets = self._dirs, self._dir_col, self._names, self._offsets
+        for i in range(len(dir_col)):
+            yield dirs[dir_col[i]] + names[offsets[i]:offsets[i + 1]].decode(_FS_ENCODING, _FS_ERRORS)
+    
+    def _path(self, index):
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._dirs[self._dir_col[index]] + self._names[start:end].decode(_FS_ENCODING, _FS_ERRORS)
+    
+    def name(self, index):
+        """Basename of one result, without building the full path"""
+        return self._names[self._offsets[index]:self._offsets[index + 1]].decode(_FS_ENCODING, _FS_ERRORS)
+    
+    def iter_names(self, start=0, stop=None):
+        """Basenames of results start..stop, in order"""
+        names, offsets = self._names, self._offsets
+        for i in range(start, len(self) if stop is None else min(stop, len(self))):
+            yield names[offsets[i]:offsets[i + 1]].decode(_FS_ENCODING, _FS_ERRORS)
+    
+    def packed_names(self, start, stop):
+        """
+        Basenames of results start..stop as raw bytes, for another process to decode (see unpack_names)
+        
+        Returns:
+            tuple: (bytes, array of offsets) - the offsets are the store's own, so the first is not 0
+        """
+        stop = min(stop, len(self))
+        offsets = self._offsets[start:stop + 1]
+        return bytes(self._names[offsets[0]:offsets[-1]]), offsets
+    
+    def append(self, path, name=None, stat=None, is_dir=None):
+        """
+        Add one result
+        
+        Args:
+            path (str): Full path
+            name (str): Basename, if already known (e.g. DirEntry.name)
+            stat (os.stat_result): Stat info for the stat columns (with_stat stores only)
+            is_dir (bool): Whether the result is a directory (with_stat stores only)
+        """
+        if name is None:
+            name = os.path.basename(path)
+        prefix = path[:len(path) - len(name)]
+        
+        dir_id = self._dir_ids.get(prefix)
+        if dir_id is None:
+            dir_id = self._dir_ids[prefix] = len(self._dirs)
+            self._dirs.append(prefix)
+        
+        self._dir_col.append(dir_id)
+        self._names += name.encode(_FS_ENCODING, _FS_ERRORS)
+        self._offsets.append(len(self._names))
+        
+        if self.with_stat:
+            if stat is not None:
+                self.size.append(stat.st_size)
+                self.atime.append(stat.st_atime)
+                self.mtime.append(stat.st_mtime)
+            else:
+                self.size.append(-1)
+                self.atime.append(float("nan"))
+                self.mtime.append(float("nan"))
+            self.is_dir.append(-1 if is_dir is None else int(is_dir))
+    
+    def extend(self, paths):
+        """Add many results given as plain paths"""
+        for path in paths:
+            self.append(path)
+    
+    def remove_rows(self, rows):
+        """Drop results by index (ascending), compacting every column in one pass"""
+        if not len(rows):
+            return
+        
+        dir_col, offsets, names = array('I'), array('Q', [0]), bytearray()
+        columns = [(column, array(column.typecode)) for column in (self.size, self.atime, self.mtime, self.is_dir)]
+        start = 0
+        # Copy each run of kept rows between removed ones
+        for stop in list(rows) + [len(self)]:
+            if stop > start:
+                dir_col.extend(self._dir_col[start:stop])
+                shift = self._offsets[start] - len(names)
+                names += self._names[self._offsets[start]:self._offsets[stop]]
+                offsets.extend(offset - shift for offset in self._offsets[start + 1:stop + 1])
+                if self.with_stat:
+                    for column, kept in columns:
+                        kept.extend(column[start:stop])
+            start = stop + 1
+        
+        self._dir_col, self._offsets, self._names = dir_col, offsets, names
+        if self.with_stat:
+            self.size, self.atime, self.mtime, self.is_dir = (kept for _, kept in columns)
+    
+    def dir_prefixes(self):
+        """Distinct parent directory prefixes (each ends with a separator) of the stored results"""
+        return list(self._dir_ids)
+    
+    def rows_in(self, prefixes):
+        """Indexes of the results directly inside each of the given directory prefixes, in one pass"""
+        wanted = {dir_id: prefix for dir_id, prefix in enumerate(self._dirs) if prefix in prefixes}
+        found = {prefix: [] for prefix in set(wanted.values())}
+        if wanted:
+            for row, dir_id in enumerate(self._dir_col):
+                prefix = wanted.get(dir_id)
+                if prefix is not None:
+                    found[prefix].append(row)
+        return found
+    
+    def rename_prefix(self, old, new):
+        """Show every result below directory prefix old under new instead (a moved folder); rows keep their place"""
+        for dir_id, prefix in enumerate(self._dirs):
+            if not prefix.startswith(old):
+                continue
+            moved = new + prefix[len(old):]
+            self._dirs[dir_id] = moved
+            if self._dir_ids.get(prefix) == dir_id:
+                del self._dir_ids[prefix]
+            # A prefix can now appear twice in the table; later appends use the first
+            self._dir_ids.setdefault(moved, dir_id)
+    
+    def to_numpy(self, column):
+        """Zero-copy NumPy view of a stat column (requires numpy)"""
+        if numpy is None:
+            raise ImportError("NumPy is not installed")
+        if column not in STAT_COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        values = getattr(self, column)
+        return numpy.frombuffer(values, dtype=values.typecode) if len(values) else numpy.array([], dtype=values.typecode)
+    
+    def nbytes(self):
+        """Approximate memory held by the store's buffers and directory table"""
+        total = len(self._names) + sum(len(prefix) + 49 for prefix in self._dirs)
+        for column in (self._dir_col, self._offsets, self.size, self.atime, self.mtime, self.is_dir):
+            total += column.itemsize * len(column)
+        return total
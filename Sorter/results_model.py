@@ -0,0 +1,175 @@
+"""
+Results model - Virtualized list model for large result sets
+Usage: from results_model import ResultsModel, ResultsView
+        model = ResultsModel()
+        view = ResultsView(model)
+        model.append_results(paths)
+
+Rows are read lazily from the backing result sequence when the view paints
+them, and checked state lives in a bitset (one bit per row) instead of on
+per-row widgets, so scrolling, select-all and clear stay fast at 1M+ rows.
+Rows can be removed in place (e.g. after a delete or a watcher event)
+without rebuilding the view.
+"""
+
+from bisect import bisect_left
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt6.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+
+
+class ResultsModel(QAbstractListModel):
+    """List model over a result sequence with a bitset of checked rows"""
+    def __init__(self, display=None, path_of=None, parent=None):
+        super().__init__(parent)
+        # display(item) -> row text, path_of(item) -> file path; both default to the item itself
+        self._display = display or str
+        self._path_of = path_of or (lambda item: item)
+        self._items = []
+        self._checked = bytearray()
+        self._checked_count = 0
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._items)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display(self._items[row])
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if self.is_checked(row) else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.UserRole:
+            return self._path_of(self._items[row])
+        return None
+    
+    def flags(self, index):
+        # Not user-checkable: rows toggle on click, so the checkbox doesn't toggle twice
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+    
+    def set_results(self, items):
+        """Replace all rows"""
+        self.beginResetModel()
+        self._items = items
+        self._checked = bytearray((len(items) + 7) // 8)
+        self._checked_count = 0
+        self.endResetModel()
+    
+    def append_results(self, items):
+        """Append a batch of rows"""
+        if not items:
+            return
+        
+        first = len(self._items)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        self._items.extend(items)
+        self._checked.extend(bytes((len(self._items) + 7) // 8 - len(self._checked)))
+        self.endInsertRows()
+    
+    def remove_rows(self, rows):
+        """Remove rows (ascending row numbers) from the backing sequence, keeping the others' checked state"""
+        if not len(rows):
+            return
+        
+        if rows[-1] - rows[0] + 1 == len(rows):
+            self.beginRemoveRows(QModelIndex(), rows[0], rows[-1])
+            self._remove(rows)
+            self.endRemoveRows()
+        else:
+            # One reset rather than one removal per run of rows; the view keeps its scroll position
+            self.beginResetModel()
+            self._remove(rows)
+            self.endResetModel()
+    
+    def _remove(self, rows):
+        checked = list(self._checked_rows()) if self._checked_count else []
+        remove = getattr(self._items, "remove_rows", None)
+        if remove is not None:
+            # ResultStore, TimeSortDetails: compacted in one pass
+            remove(rows)
+        else:
+            removed = set(rows)
+            self._items[:] = [item for row, item in enumerate(self._items) if row not in removed]
+        
+        self._checked = bytearray((len(self._items) + 7) // 8)
+        self._checked_count = 0
+        removed = set(rows)
+        for row in checked:
+            if row not in removed:
+                row -= bisect_left(rows, row)
+                self._checked[row >> 3] |= 1 << (row & 7)
+                self._checked_count += 1
+    
+    def refresh(self):
+        """Repaint every row (after the backing sequence changed paths in place)"""
+        if self._items:
+            self.dataChanged.emit(self.index(0), self.index(len(self._items) - 1),
+                                  [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.UserRole])
+    
+    def clear(self):
+        self.set_results([])
+    
+    def items(self):
+        return self._items
+    
+    def is_checked(self, row):
+        return bool(self._checked[row >> 3] & (1 << (row & 7)))
+    
+    def toggle(self, row):
+        """Flip the checked state of one row"""
+        self._checked[row >> 3] ^= 1 << (row & 7)
+        self._checked_count += 1 if self.is_checked(row) else -1
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+    
+    def set_all_checked(self, checked):
+        """Check or uncheck every row in one pass over the bitset"""
+        count = len(self._items)
+        if checked:
+            self._checked = bytearray(b"\xff") * (count // 8)
+            if count % 8:
+                self._checked.append((1 << (count % 8)) - 1)
+            self._checked_count = count
+        else:
+            self._checked = bytearray((count + 7) // 8)
+            self._checked_count = 0
+        
+        if count:
+            self.dataChanged.emit(self.index(0), self.index(count - 1), [Qt.ItemDataRole.CheckStateRole])
+    
+    def checked_count(self):
+        return self._checked_count
+    
+    def checked_paths(self):
+        """Paths of all checked rows, in row order"""
+        return [self._path_of(self._items[row]) for row in self._checked_rows()]
+    
+    def _checked_rows(self):
+        for byte_index, byte in enumerate(self._checked):
+            if not byte:
+                continue
+            base = byte_index << 3
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield base + bit
+
+
+class ResultsView(QTableView):
+    """Single-column view for ResultsModel"""
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        # A table with fixed row heights never measures rows it doesn't paint;
+        # QListView lays out every row (through Python rowCount calls) on each change
+        self.horizontalHeader().hide()
+        self.horizontalHeader().setStretchLastSection(True)
+        self.verticalHeader().hide()
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 16)
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setModel(model)
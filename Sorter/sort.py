@@ -5,14 +5,26 @@ Usage: from Sorter import sort
 """
 
 import os
-import shutil
 from pathlib import Path
 
+try:
+    from .bulk_ops import BulkExecutor
+    from .hash_cache import hash_files
+    from .matcher import KeywordMatcher
+    from .result_store import ResultStore
+    from .walker import iter_entries
+except ImportError:
+    from bulk_ops import BulkExecutor
+    from hash_cache import hash_files
+    from matcher import KeywordMatcher
+    from result_store import ResultStore
+    from walker import iter_entries
+
 
 class SortResults:
-    """Container for sort results"""
+    """Container for sort results (files is a compact ResultStore of paths)"""
     def __init__(self, files, keyword, folder):
-        self.files = files
+        self.files = files if isinstance(files, ResultStore) else ResultStore(files)
         self.keyword = keyword
         self.folder = folder
     
@@ -25,87 +37,97 @@ class SortResults:
     def __iter__(self):
         return iter(self.files)
     
-    def delete(self):
-        """Delete all found files/folders"""
-        deleted = 0
-        for file_path in self.files:
-            try:
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-                deleted += 1
-            except Exception as e:
-                print(f"Error deleting {file_path}: {e}")
-        return deleted
-    
-    def copy(self, destination):
-        """Copy all found files/folders to destination"""
-        os.makedirs(destination, exist_ok=True)
-        copied = 0
-        for file_path in self.files:
-            try:
-                dest_path = os.path.join(destination, os.path.basename(file_path))
-                if os.path.isfile(file_path):
-                    shutil.copy2(file_path, dest_path)
-                elif os.path.isdir(file_path):
-                    shutil.copytree(file_path, dest_path)
-                copied += 1
-            except Exception as e:
-                print(f"Error copying {file_path}: {e}")
-        return copied
-    
-    def move(self, destination):
-        """Move all found files/folders to destination"""
-        os.makedirs(destination, exist_ok=True)
-        moved = 0
-        for file_path in self.files:
-            try:
-                dest_path = os.path.join(destination, os.path.basename(file_path))
-                shutil.move(file_path, dest_path)
-                moved += 1
-            except Exception as e:
-                print(f"Error moving {file_path}: {e}")
-        return moved
-
-
-def _generate_keywords(keyword, case_sensitive=False, include_plural=True):
-    """Generate search keywords based on settings"""
-    keywords = [keyword]
-    
-    if not case_sensitive:
-        keywords.append(keyword.lower())
-        keywords.append(keyword.upper())
-        keywords.append(keyword.capitalize())
-    
-    if include_plural and keyword.endswith('s'):
-        base = keyword[:-1]
-        keywords.append(base)
-        if not case_sensitive:
-            keywords.append(base.lower())
-            keywords.append(base.upper())
-            keywords.append(base.capitalize())
-    
-    return list(set(keywords))
-
-
-def _matches_keyword(name, keywords):
-    """Check if name matches any keyword"""
-    for keyword in keywords:
-        if keyword in name:
-            return True
-    return False
-
-
-def folder(folder_location, keyword, case_sensitive=False, include_plural=True):
+    def delete(self, max_workers=8, journal=None, dry_run=False):
+        """Delete all found files/folders in parallel; returns an OperationReport (DryRunReport if dry_run)"""
+        return BulkExecutor(max_workers).delete(self.files, journal, dry_run)
+    
+    def copy(self, destination, max_workers=8, policy="number", journal=None, dry_run=False):
+        """
+        Copy all found files/folders to destination in parallel
+        
+        Args:
+            destination (str): Folder to copy into
+            max_workers (int): Parallel operations (default: 8)
+            policy (str): Name collisions: "number", "mirror" (keep paths relative to the
+                searched folder), "skip" or "overwrite" (default: "number")
+            journal (str): Journal file, so the run can be resumed or undone (default: None)
+            dry_run (bool): Only estimate bytes, free space and duration; touch nothing (default: False)
+        
+        Returns:
+            OperationReport: succeeded, failed and skipped entries, bytes copied (DryRunReport if dry_run)
+        """
+        return BulkExecutor(max_workers).copy(self.files, destination, policy, self.folder, journal, dry_run)
+    
+    def move(self, destination, max_workers=8, policy="number", journal=None, dry_run=False):
+        """Move all found files/folders to destination in parallel (arguments as for copy)"""
+        return BulkExecutor(max_workers).move(self.files, destination, policy, self.folder, journal, dry_run)
+    
+    def hashes(self, max_workers=8, cache=None):
+        """
+        Content digests of all found files (folders are left out)
+        
+        Args:
+            max_workers (int): Files hashed in parallel (default: 8)
+            cache (HashCache): Digest cache (default: None, the shared cache in ~/.sorter);
+                files unchanged since they were last hashed are not read again
+        
+        Returns:
+            dict: path -> hex digest (BLAKE2b)
+        """
+        return hash_files(self.files, max_workers, cache)
+
+
+def iter_folder(folder_location, keyword, case_sensitive=False, include_plural=True, max_workers=None, index=None,
+                exclusions=None):
+    """
+    Search for files/folders by keyword, yielding each match as soon as it is found
+    
+    Takes the same arguments as folder(). Nothing is collected, so memory stays
+    flat however many matches there are, and the walk stops as soon as the
+    caller stops iterating.
+    
+    Returns:
+        generator: Matching paths, in the same order folder() would list them
+    
+    Example:
+        from itertools import islice
+        
+        # First 100 matches only; the rest of the tree is never walked
+        for path in islice(sort.iter_folder("C:/Users/Abu/Documents", "backup"), 100):
+            print(path)
+    """
+    if not os.path.exists(folder_location):
+        raise ValueError(f"Folder not found: {folder_location}")
+    
+    matcher = KeywordMatcher(keyword, case_sensitive, include_plural)
+    
+    if index is not None:
+        entries = index.iter_entries(folder_location, max_workers=max_workers, exclusions=exclusions)
+    else:
+        entries = iter_entries(folder_location, max_workers=max_workers, exclusions=exclusions)
+    
+    return _iter_matches(entries, matcher)
+
+
+def _iter_matches(entries, matcher):
+    for entry in entries:
+        if matcher.matches(entry.name):
+            yield entry.path
+
+
+def folder(folder_location, keyword, case_sensitive=False, include_plural=True, max_workers=None, index=None,
+           exclusions=None):
     """
     Search for files/folders by keyword
     
     Args:
         folder_location (str): Path to search in
-        keyword (str): Keyword to search for
+        keyword (str or list): Keyword, or list of keywords, to search for
         case_sensitive (bool): Case-sensitive search (default: False)
         include_plural (bool): Include plural forms (default: True)
+        max_workers (int): Threads listing directories in parallel (default: None, single thread)
+        index (FileIndex): Answer the search from a persistent file index instead of walking (default: None)
+        exclusions (ExclusionRules): Globs, ignore files and depth/symlink/mount limits; excluded folders are never listed (default: None)
     
     Returns:
         SortResults: Object containing found files with methods (delete, copy, move)
@@ -114,54 +136,54 @@ def folder(folder_location, keyword, case_sensitive=False, include_plural=True):
         results = sort.folder("C:/Users/Abu/Documents", "backup")
         print(f"Found {len(results)} items")
         results.delete()
-    """
-    if not os.path.exists(folder_location):
-        raise ValueError(f"Folder not found: {folder_location}")
-    
-    if not keyword:
-        raise ValueError("Keyword cannot be empty")
-    
-    results = []
-    search_keywords = _generate_keywords(keyword, case_sensitive, include_plural)
-    
-    for root, dirs, files in os.walk(folder_location):
-        # Search directories
-        for dir_name in dirs:
-            if _matches_keyword(dir_name, search_keywords):
-                results.append(os.path.join(root, dir_name))
         
-        # Search files
-        for file_name in files:
-            if _matches_keyword(file_name, search_keywords):
-                results.append(os.path.join(root, file_name))
-    
+        # Several keywords at once, matched in a single pass per name
+        results = sort.folder("C:/Users/Abu/Documents", ["backup", "old", "tmp"])
+        
+        # Skip dependency folders and VCS metadata without listing them
+        from Sorter.exclusions import ExclusionRules
+        rules = ExclusionRules(["node_modules/", ".git/"], one_file_system=True)
+        results = sort.folder("C:/Users/Abu/Projects", "backup", exclusions=rules)
+    """
+    results = ResultStore(iter_folder(folder_location, keyword, case_sensitive, include_plural, max_workers, index,
+                                      exclusions))
     return SortResults(results, keyword, folder_location)
 
 
-def list_files(folder_location, keyword, case_sensitive=False, include_plural=True):
+def list_files(folder_location, keyword, case_sensitive=False, include_plural=True, max_workers=None):
     """
     Get list of files matching keyword
     
     Returns:
         list: File paths
     """
-    results = folder(folder_location, keyword, case_sensitive, include_plural)
+    results = folder(folder_location, keyword, case_sensitive, include_plural, max_workers)
     return list(results.files)
 
 
-def delete(folder_location, keyword, case_sensitive=False, include_plural=True):
+def delete(folder_location, keyword, case_sensitive=False, include_plural=True, max_workers=None):
     """Delete all files matching keyword"""
-    results = folder(folder_location, keyword, case_sensitive, include_plural)
+    results = folder(folder_location, keyword, case_sensitive, include_plural, max_workers)
     return results.delete()
 
 
-def copy(folder_location, keyword, destination, case_sensitive=False, include_plural=True):
+def copy(folder_location, keyword, destination, case_sensitive=False, include_plural=True, max_workers=None):
     """Copy all files matching keyword to destination"""
-    results = folder(folder_location, keyword, case_sensitive, include_plural)
+    results = folder(folder_location, keyword, case_sensitive, include_plural, max_workers)
     return results.copy(destination)
 
 
-def move(folder_location, keyword, destination, case_sensitive=False, include_plural=True):
+def move(folder_location, keyword, destination, case_sensitive=False, include_plural=True, max_workers=None):
     """Move all files matching keyword to destination"""
-    results = folder(folder_location, keyword, case_sensitive, include_plural)
+    results = folder(folder_location, keyword, case_sensitive, include_plural, max_workers)
     return results.move(destination)
+
+
+def resume(journal, max_workers=8):
+    """Finish an interrupted journaled delete/copy/move, skipping entries already done"""
+    return BulkExecutor(max_workers).resume(journal)
+
+
+def undo(journal, max_workers=8):
+    """Reverse a journaled copy/move (copies are deleted, moves are moved back)"""
+    return BulkExecutor(max_workers).undo(journal)
@@ -50,7 +50,7 @@ def apply_modern_theme(app):
         background-color: #0a5a61;
     }
     
-    QListWidget {
+    QListWidget, QTableView {
         background-color: #2d2d2d;
         color: #ffffff;
         border: 2px solid #404040;
@@ -58,16 +58,16 @@ def apply_modern_theme(app):
         outline: none;
     }
     
-    QListWidget::item {
+    QListWidget::item, QTableView::item {
         padding: 8px;
         border-radius: 4px;
     }
     
-    QListWidget::item:hover {
+    QListWidget::item:hover, QTableView::item:hover {
         background-color: #3d3d3d;
     }
     
-    QListWidget::item:selected {
+    QListWidget::item:selected, QTableView::item:selected {
         background-color: #0d7377;
     }
     
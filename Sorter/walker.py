@@ -0,0 +1,158 @@
+"""
+Walker - Shared directory traversal for Sorter, TimeSort and SmartSort
+Usage: from walker import iter_entries
+        for entry in iter_entries(folder_location, max_workers=8):
+            print(entry.path, entry.is_dir())
+
+Built on os.scandir: every yielded entry is an os.DirEntry, so its path is
+joined once by the OS layer and its type and stat info are cached on the
+entry (on Windows the stat info comes for free with the directory listing).
+
+With max_workers > 1 directories are listed concurrently on a thread pool,
+which keeps network shares and fast SSDs busy while each listing waits on
+I/O. Results are still yielded in the same order as the serial walk.
+
+With ExclusionRules, excluded entries are dropped from each listing and
+excluded, too-deep or off-device folders are never listed at all.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def scan_directory(path, with_stat=False):
+    """List a single directory and split it into (dirs, files) DirEntry lists"""
+    dirs = []
+    files = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                
+                if with_stat:
+                    # Warm the entry's stat cache; failures surface to the caller later
+                    try:
+                        entry.stat()
+                    except OSError:
+                        pass
+                
+                if is_dir:
+                    dirs.append(entry)
+                else:
+                    files.append(entry)
+    except OSError:
+        # Unreadable directories are skipped, the same way os.walk does it
+        pass
+    
+    return dirs, files
+
+
+class WalkProgress:
+    """Running counters for a walk; plain ints, safe to read from another thread"""
+    def __init__(self):
+        self.directories = 0
+        self.entries = 0
+    
+    def __repr__(self):
+        return f"WalkProgress(directories={self.directories}, entries={self.entries})"
+
+
+def _subdirectories(dirs):
+    """Paths to descend into; symlinked directories are reported but not followed, like os.walk"""
+    return [entry.path for entry in dirs if not entry.is_symlink()]
+
+
+def _listed(pruner, folder, listing):
+    """Apply the exclusion rules (if any) to one listing"""
+    if pruner is None:
+        return listing
+    return pruner.filter(folder, *listing)
+
+
+def _next_folders(pruner, folder, dirs):
+    """(path, folder state) for each subdirectory to list next"""
+    if pruner is None:
+        return [(path, None) for path in _subdirectories(dirs)]
+    return pruner.subfolders(folder, dirs)
+
+
+def _walk_serial(top, with_stat, pruner):
+    stack = [(top, pruner.root if pruner else None)]
+    while stack:
+        path, folder = stack.pop()
+        dirs, files = _listed(pruner, folder, scan_directory(path, with_stat))
+        yield dirs, files
+        stack.extend(reversed(_next_folders(pruner, folder, dirs)))
+
+
+def _walk_parallel(top, with_stat, max_workers, pruner):
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    # Stack of pending listings, consumed depth-first so the output order
+    # matches the serial walk while the pool lists ahead of the consumer
+    stack = [(pool.submit(scan_directory, top, with_stat), pruner.root if pruner else None)]
+    try:
+        while stack:
+            future, folder = stack.pop()
+            dirs, files = _listed(pruner, folder, future.result())
+            yield dirs, files
+            
+            stack.extend(reversed([(pool.submit(scan_directory, path, with_stat), subfolder)
+                                   for path, subfolder in _next_folders(pruner, folder, dirs)]))
+    finally:
+        # Stopping early (break, cancel) drops the listings nobody will read
+        for future, _ in stack:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+def walk(top, max_workers=None, with_stat=False, exclusions=None):
+    """
+    Walk a directory tree top-down
+    
+    Args:
+        top (str): Root folder to walk
+        max_workers (int): Threads listing directories concurrently (default: None, serial)
+        with_stat (bool): Stat every entry while listing, so stat() is served from cache (default: False)
+        exclusions (ExclusionRules): Entries and subtrees to skip (default: None, everything)
+    
+    Yields:
+        tuple: (dirs, files) lists of os.DirEntry for each directory, in the
+        same order as os.walk. Removing entries from dirs prunes the walk.
+    """
+    if max_workers is not None and max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    
+    pruner = exclusions.walker(top) if exclusions is not None else None
+    if max_workers is None or max_workers == 1:
+        return _walk_serial(top, with_stat, pruner)
+    return _walk_parallel(top, with_stat, max_workers, pruner)
+
+
+def iter_entries(top, include_dirs=True, include_files=True, max_workers=None, with_stat=False, progress=None,
+                 exclusions=None):
+    """
+    Yield every entry below top, directories before files in each folder
+    
+    Args:
+        top (str): Root folder to walk
+        include_dirs (bool): Yield directory entries (default: True)
+        include_files (bool): Yield file entries (default: True)
+        max_workers (int): Threads listing directories concurrently (default: None, serial)
+        with_stat (bool): Stat entries on the listing threads (default: False)
+        progress (WalkProgress): Counters updated as each directory is read (default: None)
+        exclusions (ExclusionRules): Entries and subtrees to skip (default: None, everything)
+    
+    Yields:
+        os.DirEntry: Entry with cached name, path, type and stat info
+    """
+    for dirs, files in walk(top, max_workers, with_stat, exclusions):
+        if progress is not None:
+            progress.directories += 1
+            progress.entries += len(dirs) + len(files)
+        if include_dirs:
+            yield from dirs
+        if include_files:
+            yield from files
@@ -0,0 +1,716 @@
+"""
+Watcher - Live create/delete/rename events for a folder tree
+Usage: from watcher import open_watcher
+        with open_watcher(folder_location) as watcher:
+            for event in watcher.read(timeout=1.0):
+                print(event.kind, event.path, event.dest_path)
+
+On Linux the tree is watched with inotify (called through ctypes, so there
+is no extra dependency): one watch per folder, and events arrive as they
+happen without anything being re-listed. Elsewhere, or when the kernel's
+watch limit is reached, a polling watcher stats every folder it knows each
+interval and re-lists only those whose mtime changed, the same check
+FileIndex.refresh makes; a move is recognized by the entry's inode, and
+what changed inside a folder renamed between two polls follows its move.
+
+Events are "created", "deleted" and "moved" (path -> dest_path), plus
+"overflow" when events were lost and the tree needs a rescan. Deleting or
+moving a folder is a single event; what lies below it is implied. A new
+folder is watched as soon as it is seen and everything already inside it
+is reported as created, so "created" may repeat for a path. Changes to
+file contents and access times are not reported.
+
+LiveResults applies events to a ResultStore of scan results and
+FileIndex.apply_events to the index, so neither needs a rescan.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from stat import S_ISDIR, S_ISLNK
+
+try:
+    from .exclusions import ExclusionRules
+    from .walker import scan_directory
+except ImportError:
+    from exclusions import ExclusionRules
+    from walker import scan_directory
+
+
+POLL_INTERVAL = 2.0     # seconds between polls for the polling watcher
+READ_SIZE = 64 * 1024   # bytes read from the inotify descriptor at a time
+
+# kind: "created", "deleted", "moved" or "overflow"; dest_path only for "moved";
+# is_dir is None when unknown (events built from an operation report)
+WatchEvent = namedtuple("WatchEvent", ["kind", "path", "dest_path", "is_dir"])
+
+# From <sys/inotify.h>
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK if hasattr(os, "O_NONBLOCK") else 0
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE_SELF | _IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _inotify_functions():
+    """libc's inotify_init1, inotify_add_watch and inotify_rm_watch, or None without inotify"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        init, add, remove = libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    
+    init.argtypes = [ctypes.c_int]
+    add.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    remove.argtypes = [ctypes.c_int, ctypes.c_int]
+    init.restype = add.restype = remove.restype = ctypes.c_int
+    return init, add, remove
+
+
+_INOTIFY = _inotify_functions()
+
+
+class _PathEntry:
+    """DirEntry-style view of a path named in an event; stat info is read once, on first use"""
+    __slots__ = ("path", "name", "_stat")
+    
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        self._stat = None
+    
+    def __repr__(self):
+        return f"<_PathEntry '{self.name}'>"
+    
+    def stat(self):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+    
+    def is_dir(self):
+        try:
+            return S_ISDIR(self.stat().st_mode)
+        except OSError:
+            return False
+    
+    def is_symlink(self):
+        try:
+            return S_ISLNK(os.lstat(self.path).st_mode)
+        except OSError:
+            return False
+
+
+class _TreeWatcher:
+    """Watched folders with their exclusion state, and the tree bookkeeping both watchers share"""
+    def __init__(self, folder_location, exclusions=None):
+        if not os.path.isdir(folder_location):
+            raise ValueError(f"Folder not found: {folder_location}")
+        # Paths are joined onto the folder as given, so they match what the walker yields
+        self.root = folder_location
+        # Without rules nothing is excluded and no ignore files are read, as in walker.walk
+        self.exclusions = exclusions if exclusions is not None else ExclusionRules(ignore_files=())
+        self._pruner = self.exclusions.walker(folder_location)
+        # Watched folders: path -> _Folder, and path -> paths of watched subfolders
+        self.folders = {}
+        self._subfolders = defaultdict(set)
+        self._add_tree(folder_location, self._pruner.root, None)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        pass
+    
+    def _watch(self, path, folder):
+        """Start watching one folder, before it is listed; False if that failed"""
+        return True
+    
+    def _listed(self, folder, dirs, files):
+        """Called with each folder's (filtered) listing as it is added"""
+    
+    def _release(self, dropped):
+        """Stop watching folders removed from the tree (unless watched again under the same path)"""
+    
+    def _moved_tree(self, events, path, dest_path, dropped):
+        """Called once a moved folder is watched under dest_path, before its old folders are released"""
+    
+    def _add_tree(self, path, folder, events):
+        """Watch a folder and everything below it; with events, report what is inside as created"""
+        stack = [(path, folder)]
+        while stack:
+            path, folder = stack.pop()
+            if not self._watch(path, folder):
+                continue
+            self.folders[path] = folder
+            if folder.relative:
+                self._subfolders[os.path.dirname(path)].add(path)
+            
+            dirs, files = self._pruner.filter(folder, *scan_directory(path))
+            self._listed(folder, dirs, files)
+            if events is not None:
+                events.extend(WatchEvent("created", entry.path, None, True) for entry in dirs)
+                events.extend(WatchEvent("created", entry.path, None, False) for entry in files)
+            stack.extend(reversed(self._pruner.subfolders(folder, dirs)))
+    
+    def _add_folder(self, parent, path, events):
+        """Watch a folder that appeared in parent, within the depth/symlink/mount limits"""
+        for subpath, folder in self._pruner.subfolders(parent, [_PathEntry(path)]):
+            self._add_tree(subpath, folder, events)
+    
+    def _drop_tree(self, path):
+        """Forget a folder and every watched folder below it; returns the (path, _Folder) pairs dropped"""
+        self._subfolders[os.path.dirname(path)].discard(path)
+        dropped = []
+        stack = [path]
+        while stack:
+            path = stack.pop()
+            folder = self.folders.pop(path, None)
+            if folder is not None:
+                dropped.append((path, folder))
+            stack.extend(self._subfolders.pop(path, ()))
+        return dropped
+    
+    def _excluded(self, folder, path, is_dir):
+        return self._pruner.excluded(folder, os.path.basename(path), is_dir)
+    
+    def _created(self, events, folder, path, is_dir):
+        if self._excluded(folder, path, is_dir):
+            return
+        events.append(WatchEvent("created", path, None, is_dir))
+        if is_dir:
+            self._add_folder(folder, path, events)
+    
+    def _deleted(self, events, folder, path, is_dir):
+        if self._excluded(folder, path, is_dir):
+            return
+        events.append(WatchEvent("deleted", path, None, is_dir))
+        if is_dir:
+            self._release(self._drop_tree(path))
+    
+    def _moved(self, events, folder, path, dest_folder, dest_path, is_dir):
+        # Renamed into or out of an excluded name, it only appears or disappears
+        if self._excluded(folder, path, is_dir):
+            self._created(events, dest_folder, dest_path, is_dir)
+            return
+        if self._excluded(dest_folder, dest_path, is_dir):
+            self._deleted(events, folder, path, is_dir)
+            return
+        
+        events.append(WatchEvent("moved", path, dest_path, is_dir))
+        if is_dir:
+            # Re-watched under the new path before the old watches are released, so nothing slips through
+            dropped = self._drop_tree(path)
+            self._pruner.revisit(dest_path)
+            self._add_folder(dest_folder, dest_path, None)
+            self._moved_tree(events, path, dest_path, dropped)
+            self._release(dropped)
+
+
+class InotifyWatcher(_TreeWatcher):
+    """Linux inotify watch on every folder of a tree"""
+    def __init__(self, folder_location, exclusions=None):
+        if _INOTIFY is None:
+            raise OSError("inotify is not available on this system")
+        self._init, self._add_watch, self._rm_watch = _INOTIFY
+        self._fd = self._init(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        
+        # wd -> _Folder and _Folder -> wd
+        self._by_wd = {}
+        self._wd_of = {}
+        self._ready = False
+        try:
+            super().__init__(folder_location, exclusions)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._ready = True
+        self._poller = select.poll()
+        self._poller.register(self._fd, select.POLLIN)
+    
+    def __repr__(self):
+        return f"InotifyWatcher('{self.root}', folders={len(self.folders)})"
+    
+    def close(self):
+        """Remove every watch"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+    
+    def _watch(self, path, folder):
+        wd = self._add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if not self._ready and (not self.folders or error == errno.ENOSPC):
+                # The folder itself can't be watched, or the watch limit was reached while setting up
+                raise OSError(error, f"{os.strerror(error)}: {path}")
+            if error not in (errno.ENOENT, errno.ENOTDIR):
+                print(f"Error watching {path}: {os.strerror(error)}")
+            return False
+        self._by_wd[wd] = folder
+        self._wd_of[folder] = wd
+        return True
+    
+    def _release(self, dropped):
+        for path, folder in dropped:
+            wd = self._wd_of.pop(folder, None)
+            # A folder watched again under the same inode got the same wd and a new _Folder
+            if wd is not None and self._by_wd.get(wd) is folder:
+                del self._by_wd[wd]
+                self._rm_watch(self._fd, wd)
+    
+    def read(self, timeout=None):
+        """
+        Wait for changes and return them
+        
+        Args:
+            timeout (float): Seconds to wait for the first event (default: None, until there is one)
+        
+        Returns:
+            list: WatchEvent for each change since the last read, in order (empty on timeout)
+        """
+        if not self._poller.poll(None if timeout is None else int(timeout * 1000)):
+            return []
+        
+        # One chunk per raw event; a "moved from" chunk is filled in once its "moved to" is seen
+        chunks = []
+        moves = {}
+        self._parse(self._read_all(), chunks, moves)
+        if moves:
+            # The two halves of a rename can straddle reads; give the second half a moment
+            self._parse(self._read_all(0.01), chunks, moves)
+        
+        for position, folder, path, is_dir in moves.values():
+            # Moved out of the watched tree
+            self._deleted(chunks[position], folder, path, is_dir)
+        return [event for chunk in chunks for event in chunk]
+    
+    def _read_all(self, wait=None):
+        if wait is not None and not self._poller.poll(int(wait * 1000)):
+            return b""
+        data = bytearray()
+        while True:
+            try:
+                chunk = os.read(self._fd, READ_SIZE)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+        return bytes(data)
+    
+    def _parse(self, data, chunks, moves):
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0"))
+            offset += _EVENT_HEADER.size + length
+            
+            events = []
+            chunks.append(events)
+            if mask & _IN_Q_OVERFLOW:
+                events.append(WatchEvent("overflow", self.root, None, True))
+                continue
+            
+            folder = self._by_wd.get(wd)
+            if folder is None:
+                # A watch already released; its events are covered by the move or delete that released it
+                continue
+            if mask & _IN_IGNORED:
+                # The folder is gone (its parent reported it) or was unmounted
+                del self._by_wd[wd]
+                self._wd_of.pop(folder, None)
+                continue
+            if mask & _IN_DELETE_SELF:
+                if folder is self._pruner.root:
+                    events.append(WatchEvent("deleted", self.root, None, True))
+                continue
+            
+            is_dir = bool(mask & _IN_ISDIR)
+            path = os.path.join(folder.path, name)
+            if mask & _IN_MOVED_FROM:
+                moves[cookie] = (len(chunks) - 1, folder, path, is_dir)
+            elif mask & _IN_MOVED_TO:
+                source = moves.pop(cookie, None)
+                if source is None:
+                    # Moved in from outside the watched tree
+                    self._created(events, folder, path, is_dir)
+                else:
+                    position, source_folder, source_path, _ = source
+                    self._moved(chunks[position], source_folder, source_path, folder, path, is_dir)
+            elif mask & _IN_CREATE:
+                self._created(events, folder, path, is_dir)
+            elif mask & _IN_DELETE:
+                self._deleted(events, folder, path, is_dir)
+
+
+class PollingWatcher(_TreeWatcher):
+    """Watch that re-lists folders whose mtime changed, every interval seconds"""
+    def __init__(self, folder_location, exclusions=None, interval=POLL_INTERVAL):
+        if interval <= 0:
+            raise ValueError("interval must be greater than 0")
+        self.interval = interval
+        # _Folder -> [mtime_ns, {name: (is_dir, inode)}]
+        self._listings = {}
+        super().__init__(folder_location, exclusions)
+        self._next_poll = time.monotonic() + interval
+    
+    def __repr__(self):
+        return f"PollingWatcher('{self.root}', folders={len(self.folders)}, interval={self.interval})"
+    
+    def _watch(self, path, folder):
+        # Stat before listing: a change made during the listing shows up on the next poll
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return False
+        self._listings[folder] = [mtime_ns, {}]
+        return True
+    
+    def _listed(self, folder, dirs, files):
+        self._listings[folder][1] = _snapshot(dirs, files)
+    
+    def _release(self, dropped):
+        for path, folder in dropped:
+            self._listings.pop(folder, None)
+    
+    def _moved_tree(self, events, path, dest_path, dropped):
+        # Renamed between two polls: what changed inside it since its last listing is only seen now
+        before = {dest_path + old_path[len(path):]: self._listings[folder][1]
+                  for old_path, folder in dropped if folder in self._listings}
+        stack = [dest_path]
+        while stack:
+            folder_path = stack.pop()
+            folder = self.folders.get(folder_path)
+            if folder is None:
+                continue
+            listing = self._listings[folder][1]
+            old = before.get(folder_path, {})
+            for name, (is_dir, inode) in old.items():
+                if listing.get(name) != (is_dir, inode):
+                    events.append(WatchEvent("deleted", os.path.join(folder_path, name), None, is_dir))
+            for name, (is_dir, inode) in listing.items():
+                if old.get(name) != (is_dir, inode):
+                    events.append(WatchEvent("created", os.path.join(folder_path, name), None, is_dir))
+            stack.extend(self._subfolders.get(folder_path, ()))
+    
+    def read(self, timeout=None):
+        """
+        Wait for the next poll and return the changes it found
+        
+        Args:
+            timeout (float): Seconds to wait at most (default: None, until a poll finds something)
+        
+        Returns:
+            list: WatchEvent for each change since the last read (empty on timeout)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._next_poll - time.monotonic()
+            if deadline is not None and self._next_poll > deadline:
+                time.sleep(max(deadline - time.monotonic(), 0))
+                return []
+            if wait > 0:
+                time.sleep(wait)
+            self._next_poll = time.monotonic() + self.interval
+            events = self.poll()
+            if events or deadline is not None:
+                return events
+    
+    def poll(self):
+        """Check every watched folder once, now; returns the changes found"""
+        # Collect first, then apply: applying adds and drops folders
+        changes = []
+        for folder, state in list(self._listings.items()):
+            try:
+                mtime_ns = os.stat(folder.path).st_mtime_ns
+            except OSError:
+                # Gone; its parent's listing reports it
+                continue
+            if mtime_ns == state[0]:
+                continue
+            
+            state[0] = mtime_ns
+            listing = _snapshot(*self._pruner.filter(folder, *scan_directory(folder.path)))
+            before, state[1] = state[1], listing
+            for name, (is_dir, inode) in before.items():
+                if listing.get(name) != (is_dir, inode):
+                    changes.append(("deleted", folder, name, is_dir, inode))
+            for name, (is_dir, inode) in listing.items():
+                if before.get(name) != (is_dir, inode):
+                    changes.append(("created", folder, name, is_dir, inode))
+        
+        # The same inode gone from one place and new in another was moved
+        created = {(is_dir, inode): (folder, name) for kind, folder, name, is_dir, inode in changes
+                   if kind == "created"}
+        moved = set()
+        events = []
+        for kind, folder, name, is_dir, inode in changes:
+            path = os.path.join(folder.path, name)
+            if kind == "deleted":
+                target = created.get((is_dir, inode))
+                if target is not None and (is_dir, inode) not in moved:
+                    moved.add((is_dir, inode))
+                    self._moved(events, folder, path, target[0], os.path.join(target[0].path, target[1]), is_dir)
+                else:
+                    self._deleted(events, folder, path, is_dir)
+            elif (is_dir, inode) not in moved:
+                self._created(events, folder, path, is_dir)
+        return events
+
+
+def _snapshot(dirs, files):
+    """name -> (is_dir, inode) for one listing (DirEntry.inode() is free on POSIX)"""
+    listing = {}
+    for is_dir, entries in ((True, dirs), (False, files)):
+        for entry in entries:
+            try:
+                listing[entry.name] = (is_dir, entry.inode())
+            except OSError:
+                listing[entry.name] = (is_dir, None)
+    return listing
+
+
+def open_watcher(folder_location, exclusions=None, interval=POLL_INTERVAL, polling=False):
+    """
+    Watch a folder tree with inotify where it is available, by polling otherwise
+    
+    Args:
+        folder_location (str): Folder to watch
+        exclusions (ExclusionRules): Entries and subtrees neither watched nor reported (default: None)
+        interval (float): Seconds between polls, when polling (default: 2.0)
+        polling (bool): Poll even where inotify is available, e.g. for network shares, whose
+            remote changes inotify never sees (default: False)
+    
+    Returns:
+        InotifyWatcher or PollingWatcher: read(timeout) returns lists of WatchEvent; close() when done
+    
+    Example:
+        with open_watcher("/home/abu/Documents") as watcher:
+            while True:
+                for event in watcher.read():
+                    print(event.kind, event.path)
+    """
+    if not polling and _INOTIFY is not None:
+        try:
+            return InotifyWatcher(folder_location, exclusions)
+        except OSError as e:
+            # Usually fs.inotify.max_user_watches, reached on a very large tree
+            print(f"Cannot watch {folder_location} with inotify ({e}); polling instead")
+    return PollingWatcher(folder_location, exclusions, interval)
+
+
+def _prefix(path):
+    """Parent directory prefix of a path, as a ResultStore keeps it"""
+    return path[:len(path) - len(os.path.basename(path))]
+
+
+class LiveResults:
+    """Keeps a ResultStore of scan results in step with watch events, without rescanning"""
+    def __init__(self, store, root, accept):
+        """
+        Args:
+            store (ResultStore): Results of scanning root
+            root (str): The scanned folder; entries moved out of it leave the results
+            accept (callable): accept(entry) -> bool for a new or renamed entry (DirEntry-style:
+                path, name, is_dir(), stat()), e.g. whether its name matches the keywords
+        """
+        self.store = store
+        self.root = root
+        self.accept = accept
+        # Set when events were lost ("overflow"); only a rescan brings the results back in step
+        self.stale = False
+    
+    def __repr__(self):
+        return f"LiveResults(count={len(self.store)}, stale={self.stale})"
+    
+    def apply(self, events):
+        """
+        Apply a batch of events to the store
+        
+        Returns:
+            tuple: (removed, added) result counts
+        """
+        removed, added, _ = self.changes(events)
+        self.store.remove_rows(removed)
+        for entry in added:
+            try:
+                stat = entry.stat()
+            except OSError:
+                stat = None
+            self.store.append(entry.path, entry.name, stat, entry.is_dir())
+        return len(removed), len(added)
+    
+    def changes(self, events):
+        """
+        Work out what a batch of events does to the results
+        
+        Folder renames are applied to the store at once (rows keep their
+        positions); removals and additions are only returned, so a view can
+        announce them before making them.
+        
+        Returns:
+            tuple: (removed, added, renamed) - ascending rows to remove, DirEntry-style
+            entries to append, and whether existing rows now show other paths
+        """
+        if any(event.kind == "overflow" for event in events):
+            self.stale = True
+        batch = _ResultsBatch(self, events)
+        for event in events:
+            if event.kind == "created":
+                path = self._inside(event.path)
+                if path is not None:
+                    batch.add(path)
+            elif event.kind == "deleted":
+                batch.remove(event.path, event.is_dir)
+            elif event.kind == "moved":
+                dest_path = self._inside(event.dest_path)
+                if dest_path is None:
+                    batch.remove(event.path, event.is_dir)
+                else:
+                    batch.move(event.path, dest_path, event.is_dir)
+        return sorted(batch.removed), list(batch.added.values()), batch.renamed
+    
+    def _inside(self, path):
+        """path as a scan of root would list it, or None outside root (e.g. a move or copy destination)"""
+        if path.startswith(os.path.join(self.root, "")):
+            return path
+        try:
+            relative = os.path.relpath(os.path.abspath(path), os.path.abspath(self.root))
+        except ValueError:
+            # Another drive
+            return None
+        if relative == os.curdir or relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return None
+        return os.path.join(self.root, relative)
+
+
+class _ResultsBatch:
+    """Rows touched by one batch of events, found in a single pass over the store"""
+    def __init__(self, live, events):
+        self.store = live.store
+        self.accept = live.accept
+        self.removed = set()
+        # path -> entry to append, in the order they appeared
+        self.added = {}
+        self.renamed = False
+        
+        # Rows directly in the folders the events name, and anywhere below deleted or moved folders
+        folders = set()
+        prefixes = set()
+        for event in events:
+            if event.kind == "overflow":
+                continue
+            # Paths as changes() will look them up
+            dest_path = live._inside(event.dest_path) if event.dest_path is not None else None
+            for path in (event.path, dest_path):
+                if path is None:
+                    continue
+                prefixes.add(_prefix(path))
+                if event.kind != "created" and event.is_dir is not False:
+                    folders.add(os.path.join(path, ""))
+        if folders:
+            stored = sorted(self.store.dir_prefixes())
+            for folder in folders:
+                position = bisect_left(stored, folder)
+                while position < len(stored) and stored[position].startswith(folder):
+                    prefixes.add(stored[position])
+                    position += 1
+        self.rows = self.store.rows_in(prefixes)
+        # prefix -> {name: row}, built on first lookup
+        self.names = {}
+    
+    def row(self, path):
+        """Row of a path still in the results, or None"""
+        prefix = _prefix(path)
+        by_name = self.names.get(prefix)
+        if by_name is None:
+            by_name = self.names[prefix] = {self.store.name(row): row for row in self.rows.get(prefix, ())}
+        row = by_name.get(os.path.basename(path))
+        return row if row is not None and row not in self.removed else None
+    
+    def add(self, path):
+        if path in self.added or self.row(path) is not None:
+            return
+        entry = _PathEntry(path)
+        try:
+            accepted = self.accept(entry)
+        except OSError:
+            accepted = False
+        if accepted:
+            self.added[path] = entry
+    
+    def remove(self, path, is_dir):
+        row = self.row(path)
+        if row is not None:
+            self.removed.add(row)
+        self.added.pop(path, None)
+        if is_dir is False:
+            return
+        
+        inside = os.path.join(path, "")
+        for prefix, rows in self.rows.items():
+            if prefix.startswith(inside):
+                self.removed.update(rows)
+        for pending in [pending for pending in self.added if pending.startswith(inside)]:
+            del self.added[pending]
+    
+    def move(self, path, dest_path, is_dir):
+        # The entry itself is renamed, so it is tested again (e.g. against the keywords)
+        self.remove(path, False)
+        self.remove(dest_path, False)
+        if is_dir is not False:
+            old, new = os.path.join(path, ""), os.path.join(dest_path, "")
+            moved = [prefix for prefix in self.rows if prefix.startswith(old)]
+            if moved:
+                self.store.rename_prefix(old, new)
+                self.renamed = True
+                for prefix in moved:
+                    rows = self.rows.pop(prefix)
+                    self.rows.setdefault(new + prefix[len(old):], []).extend(rows)
+                    self.names.pop(prefix, None)
+                    self.names.pop(new + prefix[len(old):], None)
+            for pending in [pending for pending in self.added if pending.startswith(old)]:
+                del self.added[pending]
+                self.added[new + pending[len(old):]] = _PathEntry(new + pending[len(old):])
+        self.add(dest_path)
+
+
+def report_events(report):
+    """
+    WatchEvents for what a BulkExecutor operation did, to apply it at once instead of rescanning
+    
+    Args:
+        report (OperationReport): Report of a delete, copy or move
+    
+    Returns:
+        list: "deleted", "created" (copies) or "moved" events, one per succeeded entry
+    """
+    if report.action == "delete":
+        return [WatchEvent("deleted", source, None, None) for source, _ in report.succeeded]
+    if report.action == "copy":
+        return [WatchEvent("created", destination, None, None) for _, destination in report.succeeded]
+    return [WatchEvent("moved", source, destination, None) for source, destination in report.succeeded]
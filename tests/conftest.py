@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Sorter"))
+sys.path.insert(0, os.path.join(ROOT, "Smart Sorter"))
+
+
+def make_tree(top, files):
+    """Create files under top from {relative path: content}, or empty ones from a list of relative paths"""
+    if not isinstance(files, dict):
+        files = dict.fromkeys(files, "")
+    for relative, content in files.items():
+        path = os.path.join(top, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+
+def read_tree(top):
+    """{relative path: content} of every file under top"""
+    found = {}
+    for folder, dirs, files in os.walk(top):
+        for name in files:
+            path = os.path.join(folder, name)
+            with open(path) as f:
+                found[os.path.relpath(path, top)] = f.read()
+    return found
+
+
+@pytest.fixture(autouse=True)
+def config_dir(tmp_path, monkeypatch):
+    """Keep journals, the index and measured throughput out of ~/.sorter"""
+    path = tmp_path / "config"
+    monkeypatch.setenv("SORTER_CONFIG_DIR", str(path))
+    return path
@@ -0,0 +1,226 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+
+import pytest
+
+import bulk_ops
+from bulk_ops import BulkExecutor
+from conftest import make_tree, read_tree
+from journal import OperationJournal
+
+
+@pytest.fixture
+def other_device(tmp_path):
+    """A folder on another filesystem than tmp_path (a tmpfs), so moves there can't be renames"""
+    for candidate in ("/dev/shm", "/run/user", tempfile.gettempdir()):
+        if os.path.isdir(candidate) and os.access(candidate, os.W_OK) \
+                and os.stat(candidate).st_dev != os.stat(tmp_path).st_dev:
+            folder = tempfile.mkdtemp(dir=candidate)
+            yield folder
+            shutil.rmtree(folder, ignore_errors=True)
+            return
+    pytest.skip("No second filesystem to move across")
+
+
+def test_resume_cross_device_tree_move_after_kill(tmp_path, other_device):
+    files = {f"proj/sub{n}/file{i}.txt": f"{n}-{i}" for n in range(3) for i in range(5)}
+    make_tree(tmp_path / "src", files)
+    source = str(tmp_path / "src" / "proj")
+    journal = str(tmp_path / "move.jsonl")
+    
+    # Killed after a few files of the folder copy, leaving a partial proj on the other device
+    script = textwrap.dedent(f"""
+        import os, sys
+        sys.path.insert(0, {os.path.dirname(bulk_ops.__file__)!r})
+        import bulk_ops
+        
+        copy_file, copied = bulk_ops.copy_file, []
+        def dying_copy(src, dst, *args, **kwargs):
+            if len(copied) == 4:
+                os._exit(1)
+            copied.append(src)
+            return copy_file(src, dst, *args, **kwargs)
+        bulk_ops.copy_file = dying_copy
+        
+        bulk_ops.BulkExecutor().move([{source!r}], {other_device!r}, journal={journal!r})
+    """)
+    assert subprocess.run([sys.executable, "-c", script]).returncode == 1
+    assert os.path.isdir(os.path.join(other_device, "proj"))
+    assert os.path.isdir(source)
+    
+    report = BulkExecutor().resume(journal)
+    
+    assert len(report) == 1 and not report.failed
+    assert not os.path.exists(source)
+    assert not os.path.exists(os.path.join(other_device, "proj", "proj"))
+    assert read_tree(other_device) == files
+
+
+def test_resume_delete_counts_missing_sources_as_done(tmp_path):
+    make_tree(tmp_path, {"a.txt": "a", "b.txt": "b", "c.txt": "c"})
+    sources = [str(tmp_path / name) for name in ("a.txt", "b.txt", "c.txt")]
+    journal = str(tmp_path / "delete.jsonl")
+    with OperationJournal(journal) as log:
+        log.begin("delete", [(source, None) for source in sources])
+    # Deleted, but its "done" line never reached the disk
+    os.remove(sources[0])
+    
+    report = BulkExecutor().resume(journal)
+    
+    assert not report.failed
+    assert [source for source, _ in report.succeeded] == sources[1:]
+    assert OperationJournal(journal).done == {0, 1, 2}
+
+
+def test_journal_lines_are_flushed_as_written(tmp_path):
+    journal = str(tmp_path / "copy.jsonl")
+    log = OperationJournal(journal, sync_every=1000, sync_interval=3600)
+    log.begin("copy", [("a", "b")])
+    log.write({"t": "done", "i": 0})
+    
+    assert OperationJournal(journal).done == {0}
+    log.close()
+
+
+def test_undo_overwrite_copy_keeps_files_that_were_there(tmp_path):
+    make_tree(tmp_path / "src", {"proj/a.txt": "new a", "proj/sub/b.txt": "new b"})
+    make_tree(tmp_path / "dst", {"proj/a.txt": "old a", "proj/precious.txt": "keep me"})
+    journal = str(tmp_path / "copy.jsonl")
+    
+    report = BulkExecutor().copy([str(tmp_path / "src" / "proj")], str(tmp_path / "dst"), "overwrite",
+                                 journal=journal)
+    assert not report.failed
+    assert read_tree(tmp_path / "dst")["proj/a.txt"] == "new a"
+    
+    report = BulkExecutor().undo(journal)
+    
+    assert not report.failed
+    assert read_tree(tmp_path / "dst") == {"proj/a.txt": "old a", "proj/precious.txt": "keep me"}
+    assert not os.path.exists(tmp_path / "dst" / "proj" / "sub")
+    assert read_tree(tmp_path / "src") == {"proj/a.txt": "new a", "proj/sub/b.txt": "new b"}
+
+
+def test_undo_keeps_target_folder_that_existed_empty(tmp_path):
+    make_tree(tmp_path / "src", {"a.txt": "a"})
+    os.makedirs(tmp_path / "dst" / "empty")
+    journal = str(tmp_path / "copy.jsonl")
+    
+    BulkExecutor().copy([str(tmp_path / "src" / "a.txt")], str(tmp_path / "dst" / "empty"), journal=journal)
+    BulkExecutor().undo(journal)
+    
+    assert os.path.isdir(tmp_path / "dst" / "empty")
+    assert os.listdir(tmp_path / "dst" / "empty") == []
+
+
+def test_undo_removes_target_folders_the_copy_created(tmp_path):
+    make_tree(tmp_path / "src", {"a.txt": "a"})
+    journal = str(tmp_path / "copy.jsonl")
+    
+    BulkExecutor().copy([str(tmp_path / "src" / "a.txt")], str(tmp_path / "dst" / "new" / "deeper"),
+                        journal=journal)
+    BulkExecutor().undo(journal)
+    
+    assert not os.path.exists(tmp_path / "dst")
+
+
+def test_undo_overwrite_move_restores_replaced_file(tmp_path):
+    make_tree(tmp_path / "src", {"a.txt": "moved"})
+    make_tree(tmp_path / "dst", {"a.txt": "original"})
+    journal = str(tmp_path / "move.jsonl")
+    
+    BulkExecutor().move([str(tmp_path / "src" / "a.txt")], str(tmp_path / "dst"), "overwrite", journal=journal)
+    assert read_tree(tmp_path / "dst") == {"a.txt": "moved"}
+    
+    report = BulkExecutor().undo(journal)
+    
+    assert not report.failed
+    assert read_tree(tmp_path / "src") == {"a.txt": "moved"}
+    assert read_tree(tmp_path / "dst") == {"a.txt": "original"}
+
+
+OVERWRITTEN = {"proj/a.txt": "new a", "proj/sub/b.txt": "new b", "proj/sub/old.txt": "old", "proj/precious.txt": "keep"}
+
+
+def overwrite_move(tmp_path, destination):
+    make_tree(tmp_path / "src", {"proj/a.txt": "new a", "proj/sub/b.txt": "new b"})
+    make_tree(destination, {"proj/a.txt": "old a", "proj/sub/old.txt": "old", "proj/precious.txt": "keep"})
+    return BulkExecutor().move([str(tmp_path / "src" / "proj")], str(destination), "overwrite")
+
+
+def test_overwrite_move_merges_folders_on_same_device(tmp_path):
+    report = overwrite_move(tmp_path, tmp_path / "dst")
+    
+    assert not report.failed and len(report) == 1
+    assert read_tree(tmp_path / "dst") == OVERWRITTEN
+    assert not os.path.exists(tmp_path / "src" / "proj")
+
+
+def test_overwrite_move_merges_folders_across_devices(tmp_path, other_device):
+    report = overwrite_move(tmp_path, other_device)
+    
+    assert not report.failed and len(report) == 1
+    assert read_tree(other_device) == OVERWRITTEN
+    assert not os.path.exists(tmp_path / "src" / "proj")
+
+
+def test_overwrite_copy_merges_folders(tmp_path):
+    make_tree(tmp_path / "src", {"proj/a.txt": "new a", "proj/sub/b.txt": "new b"})
+    make_tree(tmp_path / "dst", {"proj/a.txt": "old a", "proj/sub/old.txt": "old", "proj/precious.txt": "keep"})
+    
+    report = BulkExecutor().copy([str(tmp_path / "src" / "proj")], str(tmp_path / "dst"), "overwrite")
+    
+    assert not report.failed
+    assert read_tree(tmp_path / "dst") == OVERWRITTEN
+
+
+def test_overwrite_never_replaces_a_file_with_a_folder(tmp_path):
+    make_tree(tmp_path / "src", {"proj/a.txt": "a", "notes": "file"})
+    make_tree(tmp_path / "dst", {"proj": "a file", "notes/keep.txt": "keep"})
+    sources = [str(tmp_path / "src" / "proj"), str(tmp_path / "src" / "notes")]
+    
+    report = BulkExecutor().move(sources, str(tmp_path / "dst"), "overwrite")
+    
+    assert len(report) == 0 and [source for source, _ in report.skipped] == sources
+    assert read_tree(tmp_path / "dst") == {"proj": "a file", "notes/keep.txt": "keep"}
+
+
+def test_jobs_per_device_never_exceed_the_limit(tmp_path, monkeypatch):
+    make_tree(tmp_path / "src", {f"{n}.txt": str(n) for n in range(40)})
+    lock, running, peak = threading.Lock(), [0], [0]
+    
+    def slow_copy(source, destination):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return 0
+    monkeypatch.setitem(bulk_ops._OPERATIONS, "copy", slow_copy)
+    
+    sources = [str(tmp_path / "src" / f"{n}.txt") for n in range(40)]
+    report = BulkExecutor(max_workers=16, per_device=2).copy(sources, str(tmp_path / "dst"))
+    
+    assert len(report) == 40
+    assert peak[0] <= 2
+
+
+def test_folder_jobs_count_bytes_without_sizing_the_tree_first(tmp_path, other_device, monkeypatch):
+    files = {"proj/a.txt": "a" * 10, "proj/sub/b.txt": "b" * 20}
+    make_tree(tmp_path / "src", files)
+    
+    def walked(path):
+        raise AssertionError(f"{path} was walked before the job ran")
+    monkeypatch.setattr(bulk_ops, "_tree_size", walked)
+    
+    executor = BulkExecutor()
+    assert executor.copy([str(tmp_path / "src" / "proj")], str(tmp_path / "copy")).bytes == 30
+    assert executor.move([str(tmp_path / "copy" / "proj")], other_device).bytes == 30
+    report = executor.delete([os.path.join(other_device, "proj")])
+    assert len(report) == 1 and not os.path.exists(os.path.join(other_device, "proj"))
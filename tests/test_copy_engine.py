@@ -0,0 +1,20 @@
+import os
+import shutil
+
+import pytest
+
+from bulk_ops import BulkExecutor
+from copy_engine import copy_file
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="No named pipes here")
+def test_copying_a_named_pipe_fails_instead_of_hanging(tmp_path):
+    pipe = str(tmp_path / "pipe")
+    os.mkfifo(pipe)
+    (tmp_path / "dst").mkdir()
+    
+    with pytest.raises(shutil.SpecialFileError):
+        copy_file(pipe, str(tmp_path / "dst" / "pipe"))
+    
+    report = BulkExecutor(max_workers=2).copy([pipe], str(tmp_path / "dst"))
+    assert not report.succeeded and len(report.failed) == 1
@@ -0,0 +1,36 @@
+import os
+
+from conftest import make_tree
+from exclusions import ExclusionRules
+from file_index import FileIndex
+from walker import iter_entries
+
+
+def indexed_paths(tmp_path, top, rules):
+    with FileIndex(str(tmp_path / "index.sqlite3")) as index:
+        index.refresh(str(top))
+        return sorted(entry.path for entry in index.iter_entries(str(top), exclusions=rules))
+
+
+def test_index_entries_with_one_file_system(tmp_path):
+    top = tmp_path / "top"
+    make_tree(top, ["a.txt", "sub/b.txt", "sub/deeper/c.txt", "node_modules/x.js"])
+    rules = ExclusionRules(["node_modules/"], one_file_system=True)
+    
+    indexed = indexed_paths(tmp_path, top, rules)
+    
+    assert indexed == sorted(entry.path for entry in iter_entries(str(top), exclusions=rules))
+    assert str(top / "sub" / "deeper" / "c.txt") in indexed
+    assert not any("node_modules" in path for path in indexed)
+
+
+def test_index_entries_with_follow_symlinks(tmp_path):
+    top = tmp_path / "top"
+    make_tree(top, ["a.txt", "sub/b.txt", "sub/deeper/c.txt"])
+    os.symlink(top / "sub", top / "link")
+    
+    indexed = indexed_paths(tmp_path, top, ExclusionRules(follow_symlinks=True, one_file_system=True))
+    
+    # The index doesn't descend into symlinked folders; their targets are still listed where they are
+    assert str(top / "link") in indexed
+    assert str(top / "sub" / "deeper" / "c.txt") in indexed
@@ -0,0 +1,54 @@
+import os
+
+import file_index
+from conftest import make_tree
+from exclusions import ExclusionRules
+from file_index import FileIndex
+from walker import iter_entries, scan_directory
+
+
+def test_index_lists_entries_in_walk_order(tmp_path):
+    top = str(tmp_path / "top")
+    make_tree(top, ["b.txt", "a.txt", "zeta/x.txt", "zeta/inner/y.txt", "alpha/z.txt", "alpha.txt",
+                    "build/out.o", "mid/deep/deeper/w.txt"])
+    rules = ExclusionRules(["build/"])
+    
+    with FileIndex(str(tmp_path / "index.sqlite3")) as index:
+        index.refresh(top)
+        for kwargs in ({}, {"include_dirs": False}, {"include_files": False}, {"exclusions": rules}):
+            walked = [entry.path for entry in iter_entries(top, **kwargs)]
+            assert [entry.path for entry in index.iter_entries(top, **kwargs)] == walked
+        
+        # Folders re-listed by a later refresh keep matching the walk
+        make_tree(top, ["zeta/new.txt", "c.txt"])
+        index.refresh(top)
+        assert [entry.path for entry in index.iter_entries(top)] == [entry.path for entry in iter_entries(top)]
+
+
+def test_refresh_never_lists_excluded_folders(tmp_path, monkeypatch):
+    top = str(tmp_path / "top")
+    make_tree(top, ["a.txt", "src/b.txt", "src/node_modules/x.js", "node_modules/pkg/y.js", ".git/HEAD"])
+    rules = ExclusionRules(["node_modules/", ".git/"])
+    listed = []
+    
+    def listing(path, **kwargs):
+        listed.append(path)
+        return scan_directory(path, **kwargs)
+    monkeypatch.setattr(file_index, "scan_directory", listing)
+    
+    def indexed():
+        return sorted(os.path.relpath(entry.path, top) for entry in index.iter_entries(top))
+    
+    with FileIndex(str(tmp_path / "index.sqlite3")) as index:
+        index.refresh(top, exclusions=rules)
+        assert sorted(os.path.relpath(path, top) for path in listed) == [".", "src"]
+        assert indexed() == [".git", "a.txt", "node_modules", "src", os.path.join("src", "b.txt"),
+                             os.path.join("src", "node_modules")]
+        assert [entry.path for entry in index.iter_entries(top, exclusions=rules)] == \
+            [entry.path for entry in iter_entries(top, exclusions=rules)]
+        
+        # Refreshed without the rules the pruned folders are listed, and pruned again with them
+        index.refresh(top)
+        assert os.path.join("node_modules", "pkg", "y.js") in indexed()
+        index.refresh(top, exclusions=rules)
+        assert os.path.join("node_modules", "pkg", "y.js") not in indexed()
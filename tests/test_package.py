@@ -0,0 +1,23 @@
+import importlib.util
+import os
+import sys
+
+SMART_SORTER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Smart Sorter")
+
+
+def test_smart_sorter_imports_as_a_package(monkeypatch):
+    # Only the Sorter folder on sys.path, as for `from Smart_Sorter import ...`
+    monkeypatch.setattr(sys, "path", [p for p in sys.path if os.path.abspath(p) != SMART_SORTER])
+    for name in ("smart_sort", "time_sort", "time_histogram", "time_query"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    spec = importlib.util.spec_from_file_location("Smart_Sorter", os.path.join(SMART_SORTER, "__init__.py"),
+                                                  submodule_search_locations=[SMART_SORTER])
+    package = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, "Smart_Sorter", package)
+    try:
+        spec.loader.exec_module(package)
+        assert package.TimeQuery.__module__ == "Smart_Sorter.time_query"
+        assert "time_sort" not in sys.modules
+    finally:
+        for name in [name for name in sys.modules if name.startswith("Smart_Sorter.")]:
+            del sys.modules[name]
@@ -0,0 +1,12 @@
+from conftest import make_tree
+from hash_cache import HashCache
+from smart_sort import SmartSort
+
+
+def test_duplicates_fill_a_new_empty_cache(tmp_path):
+    make_tree(tmp_path / "src", {"a.txt": "same", "b.txt": "same", "c.txt": "diff"})
+    with HashCache(str(tmp_path / "hashes.sqlite3")) as cache:
+        analysis = SmartSort(str(tmp_path / "src"), duplicates=True, hash_cache=cache)
+        assert len(analysis.duplicates.groups) == 1
+        assert cache.misses > 0
+        assert len(cache) > 0
@@ -0,0 +1,16 @@
+from result_store import ResultStore
+from time_sort import TimeSortResults
+
+
+def test_details_of_rows_without_stat_info(tmp_path):
+    path = tmp_path / "kept.txt"
+    path.write_text("x")
+    store = ResultStore(with_stat=True)
+    store.append(str(path), stat=path.stat(), is_dir=False)
+    store.append(str(tmp_path / "gone.txt"))
+    
+    details = TimeSortResults(store, 30, str(tmp_path)).get_details()
+    
+    assert details[0]["days_ago"] is not None
+    assert details[1]["last_accessed"] is None and details[1]["days_ago"] is None
+    assert details[1]["size"] == -1
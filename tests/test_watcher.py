@@ -0,0 +1,30 @@
+import os
+
+from conftest import make_tree
+from file_index import FileIndex
+from result_store import ResultStore
+from walker import iter_entries
+from watcher import LiveResults, PollingWatcher
+
+
+def test_polling_reports_files_created_in_a_folder_renamed_between_polls(tmp_path):
+    top = str(tmp_path / "top")
+    make_tree(top, ["old/a.txt", "old/gone.txt", "old/sub/b.txt"])
+    store = ResultStore(entry.path for entry in iter_entries(top))
+    live = LiveResults(store, top, lambda entry: True)
+    
+    with FileIndex(str(tmp_path / "index.sqlite3")) as index:
+        index.refresh(top)
+        with PollingWatcher(top, interval=60) as watcher:
+            os.rename(os.path.join(top, "old"), os.path.join(top, "new"))
+            os.remove(os.path.join(top, "new", "gone.txt"))
+            make_tree(top, ["new/c.txt", "new/sub/d.txt", "new/added/e.txt"])
+            events = watcher.poll()
+        
+        live.apply(events)
+        index.apply_events(events)
+        
+        rescanned = sorted(entry.path for entry in iter_entries(top))
+        assert sorted(store) == rescanned
+        assert sorted(entry.path for entry in index.iter_entries(top)) == rescanned
+        assert not live.stale